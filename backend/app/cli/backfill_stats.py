@@ -0,0 +1,189 @@
+"""
+Rebuild the statistics rollups from history.
+
+    python -m app.cli.backfill_stats --rebuild     # empty the rollups and start over
+    python -m app.cli.backfill_stats               # resume an interrupted run
+    python -m app.cli.backfill_stats --chunk-size 20000 --sleep 0.2
+
+--rebuild empties the rollups and records a cutoff time. Transactions
+created before the cutoff are then read in keyset order (created_at, id).
+Each chunk is aggregated in SQL and added to the rollups, and the
+checkpoint moves forward in the same database transaction, so a run that
+is interrupted resumes exactly where it stopped. Deposits after the
+cutoff are counted live by handle_deposit. Run --rebuild while deposits
+are quiet: a deposit in flight at the cutoff can be counted twice.
+Pickup totals are recomputed in a single statement at the end.
+"""
+import argparse
+import logging
+import time
+
+from sqlalchemy import text
+
+from app.core.logs import setup_logging
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+STATE_NAME = "transactions"
+
+_CHUNK = text("""
+    WITH chunk AS (
+        SELECT id, created_at, user_id, bin_id, waste_type, points_awarded
+        FROM transactions
+        WHERE created_at < :cutoff
+          AND (
+              CAST(:last_created_at AS TIMESTAMPTZ) IS NULL
+              OR (created_at, id) > (CAST(:last_created_at AS TIMESTAMPTZ), CAST(:last_id AS UUID))
+          )
+        ORDER BY created_at, id
+        LIMIT :limit
+    ),
+    user_rollup AS (
+        INSERT INTO user_waste_stats (user_id, waste_type, deposits, deposit_points, pickups, pickup_points, last_activity_at)
+        SELECT user_id, waste_type, COUNT(*), SUM(points_awarded), 0, 0, MAX(created_at)
+        FROM chunk
+        GROUP BY user_id, waste_type
+        ON CONFLICT (user_id, waste_type) DO UPDATE
+        SET deposits = user_waste_stats.deposits + EXCLUDED.deposits,
+            deposit_points = user_waste_stats.deposit_points + EXCLUDED.deposit_points,
+            last_activity_at = GREATEST(user_waste_stats.last_activity_at, EXCLUDED.last_activity_at)
+    ),
+    day_rollup AS (
+        INSERT INTO bin_daily_stats (bin_id, day, deposits, points)
+        SELECT bin_id, (created_at AT TIME ZONE 'UTC')::date, COUNT(*), SUM(points_awarded)
+        FROM chunk
+        GROUP BY 1, 2
+        ON CONFLICT (bin_id, day) DO UPDATE
+        SET deposits = bin_daily_stats.deposits + EXCLUDED.deposits,
+            points = bin_daily_stats.points + EXCLUDED.points
+    ),
+    bin_user_rollup AS (
+        INSERT INTO bin_user_stats (bin_id, user_id, deposits, points, last_deposit_at)
+        SELECT bin_id, user_id, COUNT(*), SUM(points_awarded), MAX(created_at)
+        FROM chunk
+        GROUP BY bin_id, user_id
+        ON CONFLICT (bin_id, user_id) DO UPDATE
+        SET deposits = bin_user_stats.deposits + EXCLUDED.deposits,
+            points = bin_user_stats.points + EXCLUDED.points,
+            last_deposit_at = GREATEST(bin_user_stats.last_deposit_at, EXCLUDED.last_deposit_at)
+    )
+    SELECT (SELECT COUNT(*) FROM chunk) AS n, last.created_at, last.id
+    FROM (SELECT created_at, id FROM chunk ORDER BY created_at DESC, id DESC LIMIT 1) last
+""")
+
+# Sets rather than adds, so re-running it is harmless
+_PICKUPS = text("""
+    INSERT INTO user_waste_stats (user_id, waste_type, deposits, deposit_points, pickups, pickup_points, last_activity_at)
+    SELECT p.user_id, COALESCE(p.e_waste_type, 'Unknown'), 0, 0, COUNT(*), SUM(p.points_awarded), MAX(p.created_at)
+    FROM pickup_requests p
+    JOIN users u ON u.id = p.user_id
+    WHERE p.status = 'accepted'
+      AND p.points_awarded IS NOT NULL
+    GROUP BY 1, 2
+    ON CONFLICT (user_id, waste_type) DO UPDATE
+    SET pickups = EXCLUDED.pickups,
+        pickup_points = EXCLUDED.pickup_points,
+        last_activity_at = GREATEST(user_waste_stats.last_activity_at, EXCLUDED.last_activity_at)
+""")
+
+
+def start_rebuild(db):
+    db.execute(text("TRUNCATE user_waste_stats, bin_daily_stats, bin_user_stats"))
+    db.execute(
+        text("""
+            INSERT INTO stats_backfill_state (name, cutoff, last_created_at, last_id, rows_done, finished_at, updated_at)
+            VALUES (:name, clock_timestamp(), NULL, NULL, 0, NULL, now())
+            ON CONFLICT (name) DO UPDATE
+            SET cutoff = EXCLUDED.cutoff,
+                last_created_at = NULL,
+                last_id = NULL,
+                rows_done = 0,
+                finished_at = NULL,
+                updated_at = now()
+        """),
+        {"name": STATE_NAME},
+    )
+    db.commit()
+
+
+def load_state(db):
+    return db.execute(
+        text("SELECT * FROM stats_backfill_state WHERE name = :name"),
+        {"name": STATE_NAME},
+    ).mappings().first()
+
+
+def run_chunk(db, state, chunk_size):
+    """Roll up the next chunk and advance the checkpoint atomically; returns rows processed."""
+    row = db.execute(_CHUNK, {
+        "cutoff": state["cutoff"],
+        "last_created_at": state["last_created_at"],
+        "last_id": state["last_id"],
+        "limit": chunk_size,
+    }).first()
+    if row is None:
+        db.rollback()
+        return 0
+
+    db.execute(
+        text("""
+            UPDATE stats_backfill_state
+            SET last_created_at = :created_at, last_id = :id, rows_done = rows_done + :n, updated_at = now()
+            WHERE name = :name
+        """),
+        {"created_at": row.created_at, "id": row.id, "n": row.n, "name": STATE_NAME},
+    )
+    db.commit()
+    return row.n
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rebuild", action="store_true", help="Empty the rollups and backfill from the beginning")
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    parser.add_argument("--sleep", type=float, default=0.0, help="Pause between chunks to limit load")
+    args = parser.parse_args()
+    setup_logging()
+
+    db = SessionLocal()
+    try:
+        if args.rebuild:
+            start_rebuild(db)
+        state = load_state(db)
+        if state is None:
+            raise SystemExit("No backfill in progress; start one with --rebuild")
+        if state["finished_at"] is not None:
+            logger.info("Backfill already finished", extra={"finished_at": state["finished_at"]})
+            return
+
+        started = time.monotonic()
+        done = 0
+        while True:
+            n = run_chunk(db, state, args.chunk_size)
+            if not n:
+                break
+            done += n
+            state = load_state(db)
+            logger.info("Backfilled chunk", extra={
+                "rows": n,
+                "rows_done": state["rows_done"],
+                "through": state["last_created_at"],
+                "rows_per_second": round(done / (time.monotonic() - started), 1),
+            })
+            if args.sleep:
+                time.sleep(args.sleep)
+
+        db.execute(_PICKUPS)
+        db.execute(
+            text("UPDATE stats_backfill_state SET finished_at = now(), updated_at = now() WHERE name = :name"),
+            {"name": STATE_NAME},
+        )
+        db.commit()
+        logger.info("Backfill finished", extra={"rows": done, "seconds": round(time.monotonic() - started, 1)})
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Classify a directory or manifest of images offline, in batches.
+
+    python -m app.cli.classify_images --dir uploads/audit --out audit.csv
+    python -m app.cli.classify_images --manifest images.txt --out audit.csv --batch-size 64 --decode-workers 8
+
+--manifest is a text file with one path per line, or a CSV with a `path`
+column. A pool of threads decodes and preprocesses the next batch into one
+of two reused buffers while the model runs on the current one. Each batch
+is appended to --out and fsynced, so rerunning the same command after an
+interruption skips every path already written. Images that fail to decode
+get a row with `error` set; --retry-errors tries them again (the later row
+wins).
+"""
+import argparse
+import csv
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+import numpy as np
+
+from app.core.logs import setup_logging
+from app.services.inference import (
+    IMAGE_SHAPE,
+    TTA_VIEWS,
+    combine_views,
+    preprocess_image,
+    preprocess_views,
+    to_results,
+)
+from app.services.points import CLASS_NAMES
+from app.services.waste_detector import get_waste_detector
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif", ".bmp"}
+FIELDS = ["path", "waste_type", "confidence", "class_index", *(f"p_{name}" for name in CLASS_NAMES), "error"]
+
+
+def iter_paths(directory=None, manifest=None):
+    if directory:
+        for root, dirs, files in os.walk(directory):
+            dirs.sort()
+            for filename in sorted(files):
+                if os.path.splitext(filename)[1].lower() in IMAGE_EXTENSIONS:
+                    yield os.path.join(root, filename)
+        return
+
+    with open(manifest, newline="") as f:
+        if manifest.endswith(".csv"):
+            for row in csv.DictReader(f):
+                yield row["path"]
+        else:
+            for line in f:
+                if line.strip():
+                    yield line.strip()
+
+
+def load_done(out, retry_errors=False):
+    """Paths already in `out`, after dropping a row that was cut off mid-write."""
+    if not os.path.exists(out):
+        return set()
+
+    with open(out, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+
+    with open(out, newline="") as f:
+        return {
+            row["path"]
+            for row in csv.DictReader(f)
+            if not (retry_errors and row["error"])
+        }
+
+
+def _batches(paths, size):
+    while batch := list(islice(paths, size)):
+        yield batch
+
+
+def _decode(path, rows, tta):
+    if tta:
+        preprocess_views(path, rows)
+    else:
+        preprocess_image(path, rows[0])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--dir", help="Directory to walk for images")
+    source.add_argument("--manifest", help="File listing image paths")
+    parser.add_argument("--out", required=True, help="CSV to append results to")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--decode-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--tta", action="store_true", help="Average augmented views (see INFERENCE_TTA)")
+    parser.add_argument("--retry-errors", action="store_true")
+    parser.add_argument("--limit", type=int, help="Stop after this many new images")
+    parser.add_argument("--model", help="Model file (default backend/Models/ewaste_final.keras)")
+    parser.add_argument("--log-every", type=int, default=20, help="Log progress every N batches")
+    args = parser.parse_args()
+    setup_logging()
+
+    done = load_done(args.out, args.retry_errors)
+    todo = (path for path in iter_paths(args.dir, args.manifest) if path not in done)
+    if args.limit:
+        todo = islice(todo, args.limit)
+    if done:
+        logger.info("Resuming", extra={"already_done": len(done)})
+
+    detector = get_waste_detector(args.model)
+    views = TTA_VIEWS if args.tta else 1
+    # Decode into one while the model reads the other
+    buffers = [np.empty((args.batch_size * views, *IMAGE_SHAPE), dtype=np.float32) for _ in range(2)]
+    pool = ThreadPoolExecutor(args.decode_workers, thread_name_prefix="decode")
+
+    def submit(batch, buf):
+        return batch, buf, [
+            pool.submit(_decode, path, buf[i * views:(i + 1) * views], args.tta)
+            for i, path in enumerate(batch)
+        ]
+
+    new_file = not os.path.exists(args.out) or os.path.getsize(args.out) == 0
+    images = errors = 0
+    started = time.perf_counter()
+    batches = _batches(todo, args.batch_size)
+
+    with open(args.out, "a", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        if new_file:
+            writer.writeheader()
+
+        first = next(batches, None)
+        pending = submit(first, buffers[0]) if first else None
+        n_batches = 0
+        while pending:
+            batch, buf, futures = pending
+            failures = [future.exception() for future in futures]
+            upcoming = next(batches, None)
+            pending = submit(upcoming, buffers[(n_batches + 1) % 2]) if upcoming else None
+
+            ok = [i for i, e in enumerate(failures) if e is None]
+            x = buf[:len(batch) * views]
+            if len(ok) < len(batch):
+                x = x[[i * views + v for i in ok for v in range(views)]]
+            results = iter(
+                to_results(combine_views(detector.predict_preprocessed(x), args.tta), args.tta, detector.class_names)
+                if ok else []
+            )
+
+            for path, failure in zip(batch, failures):
+                if failure is not None:
+                    writer.writerow({"path": path, "error": f"{type(failure).__name__}: {failure}"})
+                    continue
+                result = next(results)
+                writer.writerow({
+                    "path": path,
+                    "waste_type": result["waste_type"],
+                    "confidence": result["confidence"],
+                    "class_index": result["class_index"],
+                    **{f"p_{name}": f"{p:.6f}" for name, p in result["all_probabilities"].items()},
+                })
+            f.flush()
+            os.fsync(f.fileno())
+
+            images += len(batch)
+            errors += len(batch) - len(ok)
+            n_batches += 1
+            if n_batches % args.log_every == 0:
+                logger.info("Classified batch", extra={
+                    "images": images,
+                    "errors": errors,
+                    "images_per_second": round(images / (time.perf_counter() - started), 1),
+                })
+
+    pool.shutdown()
+    elapsed = time.perf_counter() - started
+    logger.info("Classification finished", extra={
+        "images": images,
+        "errors": errors,
+        "seconds": round(elapsed, 1),
+        "images_per_second": round(images / elapsed, 1) if elapsed else None,
+        "out": args.out,
+    })
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Evaluate the waste classifier on a labelled image set, per inference mode.
+
+    python -m app.cli.eval_classifier --data datasets/ewaste-val
+    python -m app.cli.eval_classifier --data datasets/ewaste-val --fit-calibration
+
+--data holds one sub-directory per class, named as in CLASS_NAMES. For
+each mode ("plain", and "tta" for test-time augmentation) this reports
+accuracy, expected calibration error (ECE) and negative log likelihood,
+raw and with the temperatures in --calibration (INFERENCE_CALIBRATION_PATH
+by default). It also
+reports how many predictions land in each scoring band, and the latency
+of single-image calls and of batches.
+
+--fit-calibration fits one temperature per mode on --fit-fraction of the
+images, reports metrics on the rest, and writes the temperatures to
+--calibration. The API reads INFERENCE_CALIBRATION_PATH on first use.
+"""
+import argparse
+import json
+import os
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from app.core.config import INFERENCE_CALIBRATION_PATH
+from app.services.inference import calibrate, get_classifier
+from app.services.points import CLASS_NAMES, HIGH_CONFIDENCE, LOW_CONFIDENCE
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".gif"}
+
+
+def load_dataset(root, limit=None, seed=0):
+    paths, labels = [], []
+    for label, name in enumerate(CLASS_NAMES):
+        folder = os.path.join(root, name)
+        if not os.path.isdir(folder):
+            continue
+        for filename in sorted(os.listdir(folder)):
+            if os.path.splitext(filename)[1].lower() in IMAGE_EXTENSIONS:
+                paths.append(os.path.join(folder, filename))
+                labels.append(label)
+    if not paths:
+        raise SystemExit(f"No images under {root}/<class name>/")
+
+    order = np.random.default_rng(seed).permutation(len(paths))[:limit]
+    return [paths[i] for i in order], np.array(labels)[order]
+
+
+def expected_calibration_error(probs, labels, bins=15):
+    confidence = probs.max(axis=1)
+    correct = probs.argmax(axis=1) == labels
+    edges = np.linspace(0.0, 1.0, bins + 1)
+    which = np.clip(np.digitize(confidence, edges[1:-1]), 0, bins - 1)
+    ece = 0.0
+    for b in range(bins):
+        mask = which == b
+        if mask.any():
+            ece += mask.mean() * abs(correct[mask].mean() - confidence[mask].mean())
+    return float(ece)
+
+
+def negative_log_likelihood(probs, labels):
+    return float(-np.log(np.clip(probs[np.arange(len(labels)), labels], 1e-12, None)).mean())
+
+
+def fit_temperature(probs, labels, low=0.05, high=20.0, iterations=60):
+    """Temperature minimizing NLL, by golden-section search on log T."""
+    a, b = np.log(low), np.log(high)
+    ratio = (np.sqrt(5) - 1) / 2
+
+    def loss(log_t):
+        return negative_log_likelihood(calibrate(probs, float(np.exp(log_t))), labels)
+
+    c, d = b - ratio * (b - a), a + ratio * (b - a)
+    fc, fd = loss(c), loss(d)
+    for _ in range(iterations):
+        if fc < fd:
+            b, d, fd = d, c, fc
+            c = b - ratio * (b - a)
+            fc = loss(c)
+        else:
+            a, c, fc = c, d, fd
+            d = a + ratio * (b - a)
+            fd = loss(d)
+    return float(np.exp((a + b) / 2))
+
+
+def metrics(probs, labels):
+    confidence = probs.max(axis=1)
+    return {
+        "accuracy": float((probs.argmax(axis=1) == labels).mean()),
+        "ece": expected_calibration_error(probs, labels),
+        "nll": negative_log_likelihood(probs, labels),
+        # Share of predictions in each calculate_points case
+        "high_band": float((confidence >= HIGH_CONFIDENCE).mean()),
+        "manual_band": float((confidence < LOW_CONFIDENCE).mean()),
+    }
+
+
+def run_mode(classifier, paths, tta, batch_size, latency_samples):
+    """Probabilities for every image, batch throughput, and single-image latencies."""
+    probs = []
+    started = time.perf_counter()
+    for i in range(0, len(paths), batch_size):
+        probs.append(classifier.predict_probs(paths[i:i + batch_size], tta))
+    batch_ms = (time.perf_counter() - started) / len(paths) * 1000
+
+    single = []
+    for path in paths[:latency_samples]:
+        started = time.perf_counter()
+        classifier.predict_probs([path], tta)
+        single.append((time.perf_counter() - started) * 1000)
+
+    return np.concatenate(probs), batch_ms, np.array(single)
+
+
+def _print_metrics(label, m):
+    print(
+        f"    {label:<12} accuracy {m['accuracy']:6.2%}  ECE {m['ece']:.4f}  NLL {m['nll']:.4f}  "
+        f"high band {m['high_band']:6.1%}  manual band {m['manual_band']:6.1%}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", required=True, help="Directory with one sub-directory of images per class")
+    parser.add_argument("--modes", default="plain,tta")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--latency-samples", type=int, default=50)
+    parser.add_argument("--limit", type=int, help="Evaluate at most this many images")
+    parser.add_argument("--fit-calibration", action="store_true", help="Fit temperatures and write them to --calibration")
+    parser.add_argument("--fit-fraction", type=float, default=0.5)
+    parser.add_argument("--calibration", default=INFERENCE_CALIBRATION_PATH)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    paths, labels = load_dataset(args.data, args.limit, args.seed)
+    classifier = get_classifier()
+    classifier.predict_probs(paths[:1])  # load the model / connect before timing
+
+    n_fit = int(len(paths) * args.fit_fraction) if args.fit_calibration else 0
+    print(f"{len(paths)} images" + (f", temperatures fitted on {n_fit}, metrics on {len(paths) - n_fit}" if n_fit else ""))
+
+    saved = {}
+    if not args.fit_calibration and os.path.exists(args.calibration):
+        with open(args.calibration) as f:
+            saved = json.load(f)
+
+    fitted = {}
+    for mode in args.modes.split(","):
+        tta = mode == "tta"
+        probs, batch_ms, single_ms = run_mode(classifier, paths, tta, args.batch_size, args.latency_samples)
+        eval_probs, eval_labels = probs[n_fit:], labels[n_fit:]
+
+        if args.fit_calibration:
+            t = fit_temperature(probs[:n_fit], labels[:n_fit])
+            fitted[mode] = {"temperature": t, "fitted_on": n_fit}
+        else:
+            t = float(saved.get(mode, {}).get("temperature", 1.0))
+
+        print(f"  {mode}")
+        print(
+            f"    latency      single p50 {np.percentile(single_ms, 50):7.1f} ms  p95 {np.percentile(single_ms, 95):7.1f} ms  "
+            f"batched {batch_ms:7.1f} ms/image"
+        )
+        _print_metrics("raw", metrics(eval_probs, eval_labels))
+        _print_metrics(f"T={t:.3f}", metrics(calibrate(eval_probs, t), eval_labels))
+
+    if args.fit_calibration:
+        fitted["fitted_at"] = datetime.now(timezone.utc).isoformat()
+        with open(args.calibration, "w") as f:
+            json.dump(fitted, f, indent=2)
+        print(f"Wrote {args.calibration}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Seed and maintain the reverse geocoding cache (GEOCODE_CACHE_PATH).
+
+    python -m app.cli.geocode_cache --seed places.csv --radius-cells 4
+    python -m app.cli.geocode_cache --seed LK.txt           # GeoNames country dump
+    python -m app.cli.geocode_cache --stats
+    python -m app.cli.geocode_cache --purge-expired
+
+--seed takes a CSV with lat/latitude, lng/lon/longitude and address_text or
+name columns (the other columns become address components), or a
+GeoNames tab-separated dump (.txt). Each place fills its own grid cell
+and, with --radius-cells, the cells around it. Where places compete for a
+cell the nearest one wins. Seeded cells never expire and, unless --replace
+is given, never overwrite answers already fetched from the provider.
+"""
+import argparse
+import csv
+import logging
+
+from app.core.config import GEOCODE_CACHE_PATH, GEOCODE_CACHE_TTL_DAYS, GEOCODE_CELL_DEGREES
+from app.core.logs import setup_logging
+from app.services.geocoding import GeocodeStore, cell_of, normalize_address
+
+logger = logging.getLogger(__name__)
+
+LAT_COLUMNS = ("lat", "latitude")
+LNG_COLUMNS = ("lng", "lon", "longitude")
+NAME_COLUMNS = ("address_text", "name")
+
+# GeoNames "geoname" table columns used here
+GEONAMES_NAME, GEONAMES_LAT, GEONAMES_LNG, GEONAMES_FEATURE, GEONAMES_COUNTRY = 1, 4, 5, 7, 8
+
+
+def _pick(row, columns):
+    for column in columns:
+        if row.get(column):
+            return row[column]
+    return None
+
+
+def read_places(path):
+    """(lat, lng, address) for each usable row of a gazetteer file."""
+    with open(path, newline="", encoding="utf-8") as f:
+        if not path.endswith(".csv"):
+            for fields in csv.reader(f, delimiter="\t", quoting=csv.QUOTE_NONE):
+                if len(fields) <= GEONAMES_COUNTRY:
+                    continue
+                yield float(fields[GEONAMES_LAT]), float(fields[GEONAMES_LNG]), {
+                    "address_text": normalize_address(fields[GEONAMES_NAME]),
+                    "components": {"feature_code": fields[GEONAMES_FEATURE], "country_code": fields[GEONAMES_COUNTRY]},
+                }
+            return
+
+        for row in csv.DictReader(f):
+            lat, lng, name = _pick(row, LAT_COLUMNS), _pick(row, LNG_COLUMNS), _pick(row, NAME_COLUMNS)
+            if lat is None or lng is None or not normalize_address(name):
+                continue
+            used = set(LAT_COLUMNS + LNG_COLUMNS + NAME_COLUMNS)
+            yield float(lat), float(lng), {
+                "address_text": normalize_address(name),
+                "components": {k: v for k, v in row.items() if k not in used and v},
+            }
+
+
+def seed_cells(places, radius_cells, cell_degrees):
+    """Cell -> address of the nearest place, over each place's cell and `radius_cells` around it."""
+    best = {}
+    offsets = range(-radius_cells, radius_cells + 1)
+    for lat, lng, address in places:
+        clat, clng = cell_of(lat, lng, cell_degrees)
+        for dy in offsets:
+            for dx in offsets:
+                cell = (clat + dy, clng + dx)
+                # Squared distance from the cell centre, in cell units (fine for ranking)
+                d2 = (cell[0] - lat / cell_degrees) ** 2 + (cell[1] - lng / cell_degrees) ** 2
+                if cell not in best or d2 < best[cell][0]:
+                    best[cell] = (d2, address)
+    return {cell: address for cell, (_, address) in best.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", help="Gazetteer file (.csv, or GeoNames .txt)")
+    parser.add_argument("--radius-cells", type=int, default=0, help="Also fill this many cells around each place")
+    parser.add_argument("--replace", action="store_true", help="Overwrite cells already in the cache")
+    parser.add_argument("--purge-expired", action="store_true", help="Drop provider answers older than GEOCODE_CACHE_TTL_DAYS")
+    parser.add_argument("--stats", action="store_true")
+    parser.add_argument("--path", default=GEOCODE_CACHE_PATH)
+    args = parser.parse_args()
+    setup_logging()
+
+    store = GeocodeStore(args.path, GEOCODE_CELL_DEGREES)
+
+    if args.seed:
+        cells = seed_cells(read_places(args.seed), args.radius_cells, GEOCODE_CELL_DEGREES)
+        store.put_many(((cell, address, "gazetteer") for cell, address in cells.items()), replace=args.replace)
+        logger.info("Seeded geocode cache", extra={"file": args.seed, "cells": len(cells), "path": args.path})
+
+    if args.purge_expired:
+        purged = store.purge_expired(GEOCODE_CACHE_TTL_DAYS * 86400)
+        logger.info("Purged expired geocode cells", extra={"count": purged})
+
+    if args.stats or not (args.seed or args.purge_expired):
+        print(f"{args.path} (cell {GEOCODE_CELL_DEGREES} degrees)")
+        for source, count in sorted(store.stats().items()):
+            print(f"  {source:<12} {count:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Manage the monthly partitions of the transactions table.
+
+    python -m app.cli.partitions --convert      # one-off: partition an existing plain table
+    python -m app.cli.partitions --ensure       # create upcoming months
+    python -m app.cli.partitions --archive --retention-months 24
+
+The job worker runs --ensure, and --archive when TRANSACTION_RETENTION_MONTHS
+is set, every PARTITION_MAINTENANCE_SECONDS. Archives are written to
+TRANSACTION_ARCHIVE_DIR as <partition>.csv.gz with a <partition>.json
+manifest (row count and sha256).
+"""
+import argparse
+import logging
+
+from app.core.config import (
+    TRANSACTION_ARCHIVE_DIR,
+    TRANSACTION_PARTITIONS_AHEAD,
+    TRANSACTION_RETENTION_MONTHS,
+)
+from app.core.logs import setup_logging
+from app.database import SessionLocal
+from app.services.partitions import (
+    archive_old_partitions,
+    convert_to_partitioned,
+    ensure_partitions,
+    is_partitioned,
+    list_partitions,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--convert", action="store_true", help="Rebuild a plain transactions table as a partitioned one")
+    parser.add_argument("--ensure", action="store_true", help="Create partitions through --months-ahead")
+    parser.add_argument("--archive", action="store_true", help="Archive and drop months older than --retention-months")
+    parser.add_argument("--months-ahead", type=int, default=TRANSACTION_PARTITIONS_AHEAD)
+    parser.add_argument("--retention-months", type=int, default=TRANSACTION_RETENTION_MONTHS)
+    parser.add_argument("--archive-dir", default=TRANSACTION_ARCHIVE_DIR)
+    args = parser.parse_args()
+    setup_logging()
+
+    db = SessionLocal()
+    try:
+        if args.convert:
+            if convert_to_partitioned(db, args.months_ahead):
+                logger.info("Converted transactions to a partitioned table")
+            else:
+                logger.info("Transactions table is already partitioned")
+        elif not is_partitioned(db):
+            raise SystemExit("transactions is not partitioned; run with --convert first")
+
+        if args.ensure:
+            created = ensure_partitions(db, args.months_ahead)
+            logger.info("Ensured transaction partitions", extra={"partitions": created})
+
+        if args.archive:
+            if args.retention_months <= 0:
+                raise SystemExit("--archive needs --retention-months > 0")
+            archived = archive_old_partitions(db, args.retention_months, args.archive_dir)
+            logger.info("Archived transaction partitions", extra={"partitions": [a["partition"] for a in archived]})
+
+        for name, month in list_partitions(db):
+            print(f"{name}\t{month.isoformat()}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
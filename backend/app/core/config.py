@@ -1,10 +1,118 @@
 import os
+from pathlib import Path
 from dotenv import load_dotenv
 
 load_dotenv()
 
+_BACKEND_ROOT = Path(__file__).resolve().parent.parent.parent
+
 ADMIN_EMAILS = set(
     email.strip().lower()
     for email in os.getenv("ADMIN_EMAILS", "").split(",")
     if email.strip()
-)
\ No newline at end of file
+)
+
+# Serve large list endpoints through orjson instead of jsonable_encoder/Pydantic
+FAST_JSON_RESPONSES = os.getenv("FAST_JSON_RESPONSES", "false").lower() in ("1", "true", "yes")
+
+# Collection depot, used as the default origin for distance filters
+DEPOT_LAT = float(os.getenv("DEPOT_LAT")) if os.getenv("DEPOT_LAT") else None
+DEPOT_LNG = float(os.getenv("DEPOT_LNG")) if os.getenv("DEPOT_LNG") else None
+
+# Fan change-feed events out through PostgreSQL LISTEN/NOTIFY so every worker sees them
+CHANGE_FEED_PG_NOTIFY = os.getenv("CHANGE_FEED_PG_NOTIFY", "false").lower() in ("1", "true", "yes")
+
+# Bin telemetry ingestion: readings are buffered and written in bulk per flush; a batch
+# that fails this many flushes is dropped
+TELEMETRY_FLUSH_SIZE = int(os.getenv("TELEMETRY_FLUSH_SIZE", "5000"))
+TELEMETRY_FLUSH_INTERVAL = float(os.getenv("TELEMETRY_FLUSH_INTERVAL", "1.0"))
+TELEMETRY_MAX_BUFFERED = int(os.getenv("TELEMETRY_MAX_BUFFERED", "200000"))
+TELEMETRY_FLUSH_ATTEMPTS = int(os.getenv("TELEMETRY_FLUSH_ATTEMPTS", "3"))
+
+# Fill-level forecasting: refresh cadence and how much history feeds the fill-rate estimate
+FORECAST_REFRESH_SECONDS = float(os.getenv("FORECAST_REFRESH_SECONDS", "300"))
+FORECAST_RATE_WINDOW_HOURS = float(os.getenv("FORECAST_RATE_WINDOW_HOURS", "72"))
+FORECAST_TELEMETRY_WINDOW_HOURS = float(os.getenv("FORECAST_TELEMETRY_WINDOW_HOURS", "48"))
+
+# Background job queue (jobs table + app.workers.job_worker)
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+JOB_BACKOFF_BASE_SECONDS = float(os.getenv("JOB_BACKOFF_BASE_SECONDS", "5"))
+JOB_BACKOFF_MAX_SECONDS = float(os.getenv("JOB_BACKOFF_MAX_SECONDS", "3600"))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))
+JOB_LOCK_TIMEOUT_SECONDS = int(os.getenv("JOB_LOCK_TIMEOUT_SECONDS", "600"))
+JOB_SPOOL_DIR = os.getenv("JOB_SPOOL_DIR", str(_BACKEND_ROOT / "uploads" / "spool"))
+
+# Pickup image derivatives (longest edge in pixels, WebP quality)
+IMAGE_THUMBNAIL_SIZE = int(os.getenv("IMAGE_THUMBNAIL_SIZE", "320"))
+IMAGE_PREVIEW_SIZE = int(os.getenv("IMAGE_PREVIEW_SIZE", "1280"))
+IMAGE_WEBP_QUALITY = int(os.getenv("IMAGE_WEBP_QUALITY", "80"))
+
+# Pickup images classified per model call by the classify_pickup_image job
+PICKUP_CLASSIFY_BATCH_SIZE = int(os.getenv("PICKUP_CLASSIFY_BATCH_SIZE", "16"))
+
+# Object storage for pickup images: "supabase" or "local" (content-addressed files served at /media)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "supabase").lower()
+LOCAL_STORAGE_DIR = os.getenv("LOCAL_STORAGE_DIR", str(_BACKEND_ROOT / "uploads" / "storage"))
+PUBLIC_BASE_URL = os.getenv("PUBLIC_BASE_URL", "http://127.0.0.1:8000")
+
+# Request instrumentation: requests slower than this are logged with their per-phase breakdown (0 disables)
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "1000"))
+# Stack sampling profiler interval; 0 leaves it off until started through /metrics/profile
+PROFILE_SAMPLE_MS = float(os.getenv("PROFILE_SAMPLE_MS", "0"))
+
+# SQL query profiler: per-route statement counts, N+1 detection and EXPLAIN of slow queries.
+# Off by default, since the EXPLAINs add load on the database
+SQL_PROFILING = os.getenv("SQL_PROFILING", "false").lower() in ("1", "true", "yes")
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+
+# Logging: level, "json" or "text" output, share of sampled success messages kept, and queue bound
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "0.1"))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+# Transactions are range-partitioned by month (app.services.partitions): partitions created
+# ahead of time, months kept before old ones are archived to gzip CSV (0 keeps everything),
+# and how often the job worker runs this maintenance
+TRANSACTION_PARTITIONS_AHEAD = int(os.getenv("TRANSACTION_PARTITIONS_AHEAD", "3"))
+TRANSACTION_RETENTION_MONTHS = int(os.getenv("TRANSACTION_RETENTION_MONTHS", "0"))
+TRANSACTION_ARCHIVE_DIR = os.getenv("TRANSACTION_ARCHIVE_DIR", str(_BACKEND_ROOT / "uploads" / "archive"))
+PARTITION_MAINTENANCE_SECONDS = float(os.getenv("PARTITION_MAINTENANCE_SECONDS", "3600"))
+
+# How often each process checks waste_types for point changes (app.services.points)
+POINTS_REFRESH_SECONDS = float(os.getenv("POINTS_REFRESH_SECONDS", "30"))
+
+# Waste classification: "local" loads the model in every worker process; "pool" sends
+# decoded images to app.workers.inference_server over this Unix socket
+INFERENCE_MODE = os.getenv("INFERENCE_MODE", "local").lower()
+INFERENCE_SOCKET = os.getenv("INFERENCE_SOCKET", "/tmp/remat-inference.sock")
+INFERENCE_TIMEOUT_SECONDS = float(os.getenv("INFERENCE_TIMEOUT_SECONDS", "30"))
+# Opt-in test-time augmentation (flipped/zoomed views averaged in one batch), and the
+# temperatures written by app.cli.eval_classifier --fit-calibration
+INFERENCE_TTA = os.getenv("INFERENCE_TTA", "false").lower() in ("1", "true", "yes")
+INFERENCE_CALIBRATION_PATH = os.getenv("INFERENCE_CALIBRATION_PATH", str(_BACKEND_ROOT / "Models" / "calibration.json"))
+
+# How long Idempotency-Key responses are kept for replay before the job worker purges them
+IDEMPOTENCY_KEY_TTL_HOURS = float(os.getenv("IDEMPOTENCY_KEY_TTL_HOURS", "24"))
+
+# Daily pickup planning (app.services.pickup_planner): requests closer than this join one
+# cluster, preferred times are grouped into windows of this many hours, and days and
+# windows follow this time zone
+PICKUP_PLAN_EPS_M = float(os.getenv("PICKUP_PLAN_EPS_M", "500"))
+PICKUP_PLAN_WINDOW_HOURS = float(os.getenv("PICKUP_PLAN_WINDOW_HOURS", "2"))
+PICKUP_TIMEZONE = os.getenv("PICKUP_TIMEZONE", "UTC")
+
+# Reverse geocoding (app.services.geocoding): provider ("nominatim", or "none" to answer only
+# from the cache), its URL, User-Agent, timeout and minimum spacing between calls per process
+GEOCODER_PROVIDER = os.getenv("GEOCODER_PROVIDER", "nominatim").lower()
+GEOCODER_URL = os.getenv("GEOCODER_URL", "https://nominatim.openstreetmap.org/reverse")
+GEOCODER_USER_AGENT = os.getenv("GEOCODER_USER_AGENT", "ReMat/1.0")
+GEOCODER_TIMEOUT_SECONDS = float(os.getenv("GEOCODER_TIMEOUT_SECONDS", "5"))
+GEOCODER_MIN_INTERVAL_SECONDS = float(os.getenv("GEOCODER_MIN_INTERVAL_SECONDS", "1.0"))
+# Geocode cache: grid cell in degrees (0.0005 is about 55 m), in-process LRU entries, the
+# SQLite store shared by processes on the host, and how long provider answers are kept
+GEOCODE_CELL_DEGREES = float(os.getenv("GEOCODE_CELL_DEGREES", "0.0005"))
+GEOCODE_CACHE_SIZE = int(os.getenv("GEOCODE_CACHE_SIZE", "50000"))
+GEOCODE_CACHE_PATH = os.getenv("GEOCODE_CACHE_PATH", str(_BACKEND_ROOT / "uploads" / "geocode_cache.sqlite3"))
+GEOCODE_CACHE_TTL_DAYS = float(os.getenv("GEOCODE_CACHE_TTL_DAYS", "90"))
@@ -0,0 +1,274 @@
+"""
+Per-request timing spans, Prometheus-style histograms and a stack sampler.
+
+    with span("osrm"): ...        # or @span("osrm") on a function
+
+Spans add their duration to the current request's trace (a contextvar, so
+work run in the threadpool is attributed to the request that started it)
+and to a process-wide histogram per phase. TimingMiddleware opens the
+trace, records the request histogram and logs slow requests with their
+breakdown. Metrics are per process; with several uvicorn workers each
+scrape sees the worker that served it.
+"""
+import bisect
+import contextvars
+import functools
+import logging
+import sys
+import threading
+import time
+from collections import Counter
+
+from app.core.config import PROFILE_SAMPLE_MS, SLOW_REQUEST_MS
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds, as in the Prometheus client defaults
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+_trace = contextvars.ContextVar("request_trace", default=None)
+_request_hooks = []
+_histograms = []
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by a tuple of label values."""
+
+    def __init__(self, name, help_text, label_names, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+        _histograms.append(self)
+
+    def observe(self, labels, value):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][bisect.bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {labels: (list(counts), total, n) for labels, (counts, total, n) in self._series.items()}
+        for labels, (counts, total, n) in sorted(series.items()):
+            base = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.label_names, labels))
+            sep = "," if base else ""
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{base}{sep}le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{base}{sep}le="+Inf"}} {n}')
+            suffix = f"{{{base}}}" if base else ""
+            lines.append(f"{self.name}_sum{suffix} {total}")
+            lines.append(f"{self.name}_count{suffix} {n}")
+        return "\n".join(lines)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REQUEST_SECONDS = Histogram(
+    "remat_http_request_duration_seconds",
+    "HTTP request latency by route template and status code.",
+    ("method", "route", "status"),
+)
+SPAN_SECONDS = Histogram(
+    "remat_span_duration_seconds",
+    "Time spent in an instrumented phase (auth, db, model_predict, ...).",
+    ("phase",),
+)
+
+
+class RequestTrace:
+    # `data` holds per-request state of other collectors (e.g. the query profiler)
+    __slots__ = ("spans", "counts", "data")
+
+    def __init__(self):
+        self.spans = Counter()
+        self.counts = Counter()
+        self.data = {}
+
+    def add(self, name, seconds):
+        self.spans[name] += seconds
+        self.counts[name] += 1
+
+
+def current_trace():
+    return _trace.get()
+
+
+def on_request_end(fn):
+    """Register `fn(route, trace)` to run after every HTTP request; usable as a decorator."""
+    _request_hooks.append(fn)
+    return fn
+
+
+def record_span(name, seconds):
+    """Attribute `seconds` to a phase; also usable from callbacks that time themselves."""
+    SPAN_SECONDS.observe((name,), seconds)
+    trace = _trace.get()
+    if trace is not None:
+        trace.add(name, seconds)
+
+
+class span:
+    """Time a block or, as a decorator, every call of a function."""
+
+    def __init__(self, name):
+        self.name = name
+        self._started = []
+
+    def __enter__(self):
+        self._started.append(time.perf_counter())
+        return self
+
+    def __exit__(self, *exc):
+        record_span(self.name, time.perf_counter() - self._started.pop())
+        return False
+
+    def __call__(self, fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record_span(self.name, time.perf_counter() - started)
+        return wrapper
+
+
+def instrument_engine(engine):
+    """Record every statement executed on `engine` as a "db" span."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        record_span("db", time.perf_counter() - conn.info["query_started"].pop())
+
+
+class TimingMiddleware:
+    """Pure ASGI middleware, so streaming responses are not buffered and the trace spans the whole request."""
+
+    def __init__(self, app, slow_request_ms=SLOW_REQUEST_MS):
+        self.app = app
+        self.slow_request_ms = slow_request_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace()
+        token = _trace.set(trace)
+        status = 500
+        streaming = False
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status, streaming
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                streaming = (b"content-type", b"text/event-stream") in [
+                    (k.lower(), v.split(b";")[0].strip()) for k, v in message.get("headers", [])
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _trace.reset(token)
+            # Route templates keep label cardinality bounded; unmatched paths share one label
+            route = getattr(scope.get("route"), "path", None) or "<unmatched>"
+            REQUEST_SECONDS.observe((scope["method"], route, str(status)), elapsed)
+            for hook in _request_hooks:
+                try:
+                    hook(f"{scope['method']} {route}", trace)
+                except Exception:
+                    logger.exception("Request hook failed")
+
+            # Event streams stay open for as long as the client listens; their duration is not latency
+            if self.slow_request_ms and not streaming and elapsed * 1000 >= self.slow_request_ms:
+                logger.warning("Slow request", extra={
+                    "method": scope["method"],
+                    "route": route,
+                    "status": status,
+                    "duration_ms": round(elapsed * 1000, 1),
+                    "spans_ms": {name: round(seconds * 1000, 1) for name, seconds in trace.spans.most_common()},
+                    "span_counts": dict(trace.counts),
+                })
+
+
+class StackSampler:
+    """
+    Statistical profiler: a background thread samples every thread's stack
+    each interval and counts them in collapsed form ("a;b;c N"), the format
+    py-spy --format raw and flamegraph.pl use. Off unless started.
+    """
+
+    def __init__(self, interval_ms=PROFILE_SAMPLE_MS, max_stacks=20000):
+        self.interval_ms = interval_ms
+        self.max_stacks = max_stacks
+        self.stacks = Counter()
+        self.samples = 0
+        self._stopping = threading.Event()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self, interval_ms=None):
+        if interval_ms:
+            self.interval_ms = interval_ms
+        if self._thread is None and self.interval_ms > 0:
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def reset(self):
+        self.stacks = Counter()
+        self.samples = 0
+
+    def collapsed(self):
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stopping.wait(self.interval_ms / 1000):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                names = []
+                while frame is not None:
+                    code = frame.f_code
+                    names.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+                    frame = frame.f_back
+                stack = ";".join(reversed(names))
+                if stack in self.stacks or len(self.stacks) < self.max_stacks:
+                    self.stacks[stack] += 1
+            self.samples += 1
+
+
+stack_sampler = StackSampler()
+
+
+def render_metrics():
+    return "\n".join(h.render() for h in _histograms) + "\n"
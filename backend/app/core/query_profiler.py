@@ -0,0 +1,196 @@
+"""
+SQLAlchemy event-based query profiler.
+
+Every statement executed during a request is recorded on the request's
+trace (see app.core.instrumentation). When the request ends its
+statements are folded into per-route totals:
+
+  - statements and database time per request;
+  - N+1 suspects: one statement shape run N_PLUS_ONE_THRESHOLD or more
+    times with different parameters;
+  - repeats: the same statement run more than once with the same
+    parameters.
+
+Statements slower than SLOW_QUERY_MS are EXPLAINed on a background thread
+over a separate connection, at most once per statement shape.
+"""
+import queue
+import re
+import threading
+import time
+from collections import Counter, deque
+
+from sqlalchemy import event
+
+from app.core.config import N_PLUS_ONE_THRESHOLD, SLOW_QUERY_MS
+from app.core.instrumentation import Histogram, current_trace, on_request_end
+
+STATEMENTS_PER_REQUEST = Histogram(
+    "remat_db_statements_per_request",
+    "Database round-trips per HTTP request by route.",
+    ("route",),
+    buckets=(1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+)
+
+_IN_LIST = re.compile(r"IN \((?:%\([^)]+\)s|%s|\?)(?:, (?:%\([^)]+\)s|%s|\?))*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+_EXPLAINABLE = ("SELECT", "WITH", "UPDATE", "DELETE", "INSERT")
+
+
+def normalize(statement: str) -> str:
+    """Statement shape: whitespace collapsed, expanded IN lists folded to IN (...)."""
+    return _IN_LIST.sub("IN (...)", _WHITESPACE.sub(" ", statement).strip())
+
+
+def _params_key(parameters):
+    try:
+        if isinstance(parameters, dict):
+            return repr(sorted(parameters.items()))
+        return repr(parameters)
+    except Exception:
+        return None
+
+
+class RouteStats:
+    __slots__ = ("requests", "statements", "max_statements", "db_seconds", "shapes", "n_plus_one", "repeated")
+
+    def __init__(self):
+        self.requests = 0
+        self.statements = 0
+        self.max_statements = 0
+        self.db_seconds = 0.0
+        self.shapes = Counter()
+        self.n_plus_one = Counter()
+        self.repeated = Counter()
+
+    def to_dict(self):
+        return {
+            "requests": self.requests,
+            "statements_per_request": round(self.statements / self.requests, 2) if self.requests else 0,
+            "max_statements": self.max_statements,
+            "db_ms_per_request": round(self.db_seconds * 1000 / self.requests, 2) if self.requests else 0,
+            "top_statements": [{"statement": s, "count": n} for s, n in self.shapes.most_common(5)],
+            "n_plus_one": [{"statement": s, "requests": n} for s, n in self.n_plus_one.most_common(5)],
+            "repeated": [{"statement": s, "requests": n} for s, n in self.repeated.most_common(5)],
+        }
+
+
+class QueryProfiler:
+    def __init__(self, slow_query_ms=SLOW_QUERY_MS, n_plus_one_threshold=N_PLUS_ONE_THRESHOLD):
+        self.slow_query_ms = slow_query_ms
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.routes = {}
+        self.slow_queries = deque(maxlen=50)
+        self._explained = set()
+        self._explain_queue = queue.Queue(maxsize=100)
+        self._lock = threading.Lock()
+        self._engine = None
+        self._thread = None
+
+    def attach(self, engine):
+        self._engine = engine
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+        on_request_end(self.finish_request)
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("profiler_started", []).append(time.perf_counter())
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["profiler_started"].pop()
+        shape = normalize(statement)
+        trace = current_trace()
+        if trace is not None:
+            trace.data.setdefault("queries", []).append(
+                (shape, None if executemany else _params_key(parameters), elapsed)
+            )
+
+        if self.slow_query_ms and elapsed * 1000 >= self.slow_query_ms:
+            self._slow(shape, statement, None if executemany else parameters, elapsed)
+
+    def finish_request(self, route, trace):
+        queries = trace.data.get("queries", [])
+        STATEMENTS_PER_REQUEST.observe((route,), len(queries))
+        if not queries:
+            return
+
+        shapes = Counter(shape for shape, _, _ in queries)
+        calls = Counter((shape, key) for shape, key, _ in queries if key is not None)
+        distinct = Counter(shape for shape, _ in calls)
+
+        with self._lock:
+            stats = self.routes.get(route)
+            if stats is None:
+                stats = self.routes[route] = RouteStats()
+            stats.requests += 1
+            stats.statements += len(queries)
+            stats.max_statements = max(stats.max_statements, len(queries))
+            stats.db_seconds += sum(seconds for _, _, seconds in queries)
+            stats.shapes.update(shapes)
+            for shape, count in distinct.items():
+                if count >= self.n_plus_one_threshold:
+                    stats.n_plus_one[shape] += 1
+            for shape in {shape for (shape, _), count in calls.items() if count > 1}:
+                stats.repeated[shape] += 1
+
+    def _slow(self, shape, statement, parameters, elapsed):
+        entry = {
+            "statement": shape,
+            "duration_ms": round(elapsed * 1000, 2),
+            "at": time.time(),
+            "plan": None,
+        }
+        self.slow_queries.append(entry)
+        with self._lock:
+            if shape in self._explained or not shape.upper().startswith(_EXPLAINABLE):
+                return
+            self._explained.add(shape)
+        try:
+            self._explain_queue.put_nowait((entry, statement, parameters))
+        except queue.Full:
+            return
+        self._ensure_thread()
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._explain_loop, name="query-explain", daemon=True)
+            self._thread.start()
+
+    def _explain_loop(self):
+        while True:
+            entry, statement, parameters = self._explain_queue.get()
+            try:
+                entry["plan"] = self._explain(statement, parameters)
+            except Exception as e:
+                entry["plan"] = f"EXPLAIN failed: {e}"
+
+    def _explain(self, statement, parameters):
+        # Plain EXPLAIN plans the statement without running it, so DML is safe here.
+        # A raw DBAPI cursor bypasses the engine events, so this is not profiled itself.
+        raw = self._engine.raw_connection()
+        try:
+            cursor = raw.cursor()
+            cursor.execute("EXPLAIN " + statement, parameters)
+            return "\n".join(row[0] for row in cursor.fetchall())
+        finally:
+            raw.rollback()
+            raw.close()
+
+    def report(self, limit=20):
+        with self._lock:
+            routes = sorted(self.routes.items(), key=lambda item: item[1].statements / item[1].requests, reverse=True)
+            return {
+                "routes": {route: stats.to_dict() for route, stats in routes[:limit]},
+                "slow_queries": list(self.slow_queries),
+                "n_plus_one_threshold": self.n_plus_one_threshold,
+                "slow_query_ms": self.slow_query_ms,
+            }
+
+    def reset(self):
+        with self._lock:
+            self.routes = {}
+            self.slow_queries.clear()
+            self._explained = set()
+
+
+query_profiler = QueryProfiler()
@@ -1,6 +1,9 @@
 from fastapi import Header, HTTPException, status
 from firebase_admin import auth
 
+from app.core.instrumentation import span
+
+@span("auth")
 def verify_firebase_token(authorization: str = Header(...)):
     if not authorization.startswith("Bearer "):
         raise HTTPException(
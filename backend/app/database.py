@@ -3,11 +3,18 @@ from sqlalchemy.orm import sessionmaker,declarative_base
 from dotenv import load_dotenv
 import os
 
+from app.core.config import SQL_PROFILING
+from app.core.instrumentation import instrument_engine
+from app.core.query_profiler import query_profiler
+
 load_dotenv()
 
 DATABASE_URL=os.getenv("DATABASE_URL")
 
 engine=create_engine(DATABASE_URL)
+instrument_engine(engine)
+if SQL_PROFILING:
+    query_profiler.attach(engine)
 SessionLocal=sessionmaker(bind=engine)
 
 Base=declarative_base()
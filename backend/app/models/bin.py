@@ -20,6 +20,9 @@ class Bin(Base):
     status = Column(String, nullable=False, default="active")
     # active | full | maintenance
 
+    # recorded_at of the telemetry reading behind fill_level; older readings are ignored
+    last_reading_at = Column(DateTime(timezone=True))
+
     created_at = Column(
         DateTime(timezone=True),
         server_default=func.now(),
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, BigInteger, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class BinTelemetry(Base):
+    __tablename__ = "bin_telemetry"
+    __table_args__ = (
+        Index("ix_bin_telemetry_bin_id_recorded_at", "bin_id", "recorded_at"),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+
+    bin_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("bins.id", ondelete="CASCADE"),
+        nullable=False
+    )
+
+    # Same units as bins.fill_level (0..capacity)
+    fill_level = Column(Integer, nullable=False)
+
+    recorded_at = Column(DateTime(timezone=True), nullable=False)
+
+    received_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
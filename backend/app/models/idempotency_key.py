@@ -0,0 +1,28 @@
+from sqlalchemy import Column, String, DateTime, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        # Expired keys are purged by the job worker
+        Index("ix_idempotency_keys_created_at", "created_at"),
+    )
+
+    # Client-chosen Idempotency-Key header value
+    key = Column(String, primary_key=True)
+
+    # Operation and target, e.g. "pickup_accept:<id>", and a hash of the request parameters
+    scope = Column(String, nullable=False)
+    request_hash = Column(String, nullable=False)
+
+    # Response body replayed to retries
+    response = Column(JSONB)
+
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
@@ -0,0 +1,35 @@
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Workers claim with: status = 'pending' AND run_at <= now() ORDER BY run_at
+        Index("ix_jobs_status_run_at", "status", "run_at"),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+
+    kind = Column(String, nullable=False)
+    payload = Column(JSONB, nullable=False, default=dict)
+
+    status = Column(String, nullable=False, default="pending")
+    # pending | running | done | dead
+
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False)
+    last_error = Column(String)
+
+    run_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    locked_by = Column(String)
+    locked_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
@@ -1,6 +1,6 @@
 import uuid
-from sqlalchemy import (Column, String, Integer, DateTime, Enum, ForeignKey)
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import (Column, String, Integer, Numeric, DateTime, Enum, ForeignKey, Index)
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.sql import func
 from geoalchemy2 import Geography
 
@@ -10,6 +10,12 @@ from app.models.enums import PickupStatus
 
 class PickupRequest(Base):
     __tablename__ = "pickup_requests"
+    __table_args__ = (
+        # Admin queue: filter by status, keyset-paginate by created_at
+        Index("ix_pickup_requests_status_created_at", "status", "created_at"),
+        # Daily pickup plans: accepted requests by preferred day
+        Index("ix_pickup_requests_status_preferred_datetime", "status", "preferred_datetime"),
+    )
 
     id = Column(
         UUID(as_uuid=True),
@@ -20,6 +26,9 @@ class PickupRequest(Base):
     user_id = Column(String,nullable=False)
 
     image_url = Column(String, nullable=False)
+    # WebP derivatives generated by the upload job; may 404 until it has run
+    thumbnail_url = Column(String)
+    preview_url = Column(String)
 
     location = Column(
         Geography(geometry_type="POINT", srid=4326),
@@ -45,8 +54,18 @@ class PickupRequest(Base):
 
     points_awarded = Column(Integer)
 
+    # Filled asynchronously by the classify_pickup_image job
+    predicted_type = Column(String)
+    predicted_confidence = Column(Numeric(5, 4))
+    predicted_probabilities = Column(JSONB)
+    suggested_points = Column(Integer)
+    classified_at = Column(DateTime(timezone=True))
+
     admin_id = Column(String, nullable=True)
 
+    # Bumped by every write; clients send it back as expected_version (optimistic concurrency)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
     created_at = Column(
         DateTime(timezone=True),
         server_default=func.now()
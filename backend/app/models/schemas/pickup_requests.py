@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
 from uuid import UUID
 
 class PickupRequestBase(BaseModel):
@@ -19,28 +19,67 @@ class PickupRequestCancel(BaseModel):
 
 
 class PickupRequestAccept(BaseModel):
-    points_awarded: int
+    # Defaults to the request's suggested_points when omitted
+    points_awarded: Optional[int] = None
+    # The `version` the admin saw; the request is refused with 409 if it has changed since
+    expected_version: Optional[int] = None
 
 
 class PickupRequestReject(BaseModel):
     reason: Optional[str] = None
+    expected_version: Optional[int] = None
+
+
+class PickupBulkFilter(BaseModel):
+    # Admin queue filters; only open requests are ever selected
+    e_waste_type: Optional[str] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    near_lat: Optional[float] = None
+    near_lng: Optional[float] = None
+    radius_m: Optional[float] = None
+
+
+class PickupBulkSelection(BaseModel):
+    # Either `ids`, or a `filter` matching up to `limit` open requests, oldest first
+    ids: Optional[List[UUID]] = None
+    filter: Optional[PickupBulkFilter] = None
+    limit: int = 500
+
+
+class PickupBulkAccept(PickupBulkSelection):
+    # Defaults to each request's suggested_points when omitted
+    points_awarded: Optional[int] = None
+
+
+class PickupBulkReject(PickupBulkSelection):
+    reason: Optional[str] = None
+
+
+class PickupBulkReassign(PickupBulkSelection):
+    # Admin user ID the requests are handed to
+    assignee: str
 
 
 class PickupRequestUpdateLocation(BaseModel):
     latitude: float
     longitude: float
     address_text: Optional[str] = None
+    expected_version: Optional[int] = None
 
 
 class PickupRequestOut(BaseModel):
     id: UUID
     image_url: str
+    thumbnail_url: Optional[str] = None
+    preview_url: Optional[str] = None
     e_waste_type: Optional[str] = None
 
     preferred_datetime: datetime
     contact_number: str
     status: str
     points_awarded: Optional[int]
+    version: int = 1
 
     created_at: datetime
 
@@ -51,6 +90,8 @@ class PickupRequestOut(BaseModel):
 class PickupRequestDetailsOut(BaseModel):
     id: UUID
     image_url: str
+    thumbnail_url: Optional[str] = None
+    preview_url: Optional[str] = None
     e_waste_type: Optional[str] = None
 
     preferred_datetime: datetime
@@ -61,6 +102,12 @@ class PickupRequestDetailsOut(BaseModel):
     address_text: Optional[str]
     rejection_reason: Optional[str]
 
+    predicted_type: Optional[str] = None
+    predicted_confidence: Optional[float] = None
+    predicted_probabilities: Optional[Dict[str, float]] = None
+    suggested_points: Optional[int] = None
+    version: int = 1
+
     latitude: float
     longitude: float
 
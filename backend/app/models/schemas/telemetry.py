@@ -0,0 +1,15 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+
+class TelemetryReading(BaseModel):
+    bin_id: UUID
+    # Stored as INTEGER; anything larger would fail the whole flush
+    fill_level: int = Field(ge=0, le=2**31 - 1)
+    recorded_at: Optional[datetime] = None
+
+
+class TelemetryBatch(BaseModel):
+    readings: list[TelemetryReading]
@@ -0,0 +1,89 @@
+from sqlalchemy import Column, String, Integer, BigInteger, Date, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+# Rollups of transactions and accepted pickups, maintained by app.services.stats
+# and rebuilt from history by app.cli.backfill_stats
+
+
+class UserWasteStats(Base):
+    __tablename__ = "user_waste_stats"
+
+    user_id = Column(
+        String,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    waste_type = Column(String, primary_key=True)
+
+    deposits = Column(Integer, nullable=False, default=0)
+    deposit_points = Column(BigInteger, nullable=False, default=0)
+
+    # Accepted pickup requests
+    pickups = Column(Integer, nullable=False, default=0)
+    pickup_points = Column(BigInteger, nullable=False, default=0)
+
+    last_activity_at = Column(DateTime(timezone=True))
+
+
+class BinDailyStats(Base):
+    __tablename__ = "bin_daily_stats"
+
+    bin_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("bins.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    # UTC day
+    day = Column(Date, primary_key=True)
+
+    deposits = Column(Integer, nullable=False, default=0)
+    points = Column(BigInteger, nullable=False, default=0)
+
+
+class BinUserStats(Base):
+    __tablename__ = "bin_user_stats"
+    __table_args__ = (
+        # Top recyclers per bin
+        Index("ix_bin_user_stats_bin_id_points", "bin_id", "points"),
+    )
+
+    bin_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("bins.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    user_id = Column(
+        String,
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+
+    deposits = Column(Integer, nullable=False, default=0)
+    points = Column(BigInteger, nullable=False, default=0)
+    last_deposit_at = Column(DateTime(timezone=True))
+
+
+class StatsBackfillState(Base):
+    """Keyset checkpoint of a running backfill, committed with each chunk."""
+
+    __tablename__ = "stats_backfill_state"
+
+    name = Column(String, primary_key=True)
+
+    # Transactions created before this are the backfill's; later ones are counted live
+    cutoff = Column(DateTime(timezone=True), nullable=False)
+    last_created_at = Column(DateTime(timezone=True))
+    last_id = Column(UUID(as_uuid=True))
+
+    rows_done = Column(BigInteger, nullable=False, default=0)
+    finished_at = Column(DateTime(timezone=True))
+
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False
+    )
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class StoredObject(Base):
+    __tablename__ = "stored_objects"
+
+    # Content-addressed storage path, e.g. pickups/<sha256>.jpg
+    path = Column(String, primary_key=True)
+
+    sha256 = Column(String, nullable=False)
+    size = Column(BigInteger, nullable=False)
+    content_type = Column(String, nullable=False)
+
+    # Number of rows (pickup requests) pointing at this object
+    ref_count = Column(Integer, nullable=False, default=1)
+
+    created_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False
+    )
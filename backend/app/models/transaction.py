@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Numeric, DateTime, ForeignKey
+from sqlalchemy import Column, String, Integer, Numeric, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from app.database import Base
@@ -6,7 +6,16 @@ from app.database import Base
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Keyset order of the stats backfill
+        Index("ix_transactions_created_at_id", "created_at", "id"),
+        # A user's history, newest first
+        Index("ix_transactions_user_id_created_at", "user_id", "created_at"),
+        # Monthly partitions, managed by app.services.partitions
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
+    # The partition key has to be part of the primary key
     id = Column(UUID(as_uuid=True), primary_key=True)
 
     user_id = Column(
@@ -29,5 +38,6 @@ class Transaction(Base):
     created_at = Column(
         DateTime(timezone=True),
         server_default=func.now(),
+        primary_key=True,
         nullable=False
     )
@@ -1,9 +1,23 @@
-from sqlalchemy import Column, String, Integer
+from sqlalchemy import Column, String, Integer, DateTime
+from sqlalchemy.sql import func
 from app.database import Base
 
+# Point tables for scoring, cached in process by app.services.points
 class WasteType(Base):
     __tablename__ = "waste_types"
 
     id = Column(String, primary_key=True)
     name = Column(String)
+    # Position in the classifier's output; NULL matches by name
+    class_index = Column(Integer, unique=True)
     base_points = Column(Integer)
+    # Cap used when confidence is low or the user overrides the model
+    manual_points = Column(Integer)
+
+    # Part of the cache's change fingerprint; bumped by every edit
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False
+    )
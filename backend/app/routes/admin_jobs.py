@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.services.job_queue import job_metrics, retry_dead
+
+router = APIRouter(prefix="/admin/jobs", tags=["Admin Jobs"])
+
+
+@router.get("/metrics")
+def get_job_metrics(db: Session = Depends(get_db)):
+    return job_metrics(db)
+
+
+@router.post("/dead/retry")
+def retry_dead_jobs(kind: str | None = None, db: Session = Depends(get_db)):
+    return {"requeued": retry_dead(db, kind)}
@@ -1,36 +1,125 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy import select, text
+from datetime import datetime
 from uuid import UUID
 
+from app.core.config import DEPOT_LAT, DEPOT_LNG, FAST_JSON_RESPONSES
 from app.database import get_db
 from app.models.pickup_request import PickupRequest
-from app.models.user import User
 from app.models.enums import PickupStatus
 from app.models.schemas.pickup_requests import (
     PickupRequestOut,
     PickupRequestAccept,
     PickupRequestDetailsOut,
+    PickupRequestReject,
+    PickupBulkAccept,
+    PickupBulkReassign,
+    PickupBulkReject,
+)
+from app.services import idempotency
+from app.services.change_feed import publish
+from app.services.pickup_decisions import (
+    BULK_MAX,
+    accept_pickup,
+    bulk_accept,
+    bulk_reassign,
+    bulk_reject,
+    reject_pickup,
+)
+from app.services.pickup_queue import (
+    encode_cursor,
+    queue_filters,
+    queue_page_query,
+    queue_status_counts,
+)
+from app.services.serialization import (
+    ROW_CHUNK_SIZE,
+    json_response,
+    rows_response,
+    schema_columns,
 )
 
 
 router = APIRouter(prefix="/admin/pickup-requests", tags=["Admin Pickup Requests"])
 
+# Above this many changed requests a bulk call publishes one "resync" instead of an event per request
+BULK_EVENT_LIMIT = 50
+
 @router.get("", response_model=list[PickupRequestOut])
-def get_admin_pickup_requests(db: Session = Depends(get_db)):
-    return (
-        db.query(PickupRequest)
-        .filter(
-            PickupRequest.status.in_([
-                PickupStatus.open,
-                PickupStatus.accepted,
-                PickupStatus.rejected
-            ])
-        )
-        .order_by(PickupRequest.created_at.desc())
-        .all()
+def get_admin_pickup_requests(
+    response: Response,
+    status: list[PickupStatus] | None = Query(None),
+    e_waste_type: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    near_lat: float | None = None,
+    near_lng: float | None = None,
+    radius_m: float | None = Query(None, gt=0, description="Max distance from near_lat/near_lng or the depot"),
+    cursor: str | None = Query(None, description="X-Next-Cursor from the previous page"),
+    limit: int | None = Query(None, ge=1, le=500),
+    db: Session = Depends(get_db),
+):
+    clauses = queue_filters(
+        statuses=status,
+        e_waste_type=e_waste_type,
+        created_from=created_from,
+        created_to=created_to,
+        near=_resolve_near(near_lat, near_lng),
+        radius_m=radius_m,
+    )
+    query = queue_page_query(
+        schema_columns(PickupRequest, PickupRequestOut),
+        clauses,
+        cursor=cursor,
+        limit=limit,
     )
 
+    if FAST_JSON_RESPONSES and limit is None:
+        result = db.execute(query, execution_options={"yield_per": ROW_CHUNK_SIZE})
+        return rows_response(result)
+
+    rows = db.execute(query).mappings().all()
+
+    headers = {}
+    if limit is not None and len(rows) == limit:
+        headers["X-Next-Cursor"] = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+
+    if FAST_JSON_RESPONSES:
+        return json_response([dict(row) for row in rows], headers=headers)
+
+    response.headers.update(headers)
+    return rows
+
+
+@router.get("/counts")
+def get_admin_pickup_request_counts(
+    e_waste_type: str | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    near_lat: float | None = None,
+    near_lng: float | None = None,
+    radius_m: float | None = Query(None, gt=0),
+    db: Session = Depends(get_db),
+):
+    clauses = queue_filters(
+        statuses=list(PickupStatus),
+        e_waste_type=e_waste_type,
+        created_from=created_from,
+        created_to=created_to,
+        near=_resolve_near(near_lat, near_lng),
+        radius_m=radius_m,
+    )
+    return queue_status_counts(db, clauses)
+
+
+def _resolve_near(near_lat, near_lng):
+    if near_lat is not None and near_lng is not None:
+        return near_lat, near_lng
+    if DEPOT_LAT is not None and DEPOT_LNG is not None:
+        return DEPOT_LAT, DEPOT_LNG
+    return None
+
 
 @router.get("/{request_id}", response_model=PickupRequestDetailsOut)
 def get_admin_pickup_request_by_id(
@@ -42,6 +131,8 @@ def get_admin_pickup_request_by_id(
             SELECT
                 id,
                 image_url,
+                thumbnail_url,
+                preview_url,
                 e_waste_type,
                 preferred_datetime,
                 contact_number,
@@ -49,6 +140,11 @@ def get_admin_pickup_request_by_id(
                 points_awarded,
                 rejection_reason,
                 address_text,
+                predicted_type,
+                predicted_confidence,
+                predicted_probabilities,
+                suggested_points,
+                version,
                 created_at,
                 ST_Y(location::geometry) AS latitude,
                 ST_X(location::geometry) AS longitude
@@ -67,54 +163,163 @@ def get_admin_pickup_request_by_id(
 @router.patch("/{request_id}/accept")
 def accept_pickup_request(
     request_id: UUID,
+    response: Response,
     admin_id: str = Query(..., description="Admin user ID"),
     data: PickupRequestAccept = ...,
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key", max_length=255),
     db: Session = Depends(get_db),
 ):
-    pickup = (
-        db.query(PickupRequest)
-        .filter(PickupRequest.id == request_id)
-        .first()
-    )
+    scope = f"pickup_accept:{request_id}"
+    stored = idempotency.begin(db, idempotency_key, scope, {"admin_id": admin_id, **data.model_dump()})
+    if stored is not None:
+        db.rollback()
+        response.headers["Idempotent-Replayed"] = "true"
+        return stored
 
-    if not pickup:
-        raise HTTPException(404, "Pickup request not found")
+    result = {
+        "message": "Pickup request accepted",
+        **accept_pickup(db, request_id, admin_id, data.points_awarded, data.expected_version),
+    }
+    idempotency.finish(db, idempotency_key, result)
+    db.commit()
 
-    if pickup.status != PickupStatus.open:
-        raise HTTPException(400, "Request already processed")
+    publish("pickups", "accepted", {
+        "id": str(request_id),
+        "status": PickupStatus.accepted.value,
+        "points_awarded": result["points_awarded"],
+        "version": result["version"],
+    })
 
-    pickup.status = PickupStatus.accepted
-    pickup.points_awarded = data.points_awarded
-    pickup.admin_id = admin_id
+    return result
 
-    user = db.query(User).filter(User.id == pickup.user_id).first()
-    if user:
-        user.points += data.points_awarded
 
+@router.patch("/{request_id}/reject")
+def reject_pickup_request(
+    request_id: UUID,
+    response: Response,
+    admin_id: str = Query(..., description="Admin user ID"),
+    data: PickupRequestReject | None = None,
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key", max_length=255),
+    db: Session = Depends(get_db),
+):
+    data = data or PickupRequestReject()
+    scope = f"pickup_reject:{request_id}"
+    stored = idempotency.begin(db, idempotency_key, scope, {"admin_id": admin_id, **data.model_dump()})
+    if stored is not None:
+        db.rollback()
+        response.headers["Idempotent-Replayed"] = "true"
+        return stored
+
+    result = {
+        "message": "Pickup request rejected",
+        **reject_pickup(db, request_id, admin_id, data.reason, data.expected_version),
+    }
+    idempotency.finish(db, idempotency_key, result)
     db.commit()
 
-    return {"message": "Pickup request accepted"}
+    publish("pickups", "rejected", {
+        "id": str(request_id),
+        "status": PickupStatus.rejected.value,
+        "version": result["version"],
+    })
 
+    return result
 
-@router.patch("/{request_id}/reject")
-def reject_pickup_request(
-    request_id: UUID,
+
+@router.post("/bulk/accept")
+def bulk_accept_pickup_requests(
+    response: Response,
     admin_id: str = Query(..., description="Admin user ID"),
+    data: PickupBulkAccept = ...,
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key", max_length=255),
     db: Session = Depends(get_db),
 ):
-    pickup = db.query(PickupRequest).filter(
-        PickupRequest.id == request_id
-    ).first()
+    return _run_bulk(
+        db, response, idempotency_key, "pickup_bulk_accept", {"admin_id": admin_id, **data.model_dump()},
+        lambda ids: bulk_accept(db, ids, admin_id, data.points_awarded),
+        data,
+        "accepted",
+        lambda r: {"status": PickupStatus.accepted.value, "points_awarded": r["points_awarded"]},
+    )
 
-    if not pickup:
-        raise HTTPException(404, "Pickup request not found")
 
-    if pickup.status != PickupStatus.open:
-        raise HTTPException(400, "Request already processed")
+@router.post("/bulk/reject")
+def bulk_reject_pickup_requests(
+    response: Response,
+    admin_id: str = Query(..., description="Admin user ID"),
+    data: PickupBulkReject = ...,
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key", max_length=255),
+    db: Session = Depends(get_db),
+):
+    return _run_bulk(
+        db, response, idempotency_key, "pickup_bulk_reject", {"admin_id": admin_id, **data.model_dump()},
+        lambda ids: bulk_reject(db, ids, admin_id, data.reason),
+        data,
+        "rejected",
+        lambda r: {"status": PickupStatus.rejected.value},
+    )
+
+
+@router.post("/bulk/reassign")
+def bulk_reassign_pickup_requests(
+    response: Response,
+    data: PickupBulkReassign = ...,
+    idempotency_key: str | None = Header(None, alias="Idempotency-Key", max_length=255),
+    db: Session = Depends(get_db),
+):
+    return _run_bulk(
+        db, response, idempotency_key, "pickup_bulk_reassign", data.model_dump(),
+        lambda ids: bulk_reassign(db, ids, data.assignee),
+        data,
+        "updated",
+        lambda r: {"admin_id": data.assignee},
+    )
+
 
-    pickup.status = PickupStatus.rejected
-    pickup.admin_id = admin_id
+def _bulk_ids(db, selection):
+    """The request IDs a bulk call names, or the open ones its filter matches."""
+    if (selection.ids is None) == (selection.filter is None):
+        raise HTTPException(400, "Give either ids or filter")
+    if selection.ids is not None:
+        return selection.ids
 
+    f = selection.filter
+    clauses = queue_filters(
+        statuses=[PickupStatus.open],
+        e_waste_type=f.e_waste_type,
+        created_from=f.created_from,
+        created_to=f.created_to,
+        near=_resolve_near(f.near_lat, f.near_lng),
+        radius_m=f.radius_m,
+    )
+    return db.execute(
+        select(PickupRequest.id)
+        .where(*clauses)
+        .order_by(PickupRequest.created_at, PickupRequest.id)
+        .limit(max(1, min(selection.limit, BULK_MAX)))
+    ).scalars().all()
+
+
+def _run_bulk(db, response, idempotency_key, scope, params, apply, selection, event, event_data):
+    stored = idempotency.begin(db, idempotency_key, scope, params)
+    if stored is not None:
+        db.rollback()
+        response.headers["Idempotent-Replayed"] = "true"
+        return stored
+
+    results = apply(_bulk_ids(db, selection))
+    counts = {}
+    for r in results:
+        counts[r["outcome"]] = counts.get(r["outcome"], 0) + 1
+    result = {"counts": counts, "results": results}
+    idempotency.finish(db, idempotency_key, result)
     db.commit()
 
-    return {"message": "Pickup request rejected"}
+    changed = [r for r in results if "version" in r]
+    if len(changed) > BULK_EVENT_LIMIT:
+        publish("pickups", "resync", {"reason": scope, "count": len(changed)})
+    else:
+        for r in changed:
+            publish("pickups", event, {"id": r["id"], "version": r["version"], **event_data(r)})
+
+    return result
@@ -0,0 +1,67 @@
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.services.points import build_table, load_rows, points_cache
+
+router = APIRouter(prefix="/admin/waste-types", tags=["Admin Waste Types"])
+
+
+class WasteTypePoints(BaseModel):
+    base_points: int | None = Field(None, ge=0)
+    manual_points: int | None = Field(None, ge=0)
+    class_index: int | None = Field(None, ge=0)
+
+
+def _snapshot():
+    table = points_cache.table
+    return {"version": table.version, "waste_types": table.as_list()}
+
+
+@router.get("")
+def get_waste_types():
+    """Point table currently used for scoring in this process."""
+    return _snapshot()
+
+
+@router.put("/{name}")
+def set_waste_type_points(name: str, payload: WasteTypePoints, db: Session = Depends(get_db)):
+    """Change points for a waste type; unset fields keep their current value."""
+    params = {"name": name, **payload.model_dump()}
+    try:
+        # Match on the name, not the id: rows created outside this endpoint may use any id
+        updated = db.execute(
+            text("""
+                UPDATE waste_types
+                SET class_index = COALESCE(:class_index, class_index),
+                    base_points = COALESCE(:base_points, base_points),
+                    manual_points = COALESCE(:manual_points, manual_points),
+                    updated_at = now()
+                WHERE lower(btrim(COALESCE(name, id))) = lower(btrim(:name))
+            """),
+            params,
+        ).rowcount
+        if not updated:
+            db.execute(
+                text("""
+                    INSERT INTO waste_types (id, name, class_index, base_points, manual_points, updated_at)
+                    VALUES (:name, :name, :class_index, :base_points, :manual_points, now())
+                """),
+                params,
+            )
+        # Refuse edits the cache would fail to load, e.g. moving a class onto another's name
+        build_table(load_rows(db))
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=f"class_index {payload.class_index} is already assigned")
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=str(e))
+    db.commit()
+
+    # Other processes pick the change up on their next poll
+    points_cache.refresh(db, force=True)
+    return _snapshot()
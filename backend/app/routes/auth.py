@@ -5,6 +5,7 @@ from app.core.security import verify_firebase_token
 from app.core.config import ADMIN_EMAILS
 from app.database import get_db
 from app.models.user import User
+from app.services.job_queue import enqueue
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
@@ -94,5 +95,7 @@ def delete_account(decoded_token=Depends(verify_firebase_token), db: Session=Dep
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     db.delete(user)
+    # Pickup requests and their images are removed by the job worker
+    enqueue(db, "purge_user_pickups", {"user_id": uid})
     db.commit()
     return {"message": "Account deleted successfully"}
\ No newline at end of file
@@ -2,6 +2,9 @@ from fastapi import APIRouter, Query, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from app.database import SessionLocal
 from sqlalchemy.sql import text
+from app.core.config import FAST_JSON_RESPONSES
+from app.services.serialization import ROW_CHUNK_SIZE, rows_response
+from app.services.change_feed import publish
 
 from pydantic import BaseModel
 
@@ -37,6 +40,10 @@ def get_all_bins(db: Session = Depends(get_db)):
         ORDER BY created_at DESC
     """)
 
+    if FAST_JSON_RESPONSES:
+        result = db.execute(query, execution_options={"yield_per": ROW_CHUNK_SIZE})
+        return rows_response(result, key="bins")
+
     result = db.execute(query).mappings().all()
 
     return {
@@ -44,6 +51,40 @@ def get_all_bins(db: Session = Depends(get_db)):
     }
 
 
+@router.get("/nearby")
+def get_nearby_bins(
+    lat: float = Query(...),
+    lng: float = Query(...),
+    limit: int = 5,
+    db: Session = Depends(get_db)
+):
+    query = text("""
+        select
+          id,
+          name,
+          fill_level,
+          capacity,
+          ST_Distance(
+            location,
+            ST_GeogFromText(:point)
+          ) as distance
+        from bins
+        where status = 'active'
+          and fill_level < capacity
+        order by distance
+        limit :limit
+    """)
+
+    point = f"POINT({lng} {lat})"
+
+    result = db.execute(query, {
+        "point": point,
+        "limit": limit
+    }).mappings().all()
+
+    return result
+
+
 @router.get("/{bin_id}")
 def get_bin_by_id(bin_id: str, db: Session = Depends(get_db)):
     query = text("""
@@ -104,6 +145,16 @@ def create_bin(
 
     db.commit()
 
+    publish("bins", "created", {
+        "id": str(result[0]),
+        "name": payload.name,
+        "lat": payload.lat,
+        "lng": payload.lng,
+        "capacity": payload.capacity,
+        "fill_level": 0,
+        "status": payload.status,
+    })
+
     return {
         "message": "Bin created successfully",
         "bin_id": result[0]
@@ -134,6 +185,13 @@ def update_bin(
 
     db.commit()
 
+    changes = {
+        field: payload.get(field)
+        for field in ("name", "capacity", "status")
+        if payload.get(field) is not None
+    }
+    publish("bins", "updated", {"id": bin_id, **changes})
+
     return {"message": "Bin updated successfully"}
 
 
@@ -147,41 +205,9 @@ def delete_bin(bin_id: str, db: Session = Depends(get_db)):
     db.execute(query, {"bin_id": bin_id})
     db.commit()
 
-    return {"message": "Bin deleted successfully"}
-
+    publish("bins", "deleted", {"id": bin_id})
 
-@router.get("/nearby")
-def get_nearby_bins(
-    lat: float = Query(...),
-    lng: float = Query(...),
-    limit: int = 5,
-    db: Session = Depends(get_db)
-):
-    query = text("""
-        select
-          id,
-          name,
-          fill_level,
-          capacity,
-          ST_Distance(
-            location,
-            ST_GeogFromText(:point)
-          ) as distance
-        from bins
-        where status = 'active'
-          and fill_level < capacity
-        order by distance
-        limit :limit
-    """)
-
-    point = f"POINT({lng} {lat})"
-
-    result = db.execute(query, {
-        "point": point,
-        "limit": limit
-    }).mappings().all()
-
-    return result
+    return {"message": "Bin deleted successfully"}
 
 
 TODO = "ADD INTERFACE DISPLAY OF THE BIN CORRESPONDING TO BIN ID"
\ No newline at end of file
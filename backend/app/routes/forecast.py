@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Query
+
+from app.services.forecasting import forecaster
+
+router = APIRouter(prefix="/api/forecast", tags=["Forecast"])
+
+
+@router.get("/bins")
+def get_bins_filling_soon(
+    horizon_hours: float = Query(24, gt=0, le=24 * 30),
+):
+    """Bins predicted to reach the full threshold within `horizon_hours`, soonest first."""
+    if forecaster.snapshot is None:
+        # Only before the scheduler's first run; afterwards this never touches the DB
+        forecaster.refresh_now()
+
+    computed_at, bins = forecaster.due_within(horizon_hours)
+
+    return {
+        "computed_at": computed_at,
+        "horizon_hours": horizon_hours,
+        "bins": bins,
+    }
@@ -0,0 +1,33 @@
+import math
+
+from fastapi import APIRouter, HTTPException, Query
+
+from app.services.geocoding import GeocodingBusy, GeocodingError, get_geocoder
+
+router = APIRouter(prefix="/api/geocode", tags=["Geocoding"])
+
+
+@router.get("/reverse")
+def reverse_geocode(
+    lat: float = Query(..., ge=-90, le=90),
+    lng: float = Query(..., ge=-180, le=180),
+):
+    """Address at a point, from the local cache when anything nearby was looked up before."""
+    try:
+        address, source = get_geocoder().reverse(lat, lng)
+    except GeocodingBusy as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        )
+    except GeocodingError as e:
+        raise HTTPException(status_code=502, detail=f"Geocoding failed: {e}")
+
+    return {
+        "lat": lat,
+        "lng": lng,
+        "address_text": address["address_text"] if address else None,
+        "components": address["components"] if address else {},
+        "source": source,
+    }
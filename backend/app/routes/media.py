@@ -0,0 +1,43 @@
+import mimetypes
+import os
+
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import FileResponse
+
+from app.services.storage import LocalStorage, storage
+
+router = APIRouter(prefix="/media", tags=["Media"])
+
+
+@router.get("/{bucket}/{path:path}")
+def get_media(bucket: str, path: str, request: Request):
+    """
+    Serve an object from the local storage backend.
+
+    FileResponse handles Range requests and uses sendfile when the server
+    offers it. Stored files are content-addressed, so their sha256 is an
+    ETag that stays the same across hosts, copies and restores.
+    """
+    if not isinstance(storage, LocalStorage) or bucket != storage.bucket:
+        raise HTTPException(404, "Not found")
+
+    full_path = storage.file_path(path)
+    if not os.path.isfile(full_path):
+        raise HTTPException(404, "Not found")
+
+    stat = os.stat(full_path)
+    etag = f'"{storage.digest(full_path, stat)}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "public, max-age=31536000, immutable",
+    }
+
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    return FileResponse(
+        full_path,
+        stat_result=stat,
+        headers=headers,
+        media_type=mimetypes.guess_type(path)[0] or "application/octet-stream",
+    )
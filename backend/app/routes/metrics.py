@@ -0,0 +1,44 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.instrumentation import render_metrics, stack_sampler
+from app.core.query_profiler import query_profiler
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+
+@router.get("", response_class=PlainTextResponse)
+def get_metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+def get_profile():
+    """Sampled stacks in collapsed format; feed to flamegraph.pl or speedscope."""
+    return stack_sampler.collapsed()
+
+
+@router.post("/profile/start")
+def start_profile(interval_ms: float | None = None, reset: bool = True):
+    if reset:
+        stack_sampler.reset()
+    stack_sampler.start(interval_ms)
+    return {"running": stack_sampler.running, "interval_ms": stack_sampler.interval_ms}
+
+
+@router.post("/profile/stop")
+def stop_profile():
+    stack_sampler.stop()
+    return {"running": stack_sampler.running, "samples": stack_sampler.samples}
+
+
+@router.get("/sql")
+def get_sql_report(limit: int = 20):
+    """Routes by database round-trips per request, N+1 suspects and EXPLAINed slow queries."""
+    return query_profiler.report(limit)
+
+
+@router.post("/sql/reset")
+def reset_sql_report():
+    query_profiler.reset()
+    return {"reset": True}
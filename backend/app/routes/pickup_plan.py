@@ -0,0 +1,60 @@
+from datetime import date
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.core.config import DEPOT_LAT, DEPOT_LNG, PICKUP_PLAN_EPS_M, PICKUP_PLAN_WINDOW_HOURS
+from app.database import get_db
+from app.services.pickup_planner import plan_day
+from app.services.routing_service import call_osrm_route
+
+router = APIRouter(prefix="/admin/pickup-plan", tags=["Admin Pickup Plan"])
+
+# Coordinates per OSRM request; longer crew routes are fetched in overlapping legs
+OSRM_MAX_POINTS = 100
+
+
+@router.get("")
+def get_pickup_plan(
+    day: date,
+    crews: int = Query(1, ge=1, le=100),
+    eps_m: float = Query(PICKUP_PLAN_EPS_M, gt=0, le=20_000, description="Cluster radius in metres"),
+    window_hours: float = Query(PICKUP_PLAN_WINDOW_HOURS, gt=0, le=24),
+    max_stops: int | None = Query(None, ge=1, description="Per crew; the rest is returned as unassigned"),
+    start_lat: float | None = None,
+    start_lng: float | None = None,
+    geometry: bool = Query(False, description="Include each crew's road path from OSRM"),
+    db: Session = Depends(get_db),
+):
+    """Accepted requests for `day`, clustered by place and preferred time window, as ordered stop lists per crew."""
+    if start_lat is not None and start_lng is not None:
+        start = {"lat": start_lat, "lng": start_lng}
+    elif DEPOT_LAT is not None and DEPOT_LNG is not None:
+        start = {"lat": DEPOT_LAT, "lng": DEPOT_LNG}
+    else:
+        raise HTTPException(400, "start_lat/start_lng are required when no depot is configured")
+
+    plan = plan_day(
+        db, day, start, crews,
+        eps_m=eps_m,
+        window_hours=window_hours,
+        max_stops=max_stops,
+    )
+
+    if geometry:
+        for crew in plan["crews"]:
+            crew["path"] = _crew_path(start, crew["stops"]) if crew["stops"] else []
+
+    return plan
+
+
+def _crew_path(start, stops):
+    points = [start] + [{"lat": s["lat"], "lng": s["lng"]} for s in stops]
+    path = []
+    for k in range(0, len(points) - 1, OSRM_MAX_POINTS - 1):
+        try:
+            leg = call_osrm_route(points[k:k + OSRM_MAX_POINTS])
+        except Exception as e:
+            raise HTTPException(status_code=502, detail=f"Routing failed: {e}")
+        path.extend({"lat": lat, "lng": lng} for lng, lat in leg)
+    return path
@@ -0,0 +1,59 @@
+import asyncio
+import json
+
+from fastapi import APIRouter, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from app.services.change_feed import change_feed
+
+router = APIRouter(prefix="/api/changes", tags=["Realtime"])
+
+# Idle clients get a comment/ping this often so proxies keep the connection open
+KEEPALIVE_SECONDS = 15
+
+
+def _encode(message) -> str:
+    return json.dumps(message, default=str)
+
+
+@router.get("/stream")
+async def stream_changes(request: Request, topics: list[str] | None = Query(None)):
+    """Server-Sent Events stream of pickup/bin deltas."""
+    sub = change_feed.subscribe(topics)
+
+    async def events():
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(sub.queue.get(), KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {message['topic']}.{message['event']}\ndata: {_encode(message)}\n\n"
+        finally:
+            change_feed.unsubscribe(sub)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/ws")
+async def websocket_changes(websocket: WebSocket, topics: list[str] | None = Query(None)):
+    """WebSocket stream of pickup/bin deltas, one JSON message per change."""
+    await websocket.accept()
+    sub = change_feed.subscribe(topics)
+    try:
+        while True:
+            try:
+                message = await asyncio.wait_for(sub.queue.get(), KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                message = {"topic": "*", "event": "ping", "data": None}
+            await websocket.send_text(_encode(message))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        change_feed.unsubscribe(sub)
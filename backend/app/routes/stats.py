@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.services.stats import bin_daily, bin_top_users, user_stats
+
+router = APIRouter(prefix="/api/stats", tags=["Stats"])
+
+
+@router.get("/users/{user_id}")
+def get_user_stats(user_id: str, db: Session = Depends(get_db)):
+    """Deposits, pickups and points by waste type, from the rollup tables."""
+    return user_stats(db, user_id)
+
+
+@router.get("/bins/{bin_id}/daily")
+def get_bin_daily_stats(
+    bin_id: str,
+    days: int = Query(30, ge=1, le=366),
+    db: Session = Depends(get_db),
+):
+    return {"bin_id": bin_id, "days": bin_daily(db, bin_id, days)}
+
+
+@router.get("/bins/{bin_id}/top-users")
+def get_bin_top_users(
+    bin_id: str,
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    return {"bin_id": bin_id, "users": bin_top_users(db, bin_id, limit)}
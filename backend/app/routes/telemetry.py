@@ -0,0 +1,25 @@
+from fastapi import APIRouter, HTTPException, status
+
+from app.models.schemas.telemetry import TelemetryBatch
+from app.services.telemetry import BufferFull, telemetry_buffer
+
+router = APIRouter(prefix="/api/telemetry", tags=["Telemetry"])
+
+
+@router.post("/readings", status_code=status.HTTP_202_ACCEPTED)
+async def ingest_readings(batch: TelemetryBatch):
+    """
+    Accept a batch of bin fill-level readings.
+
+    Readings are buffered and written in bulk by a background flusher, so a
+    202 means "queued", not "persisted".
+    """
+    try:
+        accepted = telemetry_buffer.add(batch.readings)
+    except BufferFull:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Telemetry buffer full, retry later"
+        )
+
+    return {"accepted": accepted}
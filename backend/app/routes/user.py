@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, File, UploadFile
 from sqlalchemy.orm import Session
+from sqlalchemy import select
 from pathlib import Path
 from pydantic import BaseModel
 from app.database import get_db
+from app.core.config import FAST_JSON_RESPONSES
 from app.core.security import verify_firebase_token
 from app.models import user as user_model
 from app.models import transaction as txn_model
@@ -12,6 +14,7 @@ from datetime import datetime
 import shutil
 from app.services.waste_detector import predict_waste
 from app.models import pickup_request as PR
+from app.services.serialization import rows_response
 
 router = APIRouter(prefix="/user", tags=["User"])
 
@@ -95,11 +98,35 @@ async def detect_waste(image: UploadFile = File(...)):
         await image.close()
 
 @router.get("/transactions/{user_id}")
-def get_transactions(user_id: str, page: int=1, limit: int=10,  db: Session = Depends(get_db)):
+def get_transactions(
+    user_id: str,
+    page: int=1,
+    limit: int=10,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    db: Session = Depends(get_db),
+):
     offset = (page-1)*limit
+    # A date range lets the planner skip the partitions outside it; without one the
+    # whole history is paged, newest first
+    filters = [txn_model.Transaction.user_id == user_id]
+    if created_from:
+        filters.append(txn_model.Transaction.created_at >= created_from)
+    if created_to:
+        filters.append(txn_model.Transaction.created_at <= created_to)
+    if FAST_JSON_RESPONSES:
+        query = (
+            select(txn_model.Transaction.__table__)
+            .where(*filters)
+            .order_by(txn_model.Transaction.created_at.desc())
+            .offset(offset)
+            .limit(limit)
+        )
+        return rows_response(db.execute(query))
+
     transactions = (
         db.query(txn_model.Transaction)
-        .filter(txn_model.Transaction.user_id == user_id)
+        .filter(*filters)
         .order_by(txn_model.Transaction.created_at.desc())
         .offset(offset)
         .limit(limit)
@@ -1,3 +1,6 @@
+import logging
+import sqlite3
+
 from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Form
 from sqlalchemy.orm import Session
 from sqlalchemy import text
@@ -12,8 +15,21 @@ from app.models.schemas.pickup_requests import (
     PickupRequestDetailsOut,
     PickupRequestUpdateLocation,
 )
+from app.services.change_feed import publish
 from app.services.geo_utils import make_geography_point
-from app.services.storage import upload_pickup_image, delete_pickup_image
+from app.services.geocoding import get_geocoder, normalize_address
+from app.services.job_queue import enqueue
+from app.services.object_index import acquire_object, release_object
+from app.services.pickup_decisions import raise_conflict
+from app.services.storage import (
+    content_path,
+    pickup_image_urls,
+    read_pickup_image,
+    spool_upload,
+    storage,
+)
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/user/pickup-requests", tags=["User Pickup Requests"])
 
@@ -37,6 +53,8 @@ def get_pickup_request(requestId: UUID, db:Session=Depends(get_db)):
             SELECT
                 id,
                 image_url,
+                thumbnail_url,
+                preview_url,
                 e_waste_type,
                 preferred_datetime,
                 contact_number,
@@ -44,6 +62,11 @@ def get_pickup_request(requestId: UUID, db:Session=Depends(get_db)):
                 points_awarded,
                 rejection_reason,
                 address_text,
+                predicted_type,
+                predicted_confidence,
+                predicted_probabilities,
+                suggested_points,
+                version,
                 created_at,
                 ST_Y(location::geometry) AS latitude,
                 ST_X(location::geometry) AS longitude
@@ -71,22 +94,19 @@ def create_pickup_request(
     image: UploadFile = File(...),
     db: Session = Depends(get_db)
 ):
-    try:
-        image_url = upload_pickup_image(image, str(user_id))
-    except HTTPException as e:
-        raise e
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail="Failed to upload image. Please try again."
-        )
+    contents = read_pickup_image(image)
+    image_path, image_sha256 = content_path(contents, image.content_type)
+    image_urls = pickup_image_urls(image_path)
 
-    
+    # Without an address, use one already cached for the spot; never calls the provider here
+    address_text = normalize_address(address_text) or _cached_address(latitude, longitude)
 
     pickup = PickupRequest(
         user_id=user_id,
         e_waste_type=e_waste_type,
-        image_url=image_url,
+        image_url=image_urls["original"],
+        thumbnail_url=image_urls["thumb"],
+        preview_url=image_urls["preview"],
         location=make_geography_point(latitude, longitude),
         preferred_datetime=preferred_datetime,
         contact_number=contact_number,
@@ -95,9 +115,31 @@ def create_pickup_request(
     )
 
     db.add(pickup)
+
+    # Identical bytes already stored: only the reference count changes
+    if acquire_object(db, image_path, image_sha256, len(contents), image.content_type):
+        try:
+            spool_path = spool_upload(contents, image_path)
+        except Exception as e:
+            db.rollback()
+            raise HTTPException(
+                status_code=500,
+                detail="Failed to upload image. Please try again."
+            )
+        # The upload to storage happens on the job worker; the URL is already final
+        enqueue(db, "upload_pickup_image", {
+            "path": image_path,
+            "spool_path": spool_path,
+            "content_type": image.content_type,
+        })
+    else:
+        enqueue(db, "classify_pickup_image", {"path": image_path})
+
     db.commit()
     db.refresh(pickup)
 
+    publish("pickups", "created", PickupRequestOut.model_validate(pickup).model_dump(mode="json"))
+
     return pickup
 
 
@@ -108,30 +150,23 @@ def update_pickup_location(
     data: PickupRequestUpdateLocation = ...,
     db: Session = Depends(get_db),
 ):
-    pickup = (
-        db.query(PickupRequest)
-        .filter(
-            PickupRequest.id == request_id,
-            PickupRequest.user_id == user_id,
-        )
-        .first()
-    )
-    if not pickup:
-        raise HTTPException(404, "Pickup request not found")
-    if pickup.status != PickupStatus.open:
-        raise HTTPException(400, "Only open requests can be updated")
-
-    pickup.location = make_geography_point(data.latitude, data.longitude)
-    if data.address_text is not None:
-        pickup.address_text = data.address_text
-    db.commit()
-    db.refresh(pickup)
-
+    # Only while still open: one conditional UPDATE, so an admin decision cannot slip in between
     result = db.execute(
         text("""
-            SELECT
+            UPDATE pickup_requests
+            SET location = ST_SetSRID(ST_MakePoint(:longitude, :latitude), 4326)::geography,
+                address_text = COALESCE(:address_text, address_text),
+                version = version + 1,
+                updated_at = now()
+            WHERE id = :id
+              AND user_id = :user_id
+              AND status = 'open'
+              AND (CAST(:expected_version AS INTEGER) IS NULL OR version = :expected_version)
+            RETURNING
                 id,
                 image_url,
+                thumbnail_url,
+                preview_url,
                 e_waste_type,
                 preferred_datetime,
                 contact_number,
@@ -139,14 +174,37 @@ def update_pickup_location(
                 points_awarded,
                 rejection_reason,
                 address_text,
+                predicted_type,
+                predicted_confidence,
+                predicted_probabilities,
+                suggested_points,
+                version,
                 created_at,
                 ST_Y(location::geometry) AS latitude,
                 ST_X(location::geometry) AS longitude
-            FROM pickup_requests
-            WHERE id = :id
         """),
-        {"id": str(request_id)},
+        {
+            "id": str(request_id),
+            "user_id": user_id,
+            "latitude": data.latitude,
+            "longitude": data.longitude,
+            "address_text": normalize_address(data.address_text),
+            "expected_version": data.expected_version,
+        },
     ).mappings().first()
+
+    if not result:
+        _raise_not_updatable(db, request_id, user_id, data.expected_version, "Only open requests can be updated")
+    db.commit()
+
+    publish("pickups", "updated", {
+        "id": str(request_id),
+        "address_text": result["address_text"],
+        "latitude": result["latitude"],
+        "longitude": result["longitude"],
+        "version": result["version"],
+    })
+
     return result
 
 
@@ -156,26 +214,46 @@ def delete_pickup_request(
     request_id: UUID,
     db: Session = Depends(get_db),
 ):
-    pickup = (
-        db.query(PickupRequest)
-        .filter(
-            PickupRequest.id == request_id,
-            PickupRequest.user_id == user_id
-        )
-        .first()
-    )
-
-    if not pickup:
-        raise HTTPException(404, "Pickup request not found")
+    image_url = db.execute(
+        text("""
+            DELETE FROM pickup_requests
+            WHERE id = :id AND user_id = :user_id AND status = 'open'
+            RETURNING image_url
+        """),
+        {"id": str(request_id), "user_id": user_id},
+    ).scalar_one_or_none()
 
-    if pickup.status != PickupStatus.open:
-        raise HTTPException(400, "Only open requests can be deleted")
+    if image_url is None:
+        _raise_not_updatable(db, request_id, user_id, None, "Only open requests can be deleted")
 
-    image_url = pickup.image_url
-    db.delete(pickup)
+    image_path = storage.path_from_url(image_url) if image_url else None
+    if image_path:
+        release_object(db, image_path, image_url)
     db.commit()
 
-    if image_url:
-        delete_pickup_image(image_url)
+    publish("pickups", "deleted", {"id": str(request_id)})
 
     return {"message": "Pickup request deleted"}
+
+
+def _cached_address(latitude, longitude):
+    # The address is optional, so a misconfigured geocoder (unwritable GEOCODE_CACHE_PATH,
+    # unknown GEOCODER_PROVIDER) must not fail pickup creation
+    try:
+        geocoder = get_geocoder()
+    except (OSError, sqlite3.Error, ValueError):
+        logger.warning("Geocoder unavailable, creating pickup without an address", exc_info=True)
+        return None
+    address = geocoder.cached(latitude, longitude)
+    return address["address_text"] if address else None
+
+
+def _raise_not_updatable(db, request_id, user_id, expected_version, message):
+    owned = db.execute(
+        text("SELECT 1 FROM pickup_requests WHERE id = :id AND user_id = :user_id"),
+        {"id": str(request_id), "user_id": user_id},
+    ).first()
+    if not owned:
+        raise HTTPException(404, "Pickup request not found")
+    raise_conflict(db, request_id, expected_version, open_message=message)
+    raise HTTPException(409, "Pickup request changed; reload and retry")
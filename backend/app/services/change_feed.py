@@ -0,0 +1,138 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+
+from sqlalchemy import text
+
+from app.core.config import CHANGE_FEED_PG_NOTIFY
+from app.database import engine
+
+logger = logging.getLogger(__name__)
+
+PG_CHANNEL = "remat_changes"
+TOPICS = {"pickups", "bins"}
+
+# Per-subscriber backlog; a client that falls this far behind is told to resync
+SUBSCRIBER_QUEUE_SIZE = 256
+
+
+class Subscription:
+    def __init__(self, topics, loop):
+        self.topics = set(topics or TOPICS)
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def _offer(self, message):
+        # Runs on the subscriber's event loop
+        if self.queue.full():
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"topic": "*", "event": "resync", "data": None, "ts": message["ts"]})
+            return
+        self.queue.put_nowait(message)
+
+
+class ChangeFeed:
+    """
+    In-process pub/sub for pickup and bin changes.
+
+    Write paths call `publish` after committing. Subscribers are asyncio
+    queues owned by SSE/WebSocket handlers. With CHANGE_FEED_PG_NOTIFY the
+    event goes through pg_notify instead and a listener thread in every
+    worker (including this one) hands it to the local subscribers.
+    """
+
+    def __init__(self, use_pg_notify=False):
+        self.use_pg_notify = use_pg_notify
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._listener = None
+        self._stopping = threading.Event()
+
+    def subscribe(self, topics=None) -> Subscription:
+        sub = Subscription(topics, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    def publish(self, topic: str, event: str, data: dict):
+        message = {"topic": topic, "event": event, "data": data, "ts": time.time()}
+
+        if not self.use_pg_notify:
+            self._dispatch(message)
+            return
+
+        try:
+            with engine.begin() as conn:
+                conn.execute(
+                    text("SELECT pg_notify(:channel, :payload)"),
+                    {"channel": PG_CHANNEL, "payload": json.dumps(message, default=str)},
+                )
+        except Exception:
+            logger.exception("Change feed NOTIFY failed, delivering locally")
+            self._dispatch(message)
+
+    def _dispatch(self, message):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            if message["topic"] in sub.topics:
+                sub.loop.call_soon_threadsafe(sub._offer, message)
+
+    def start(self):
+        if self.use_pg_notify and self._listener is None:
+            self._stopping.clear()
+            self._listener = threading.Thread(target=self._listen, name="change-feed-listener", daemon=True)
+            self._listener.start()
+
+    def stop(self):
+        self._stopping.set()
+        if self._listener is not None:
+            self._listener.join(timeout=5)
+            self._listener = None
+
+    def _listen(self):
+        while not self._stopping.is_set():
+            conn = None
+            try:
+                raw = engine.raw_connection()
+                conn = raw.driver_connection
+                # Detached from the pool, so it is closed below on every exit path
+                raw.detach()
+                conn.autocommit = True
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {PG_CHANNEL}")
+
+                while not self._stopping.is_set():
+                    if select.select([conn], [], [], 5) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        self._deliver(conn.notifies.pop(0).payload)
+            except Exception:
+                logger.exception("Change feed listener error, reconnecting")
+                self._stopping.wait(2)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+    def _deliver(self, payload):
+        # One malformed notification is dropped without tearing down the LISTEN
+        try:
+            message = json.loads(payload)
+            self._dispatch(message)
+        except (ValueError, TypeError, KeyError):
+            logger.warning("Dropping malformed change feed notification", extra={"payload": payload[:200]})
+
+change_feed = ChangeFeed(use_pg_notify=CHANGE_FEED_PG_NOTIFY)
+
+
+def publish(topic: str, event: str, data: dict):
+    change_feed.publish(topic, event, data)
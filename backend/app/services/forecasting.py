@@ -0,0 +1,227 @@
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from sqlalchemy import text
+
+from app.core.config import (
+    FORECAST_RATE_WINDOW_HOURS,
+    FORECAST_REFRESH_SECONDS,
+    FORECAST_TELEMETRY_WINDOW_HOURS,
+)
+from app.database import SessionLocal
+from app.services.transaction_service import FILL_PER_DEPOSIT, FULL_THRESHOLD
+
+logger = logging.getLogger(__name__)
+
+# Telemetry fits need at least this many readings since the last emptying
+MIN_TELEMETRY_POINTS = 3
+
+_BINS_QUERY = text("""
+    SELECT id, name, fill_level, capacity, status
+    FROM bins
+""")
+
+# Each deposit contributes exp(-age / tau) to its bin's decayed count, so the
+# running sum can be aged and topped up with only the rows since the last run
+_DEPOSITS_SINCE_QUERY = text("""
+    SELECT
+        bin_id,
+        SUM(EXP(-EXTRACT(EPOCH FROM (:now - created_at)) / :tau)) AS weight
+    FROM transactions
+    WHERE created_at > :since
+      AND created_at <= :now
+    GROUP BY bin_id
+""")
+
+# Readings after each bin's most recent emptying (a drop in fill level)
+_TELEMETRY_QUERY = text("""
+    WITH r AS (
+        SELECT
+            bin_id,
+            recorded_at,
+            fill_level,
+            fill_level < LAG(fill_level) OVER (
+                PARTITION BY bin_id ORDER BY recorded_at
+            ) AS dropped
+        FROM bin_telemetry
+        WHERE recorded_at > :since
+    ),
+    cut AS (
+        SELECT bin_id, MAX(recorded_at) FILTER (WHERE dropped) AS emptied_at
+        FROM r
+        GROUP BY bin_id
+    )
+    SELECT r.bin_id, EXTRACT(EPOCH FROM r.recorded_at) AS ts, r.fill_level
+    FROM r
+    JOIN cut USING (bin_id)
+    WHERE cut.emptied_at IS NULL OR r.recorded_at >= cut.emptied_at
+""")
+
+
+def telemetry_slopes(bin_index, ts, fill, n_bins):
+    """
+    Per-bin least-squares fill rate (units/hour) for all bins at once.
+
+    `bin_index` maps each reading to its bin's position; sums are built with
+    np.bincount so there is no per-bin Python loop. Bins with too few
+    readings get NaN.
+    """
+    t = (ts - ts.min()) / 3600.0 if len(ts) else ts
+    n = np.bincount(bin_index, minlength=n_bins).astype(np.float64)
+    st = np.bincount(bin_index, weights=t, minlength=n_bins)
+    sy = np.bincount(bin_index, weights=fill, minlength=n_bins)
+    stt = np.bincount(bin_index, weights=t * t, minlength=n_bins)
+    sty = np.bincount(bin_index, weights=t * fill, minlength=n_bins)
+
+    denom = n * stt - st * st
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = (n * sty - st * sy) / denom
+    slope[(n < MIN_TELEMETRY_POINTS) | (denom <= 0)] = np.nan
+    return slope
+
+
+class FillForecaster:
+    """
+    Predicts time-to-full for every bin from deposit history and telemetry.
+
+    Deposit rates are an exponentially decayed count per bin (time constant
+    FORECAST_RATE_WINDOW_HOURS) that each refresh ages and tops up with only
+    the transactions newer than the previous watermark. Where a bin reports
+    telemetry, a linear fit since its last emptying replaces the deposit
+    estimate. Refreshes run on a background thread; readers get the last
+    published snapshot.
+    """
+
+    def __init__(self, refresh_seconds=FORECAST_REFRESH_SECONDS, tau_hours=FORECAST_RATE_WINDOW_HOURS):
+        self.refresh_seconds = refresh_seconds
+        self.tau_seconds = tau_hours * 3600.0
+        self._decayed = {}
+        self._watermark = None
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    @property
+    def snapshot(self):
+        return self._snapshot
+
+    def refresh(self, db):
+        with self._lock:
+            now = datetime.now(timezone.utc)
+            bins = db.execute(_BINS_QUERY).mappings().all()
+            ids = [str(b["id"]) for b in bins]
+            position = {bin_id: i for i, bin_id in enumerate(ids)}
+            n_bins = len(ids)
+
+            # Age the previous decayed counts to `now`, then add new deposits
+            if self._watermark is None:
+                since = now - timedelta(seconds=5 * self.tau_seconds)
+                decayed = np.zeros(n_bins)
+            else:
+                since = self._watermark
+                age = (now - self._watermark).total_seconds()
+                decayed = np.array([self._decayed.get(bin_id, 0.0) for bin_id in ids]) * math.exp(-age / self.tau_seconds)
+
+            rows = db.execute(
+                _DEPOSITS_SINCE_QUERY,
+                {"now": now, "since": since, "tau": self.tau_seconds},
+            ).all()
+            idx = [position[str(r.bin_id)] for r in rows if str(r.bin_id) in position]
+            weights = [float(r.weight) for r in rows if str(r.bin_id) in position]
+            np.add.at(decayed, np.array(idx, dtype=np.intp), np.array(weights))
+
+            deposit_rate = decayed / (self.tau_seconds / 3600.0) * FILL_PER_DEPOSIT
+
+            telemetry = db.execute(
+                _TELEMETRY_QUERY,
+                {"since": now - timedelta(hours=FORECAST_TELEMETRY_WINDOW_HOURS)},
+            ).all()
+            known = [r for r in telemetry if str(r.bin_id) in position]
+            slope = telemetry_slopes(
+                np.array([position[str(r.bin_id)] for r in known], dtype=np.intp),
+                np.array([float(r.ts) for r in known]),
+                np.array([float(r.fill_level) for r in known]),
+                n_bins,
+            )
+
+            use_telemetry = ~np.isnan(slope)
+            rate = np.where(use_telemetry, np.clip(np.nan_to_num(slope), 0.0, None), deposit_rate)
+
+            fill = np.array([b["fill_level"] for b in bins], dtype=np.float64)
+            capacity = np.array([b["capacity"] for b in bins], dtype=np.float64)
+            remaining = np.clip(FULL_THRESHOLD * capacity - fill, 0.0, None)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                hours_to_full = np.where(remaining == 0, 0.0, remaining / rate)
+
+            self._decayed = dict(zip(ids, decayed.tolist()))
+            self._watermark = now
+            self._snapshot = {
+                "computed_at": now,
+                "bins": bins,
+                "rate": rate,
+                "hours_to_full": hours_to_full,
+                "source": np.where(use_telemetry, "telemetry", "deposits"),
+            }
+            return self._snapshot
+
+    def due_within(self, horizon_hours: float):
+        """Bins predicted to reach the full threshold within the horizon, soonest first."""
+        snap = self._snapshot
+        if snap is None:
+            return None, []
+
+        hours = snap["hours_to_full"]
+        order = np.argsort(hours, kind="stable")
+        order = order[hours[order] <= horizon_hours]
+
+        computed_at = snap["computed_at"]
+        return computed_at, [
+            {
+                "id": snap["bins"][i]["id"],
+                "name": snap["bins"][i]["name"],
+                "status": snap["bins"][i]["status"],
+                "fill_level": snap["bins"][i]["fill_level"],
+                "capacity": snap["bins"][i]["capacity"],
+                "fill_rate_per_hour": round(float(snap["rate"][i]), 3),
+                "hours_to_full": round(float(hours[i]), 2),
+                "predicted_full_at": computed_at + timedelta(hours=float(hours[i])),
+                "source": str(snap["source"][i]),
+            }
+            for i in order
+        ]
+
+    def refresh_now(self):
+        db = SessionLocal()
+        try:
+            return self.refresh(db)
+        finally:
+            db.close()
+
+    def start(self):
+        if self._thread is None:
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="fill-forecaster", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stopping.is_set():
+            started = time.monotonic()
+            try:
+                self.refresh_now()
+            except Exception:
+                logger.exception("Fill forecast refresh failed")
+            self._stopping.wait(max(self.refresh_seconds - (time.monotonic() - started), 1.0))
+
+
+forecaster = FillForecaster()
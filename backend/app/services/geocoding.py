@@ -0,0 +1,330 @@
+"""
+Reverse geocoding with a local spatial cache in front of the provider.
+
+Coordinates are quantized to a grid of GEOCODE_CELL_DEGREES, and every
+lookup in the same cell shares one answer:
+
+    in-process LRU  ->  SQLite store (shared by processes on the host)  ->  provider
+
+Provider answers, including "no address here", are written back to both.
+The SQLite store can be seeded from an offline gazetteer with
+app.cli.geocode_cache, so common places never reach the provider.
+Providers implement GeocodingProvider.reverse; see make_provider.
+"""
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+import requests
+
+from app.core.config import (
+    GEOCODE_CACHE_PATH,
+    GEOCODE_CACHE_SIZE,
+    GEOCODE_CACHE_TTL_DAYS,
+    GEOCODE_CELL_DEGREES,
+    GEOCODER_MIN_INTERVAL_SECONDS,
+    GEOCODER_PROVIDER,
+    GEOCODER_TIMEOUT_SECONDS,
+    GEOCODER_URL,
+    GEOCODER_USER_AGENT,
+)
+from app.core.instrumentation import Histogram
+
+logger = logging.getLogger(__name__)
+
+# Longest address_text kept after normalization
+MAX_ADDRESS_LENGTH = 500
+
+geocode_seconds = Histogram(
+    "remat_geocode_seconds",
+    "Reverse geocoding time by where the answer came from",
+    ("source",),
+    buckets=(0.00001, 0.0001, 0.001, 0.01, 0.1, 0.5, 1.0, 5.0),
+)
+
+
+class GeocodingError(Exception):
+    """The provider could not be reached or gave an unusable answer."""
+
+
+class GeocodingBusy(GeocodingError):
+    """The provider's rate limit would hold this call longer than its timeout."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Geocoder busy, retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+def normalize_address(text):
+    """Canonical form of free-text addresses: NFKC, single spaces, one ", " between parts; None when empty."""
+    if text is None:
+        return None
+    text = unicodedata.normalize("NFKC", text)
+    parts = [" ".join(part.split()) for part in re.split(r"[,\n;]+", text)]
+    text = ", ".join(part.strip(" .-") for part in parts if part.strip(" .-"))
+    return text[:MAX_ADDRESS_LENGTH] or None
+
+
+class GeocodingProvider(ABC):
+    """Source of addresses for cache misses."""
+
+    # Recorded with cached answers; seeded rows use "gazetteer"
+    name = "provider"
+    # Whether answers, including "no address", are worth caching
+    cacheable = True
+
+    @abstractmethod
+    def reverse(self, lat: float, lng: float) -> dict | None:
+        """{"address_text": ..., "components": {...}}, or None when there is no address at that point."""
+
+
+class NominatimProvider(GeocodingProvider):
+    name = "nominatim"
+
+    def __init__(self, url=GEOCODER_URL, user_agent=GEOCODER_USER_AGENT,
+                 timeout=GEOCODER_TIMEOUT_SECONDS, min_interval=GEOCODER_MIN_INTERVAL_SECONDS):
+        self.url = url
+        self.timeout = timeout
+        self.min_interval = min_interval
+        self._session = requests.Session()
+        self._session.headers["User-Agent"] = user_agent
+        # Public Nominatim allows one request per second
+        self._lock = threading.Lock()
+        self._last_call = 0.0
+
+    def reverse(self, lat, lng):
+        # Reserve the next free slot under the lock and sleep outside it. Calls that
+        # would wait longer than the timeout are refused instead of tying up a worker
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._last_call + self.min_interval)
+            wait = slot - now
+            if wait > self.timeout:
+                raise GeocodingBusy(wait - self.timeout)
+            self._last_call = slot
+        if wait > 0:
+            time.sleep(wait)
+
+        try:
+            res = self._session.get(
+                self.url,
+                params={"lat": lat, "lon": lng, "format": "jsonv2", "addressdetails": 1},
+                timeout=self.timeout,
+            )
+            res.raise_for_status()
+            data = res.json()
+        except (requests.RequestException, ValueError) as e:
+            raise GeocodingError(str(e)) from e
+
+        if "error" in data or not data.get("display_name"):
+            return None
+        return {
+            "address_text": normalize_address(data["display_name"]),
+            "components": data.get("address") or {},
+        }
+
+
+class NullProvider(GeocodingProvider):
+    """Answers nothing: only cached and seeded addresses are returned."""
+
+    name = "none"
+    cacheable = False
+
+    def reverse(self, lat, lng):
+        return None
+
+
+def make_provider(name: str = GEOCODER_PROVIDER) -> GeocodingProvider:
+    if name == "nominatim":
+        return NominatimProvider()
+    if name == "none":
+        return NullProvider()
+    raise ValueError(f"Unknown GEOCODER_PROVIDER {name!r}")
+
+
+def cell_of(lat, lng, cell_degrees=GEOCODE_CELL_DEGREES):
+    return round(lat / cell_degrees), round(lng / cell_degrees)
+
+
+class GeocodeStore:
+    """
+    Persistent cells in SQLite (WAL, one connection per thread).
+
+    Rows are keyed by the grid size as well, so changing
+    GEOCODE_CELL_DEGREES starts a fresh grid instead of misreading the old
+    one.
+    """
+
+    def __init__(self, path=GEOCODE_CACHE_PATH, cell_degrees=GEOCODE_CELL_DEGREES):
+        self.path = path
+        self.cell_degrees = cell_degrees
+        self._local = threading.local()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS geocode_cells (
+                    grid REAL NOT NULL,
+                    cell_lat INTEGER NOT NULL,
+                    cell_lng INTEGER NOT NULL,
+                    address_text TEXT,
+                    components TEXT,
+                    source TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    PRIMARY KEY (grid, cell_lat, cell_lng)
+                )
+            """)
+            self._local.conn = conn
+        return conn
+
+    def get(self, cell):
+        """(address dict or None, source, fetched_at), or None when the cell was never stored."""
+        row = self._conn().execute(
+            "SELECT address_text, components, source, fetched_at FROM geocode_cells "
+            "WHERE grid = ? AND cell_lat = ? AND cell_lng = ?",
+            (self.cell_degrees, *cell),
+        ).fetchone()
+        if row is None:
+            return None
+        address_text, components, source, fetched_at = row
+        address = {"address_text": address_text, "components": json.loads(components)} if address_text else None
+        return address, source, fetched_at
+
+    def put_many(self, entries, replace=True):
+        """Store (cell, address, source) entries in one transaction."""
+        verb = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(
+                f"{verb} INTO geocode_cells (grid, cell_lat, cell_lng, address_text, components, source, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        self.cell_degrees, *cell,
+                        address["address_text"] if address else None,
+                        json.dumps(address["components"]) if address else None,
+                        source,
+                        now,
+                    )
+                    for cell, address, source in entries
+                ],
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def put(self, cell, address, source):
+        self.put_many([(cell, address, source)])
+
+    def purge_expired(self, ttl_seconds, keep_source="gazetteer"):
+        return self._conn().execute(
+            "DELETE FROM geocode_cells WHERE fetched_at < ? AND source != ?",
+            (time.time() - ttl_seconds, keep_source),
+        ).rowcount
+
+    def stats(self):
+        return dict(self._conn().execute(
+            "SELECT source, COUNT(*) FROM geocode_cells WHERE grid = ? GROUP BY source",
+            (self.cell_degrees,),
+        ).fetchall())
+
+
+class Geocoder:
+    """
+    Cached reverse geocoding. `reverse` falls through to the provider on a
+    miss; `cached` never does, so it is safe on hot request paths.
+    Seeded (gazetteer) cells never expire; provider answers do after
+    GEOCODE_CACHE_TTL_DAYS.
+    """
+
+    def __init__(self, provider, store, cache_size=GEOCODE_CACHE_SIZE, ttl_days=GEOCODE_CACHE_TTL_DAYS):
+        self.provider = provider
+        self.store = store
+        self.cache_size = cache_size
+        self.ttl_seconds = ttl_days * 86400
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _remember(self, cell, entry):
+        with self._lock:
+            self._lru[cell] = entry
+            self._lru.move_to_end(cell)
+            if len(self._lru) > self.cache_size:
+                self._lru.popitem(last=False)
+
+    def _lookup(self, cell):
+        """(address, source) from memory or SQLite, or None on a miss or an expired answer."""
+        now = time.time()
+        with self._lock:
+            entry = self._lru.get(cell)
+            if entry is not None:
+                self._lru.move_to_end(cell)
+        if entry is not None and entry[2] > now:
+            return entry[0], "memory"
+
+        stored = self.store.get(cell)
+        if stored is None:
+            return None
+        address, source, fetched_at = stored
+        expires = float("inf") if source == "gazetteer" else fetched_at + self.ttl_seconds
+        if expires <= now:
+            return None
+        self._remember(cell, (address, source, expires))
+        return address, "sqlite"
+
+    def cached(self, lat, lng):
+        """Address for the point's cell if already known; never calls the provider."""
+        started = time.perf_counter()
+        try:
+            hit = self._lookup(cell_of(lat, lng, self.store.cell_degrees))
+        except sqlite3.Error:
+            logger.warning("Geocode cache unavailable", exc_info=True)
+            hit = None
+        geocode_seconds.observe((hit[1] if hit else "miss",), time.perf_counter() - started)
+        return hit[0] if hit else None
+
+    def reverse(self, lat, lng):
+        """(address or None, source): source is "memory", "sqlite" or the provider's name."""
+        started = time.perf_counter()
+        cell = cell_of(lat, lng, self.store.cell_degrees)
+        hit = self._lookup(cell)
+        if hit is None:
+            address = self.provider.reverse(lat, lng)
+            if self.provider.cacheable:
+                self.store.put(cell, address, self.provider.name)
+                self._remember(cell, (address, self.provider.name, time.time() + self.ttl_seconds))
+            hit = address, self.provider.name
+
+        geocode_seconds.observe((hit[1],), time.perf_counter() - started)
+        return hit
+
+
+_geocoder = None
+_geocoder_lock = threading.Lock()
+
+
+def get_geocoder() -> Geocoder:
+    global _geocoder
+    if _geocoder is None:
+        with _geocoder_lock:
+            if _geocoder is None:
+                _geocoder = Geocoder(make_provider(), GeocodeStore())
+                logger.info("Geocoder ready", extra={"provider": _geocoder.provider.name, "store": GEOCODE_CACHE_PATH})
+    return _geocoder
@@ -0,0 +1,82 @@
+"""
+Idempotency keys for write requests that clients may retry.
+
+begin() inserts the key in the caller's transaction before any other
+change, and finish() stores the response in the same transaction, so the
+key commits together with the effect or not at all:
+
+- a retry after the first attempt committed gets the stored response back;
+- a retry racing the first attempt waits on the key's primary key until
+  that transaction ends, then replays its response (commit) or runs
+  itself (rollback);
+- an attempt that failed leaves no key behind, so its retry runs again.
+
+Reusing a key for a different operation or different parameters is a 422.
+"""
+import hashlib
+import json
+
+from fastapi import HTTPException
+from sqlalchemy import text
+
+from app.core.config import IDEMPOTENCY_KEY_TTL_HOURS
+
+_CLAIM = text("""
+    INSERT INTO idempotency_keys (key, scope, request_hash)
+    VALUES (:key, :scope, :request_hash)
+    ON CONFLICT (key) DO NOTHING
+    RETURNING key
+""")
+
+_STORED = text("""
+    SELECT scope, request_hash, response
+    FROM idempotency_keys
+    WHERE key = :key
+""")
+
+
+def request_hash(params) -> str:
+    return hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def begin(db, key, scope: str, params):
+    """
+    Claim `key` for this request. Returns None when the request should run,
+    or the stored response when it already ran.
+    """
+    if key is None:
+        return None
+
+    fingerprint = request_hash(params)
+    # Twice: the stored row may be purged between the insert and the select
+    for _ in range(2):
+        if db.execute(_CLAIM, {"key": key, "scope": scope, "request_hash": fingerprint}).first():
+            return None
+        stored = db.execute(_STORED, {"key": key}).mappings().first()
+        if stored:
+            break
+    else:
+        raise HTTPException(409, "Idempotency-Key is in use, retry")
+
+    if stored["scope"] != scope or stored["request_hash"] != fingerprint:
+        raise HTTPException(422, "Idempotency-Key was already used for a different request")
+    return stored["response"]
+
+
+def finish(db, key, response):
+    """Store the response for replay, in the transaction that made the change."""
+    if key is None:
+        return
+    db.execute(
+        text("UPDATE idempotency_keys SET response = CAST(:response AS JSONB) WHERE key = :key"),
+        {"key": key, "response": json.dumps(response, default=str)},
+    )
+
+
+def purge_expired(db, ttl_hours: float = IDEMPOTENCY_KEY_TTL_HOURS) -> int:
+    deleted = db.execute(
+        text("DELETE FROM idempotency_keys WHERE created_at < now() - make_interval(secs => :secs)"),
+        {"secs": ttl_hours * 3600},
+    ).rowcount
+    db.commit()
+    return deleted
@@ -0,0 +1,68 @@
+import io
+
+from PIL import Image, ImageOps
+
+from app.core.config import IMAGE_PREVIEW_SIZE, IMAGE_THUMBNAIL_SIZE, IMAGE_WEBP_QUALITY
+from app.core.instrumentation import span
+
+# name -> longest edge of the derivative
+DERIVATIVE_SIZES = {
+    "thumb": IMAGE_THUMBNAIL_SIZE,
+    "preview": IMAGE_PREVIEW_SIZE,
+}
+
+
+def derivative_path(path: str, name: str) -> str:
+    """Storage path of a derivative: user_x/abc.jpg -> user_x/abc_thumb.webp"""
+    stem = path.rsplit(".", 1)[0]
+    return f"{stem}_{name}.webp"
+
+
+def _open(contents: bytes, size: int | None = None) -> Image.Image:
+    img = Image.open(io.BytesIO(contents))
+    if size is not None and img.format == "JPEG":
+        # Let libjpeg decode at 1/2, 1/4 or 1/8 scale when the target is small enough
+        img.draft("RGB", (size, size))
+    return img
+
+
+def _to_webp(img: Image.Image, size: int) -> bytes:
+    img = ImageOps.exif_transpose(img)
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+    img.thumbnail((size, size), Image.Resampling.LANCZOS)
+
+    out = io.BytesIO()
+    # No exif= argument, so nothing from the source metadata is written
+    img.save(out, format="WEBP", quality=IMAGE_WEBP_QUALITY, method=4)
+    return out.getvalue()
+
+
+def strip_exif(contents: bytes) -> bytes:
+    """
+    Return the original image without EXIF (GPS, device info).
+
+    Images without EXIF are returned untouched; otherwise the orientation is
+    applied to the pixels and the image is re-encoded in its own format.
+    """
+    img = _open(contents)
+    if not img.getexif():
+        return contents
+
+    fmt = img.format
+    img = ImageOps.exif_transpose(img)
+    out = io.BytesIO()
+    if fmt == "JPEG":
+        img.save(out, format="JPEG", quality=95, optimize=True)
+    else:
+        img.save(out, format=fmt)
+    return out.getvalue()
+
+
+@span("image_derivatives")
+def build_derivatives(contents: bytes) -> dict:
+    """WebP derivatives keyed by name, each encoded from a fresh (draft-mode) decode."""
+    return {
+        name: _to_webp(_open(contents, size), size)
+        for name, size in DERIVATIVE_SIZES.items()
+    }
@@ -0,0 +1,300 @@
+"""
+Waste classification without the model in this process.
+
+With INFERENCE_MODE=pool, API and job workers preprocess images
+themselves, then hand the model input to app.workers.inference_server. That is a
+fixed pool of processes, each holding one copy of the model. The number of
+model copies follows --processes there, not the number of HTTP workers.
+
+Each calling thread keeps a shared memory segment, laid out as
+
+    [n, 224, 224, 3] float32 model input | [n, len(CLASS_NAMES)] float32 probabilities
+
+(one row per image, TTA_VIEWS rows with test-time augmentation). Images
+are preprocessed straight into the segment. A one-line JSON request
+naming the segment goes over the server's Unix socket. The server's worker
+maps the same segment, runs the model on that input in place and writes
+the probabilities back after it. Only the segment name crosses the socket.
+
+Nothing here imports keras.
+"""
+import atexit
+import io
+import json
+import logging
+import socket
+import threading
+from multiprocessing import shared_memory
+
+import numpy as np
+from PIL import Image
+
+from app.core.config import (
+    INFERENCE_CALIBRATION_PATH,
+    INFERENCE_MODE,
+    INFERENCE_SOCKET,
+    INFERENCE_TIMEOUT_SECONDS,
+    INFERENCE_TTA,
+)
+from app.core.instrumentation import span
+from app.services.points import CLASS_NAMES
+
+logger = logging.getLogger(__name__)
+
+IMAGE_SIZE = (224, 224)
+IMAGE_SHAPE = (*IMAGE_SIZE, 3)
+IMAGE_BYTES = int(np.prod(IMAGE_SHAPE)) * 4
+
+# keras.applications.resnet.preprocess_input ("caffe" mode): RGB -> BGR, then subtract these per channel
+MEAN_BGR = np.array([103.939, 116.779, 123.68], dtype=np.float32)
+
+
+# Test-time augmentation: the full frame, a centre crop of the image resized to TTA_ZOOM_SIZE,
+# and the mirror image of each, classified in one batch and averaged
+TTA_VIEWS = 4
+TTA_ZOOM_SIZE = (256, 256)
+
+
+def open_image(image, min_size=IMAGE_SIZE):
+    """Open a path or encoded bytes as RGB, JPEGs decoded at the smallest scale still >= min_size."""
+    source = io.BytesIO(image) if isinstance(image, (bytes, bytearray)) else image
+    img = Image.open(source)
+    # JPEG only: let the decoder downscale by up to 8x (DCT scaling)
+    img.draft("RGB", min_size)
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    return img
+
+
+def decode_image(image):
+    """Decode a path or encoded bytes to a 224x224 RGB image."""
+    return open_image(image).resize(IMAGE_SIZE, reducing_gap=3.0)
+
+
+def _normalize(img, out):
+    np.subtract(np.asarray(img)[..., ::-1], MEAN_BGR, out=out)
+
+
+@span("pil_decode")
+def preprocess_image(image, out=None):
+    """Decode, resize and normalize one image into `out` (224x224x3 float32) in a single pass over the pixels."""
+    if out is None:
+        out = np.empty(IMAGE_SHAPE, dtype=np.float32)
+    _normalize(decode_image(image), out)
+    return out
+
+
+@span("pil_decode")
+def preprocess_views(image, out):
+    """The TTA_VIEWS model inputs for one image, written to out[0:TTA_VIEWS]."""
+    img = open_image(image, TTA_ZOOM_SIZE)
+    _normalize(img.resize(IMAGE_SIZE, reducing_gap=3.0), out[0])
+
+    left = (TTA_ZOOM_SIZE[0] - IMAGE_SIZE[0]) // 2
+    top = (TTA_ZOOM_SIZE[1] - IMAGE_SIZE[1]) // 2
+    zoomed = img.resize(TTA_ZOOM_SIZE, reducing_gap=3.0).crop((left, top, left + IMAGE_SIZE[0], top + IMAGE_SIZE[1]))
+    _normalize(zoomed, out[1])
+
+    # Horizontal mirrors are copies within the buffer
+    out[2] = out[0][:, ::-1]
+    out[3] = out[1][:, ::-1]
+    return out
+
+
+def preprocess_batch(images, out=None, tta=False):
+    """
+    Model input for a list of images as one contiguous [n, 224, 224, 3]
+    float32 array, equal to preprocess_input(np.stack(...)) on the decoded
+    pixels. With `tta` each image takes TTA_VIEWS consecutive rows.
+    `out` (at least that many rows) is filled instead of allocating.
+    """
+    views = TTA_VIEWS if tta else 1
+    rows = len(images) * views
+    x = np.empty((rows, *IMAGE_SHAPE), dtype=np.float32) if out is None else out[:rows]
+    for i, image in enumerate(images):
+        if tta:
+            preprocess_views(image, x[i * views:(i + 1) * views])
+        else:
+            preprocess_image(image, x[i])
+    return x
+
+
+def combine_views(probs, tta):
+    """Per-image probabilities from the model output for preprocess_batch rows."""
+    if not tta:
+        return probs
+    return probs.reshape(-1, TTA_VIEWS, probs.shape[-1]).mean(axis=1)
+
+
+def calibrate(probs, temperature):
+    """Temperature scaling of softmax outputs: softmax(log(p) / T)."""
+    if temperature == 1.0:
+        return probs
+    logits = np.log(np.clip(probs, 1e-12, None)) / temperature
+    logits -= logits.max(axis=-1, keepdims=True)
+    scaled = np.exp(logits)
+    return scaled / scaled.sum(axis=-1, keepdims=True)
+
+
+_calibration = None
+
+
+def calibration():
+    """Fitted temperatures from INFERENCE_CALIBRATION_PATH ({"plain": {"temperature": ...}, "tta": {...}}), or none."""
+    global _calibration
+    if _calibration is None:
+        try:
+            with open(INFERENCE_CALIBRATION_PATH) as f:
+                _calibration = json.load(f)
+            logger.info("Calibration loaded", extra={"path": INFERENCE_CALIBRATION_PATH})
+        except FileNotFoundError:
+            _calibration = {}
+    return _calibration
+
+
+def temperature(tta):
+    return float(calibration().get("tta" if tta else "plain", {}).get("temperature", 1.0))
+
+
+def to_results(probs, tta, class_names=CLASS_NAMES):
+    """Calibrated result dicts for per-image probabilities from combine_views."""
+    return [to_result(row, class_names) for row in calibrate(probs, temperature(tta))]
+
+
+class BatchBuffer:
+    """Per-thread float32 batch array, reused across calls and grown when a batch does not fit."""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def get(self, n):
+        buf = getattr(self._local, "buf", None)
+        if buf is None or len(buf) < n:
+            buf = np.empty((max(n, 2 * len(buf) if buf is not None else n), *IMAGE_SHAPE), dtype=np.float32)
+            self._local.buf = buf
+        return buf[:n]
+
+
+def to_result(probs, class_names=CLASS_NAMES):
+    class_idx = int(np.argmax(probs))
+    confidence = float(probs[class_idx])
+
+    # Get all class probabilities
+    all_probabilities = {
+        class_names[i]: float(probs[i])
+        for i in range(len(class_names))
+    }
+
+    return {
+        "waste_type": class_names[class_idx],
+        "confidence": round(confidence, 4),
+        "class_index": class_idx,
+        "all_probabilities": all_probabilities
+    }
+
+
+def segment_views(buf, n, n_classes):
+    """Model input and probability arrays over a segment holding a batch of `n`."""
+    inputs = np.ndarray((n, *IMAGE_SHAPE), dtype=np.float32, buffer=buf)
+    probs = np.ndarray((n, n_classes), dtype=np.float32, buffer=buf, offset=n * IMAGE_BYTES)
+    return inputs, probs
+
+
+class InferenceClient:
+    """Same predict / predict_batch interface as WasteDetector, backed by the inference server."""
+
+    def __init__(self, socket_path=INFERENCE_SOCKET, timeout=INFERENCE_TIMEOUT_SECONDS):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._segments = set()
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def _segment(self, nbytes):
+        """This thread's segment, replaced by a larger one when a batch does not fit."""
+        shm = getattr(self._local, "shm", None)
+        if shm is not None and shm.size >= nbytes:
+            return shm
+        if shm is not None:
+            self._release(shm)
+        # Round up so a few slightly larger batches do not each reallocate
+        shm = shared_memory.SharedMemory(create=True, size=1 << (nbytes - 1).bit_length())
+        with self._lock:
+            self._segments.add(shm)
+        self._local.shm = shm
+        return shm
+
+    def _release(self, shm):
+        with self._lock:
+            self._segments.discard(shm)
+        shm.close()
+        shm.unlink()
+
+    def close(self):
+        with self._lock:
+            segments, self._segments = self._segments, set()
+        for shm in segments:
+            try:
+                shm.close()
+                shm.unlink()
+            except (BufferError, FileNotFoundError):
+                pass
+
+    def _call(self, request):
+        with span("inference_rpc"), socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.settimeout(self.timeout)
+            conn.connect(self.socket_path)
+            conn.sendall(json.dumps(request).encode() + b"\n")
+            reply = conn.makefile("rb").readline()
+        if not reply:
+            raise ConnectionError("Inference server closed the connection")
+        reply = json.loads(reply)
+        if "error" in reply:
+            raise RuntimeError(f"Inference server: {reply['error']}")
+        return reply
+
+    def predict_probs(self, images, tta=False):
+        """Uncalibrated per-image probabilities, as WasteDetector.predict_probs."""
+        rows, n_classes = len(images) * (TTA_VIEWS if tta else 1), len(CLASS_NAMES)
+        shm = self._segment(rows * IMAGE_BYTES + rows * n_classes * 4)
+        inputs, probs = segment_views(shm.buf, rows, n_classes)
+        reusable = True
+        try:
+            preprocess_batch(images, out=inputs, tta=tta)
+            try:
+                self._call({"shm": shm.name, "n": rows, "classes": n_classes})
+            except Exception:
+                # After a timeout the server may still be writing into the segment, so never reuse it
+                reusable = False
+                raise
+            return combine_views(np.array(probs), tta)
+        finally:
+            # Views must be gone before the segment can be closed
+            del inputs, probs
+            if not reusable:
+                self._local.shm = None
+                self._release(shm)
+
+    def predict_batch(self, images, tta=INFERENCE_TTA):
+        if not images:
+            return []
+        return to_results(self.predict_probs(images, tta), tta)
+
+    def predict(self, image, tta=INFERENCE_TTA):
+        return self.predict_batch([image], tta)[0]
+
+
+_client = None
+
+
+def get_classifier(model_path=None):
+    """The inference server client with INFERENCE_MODE=pool, else the in-process model."""
+    global _client
+    if INFERENCE_MODE == "pool":
+        if _client is None:
+            _client = InferenceClient()
+        return _client
+
+    from app.services.waste_detector import get_waste_detector
+    return get_waste_detector(model_path)
@@ -0,0 +1,181 @@
+import logging
+import os
+
+from sqlalchemy import delete, func, update
+
+from app.core.config import PICKUP_CLASSIFY_BATCH_SIZE
+
+from app.models.pickup_request import PickupRequest
+from app.services.image_pipeline import build_derivatives, derivative_path, strip_exif
+from app.services.inference import get_classifier
+from app.services.job_queue import enqueue, job_handler
+from app.services.object_index import lock_path, object_exists, release_object
+from app.services.points import calculate_points, points_cache
+from app.services.storage import (
+    delete_pickup_image,
+    download_object,
+    public_url,
+    storage,
+    upload_object,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@job_handler("upload_pickup_image")
+def upload_pickup_image_job(db, payload):
+    spool_path = payload["spool_path"]
+    if not os.path.exists(spool_path):
+        # A previous attempt uploaded and cleaned up but died before marking the job done
+        logger.warning("Spooled image already gone, skipping upload", extra={"spool_path": spool_path})
+        return
+
+    # Every pickup referencing the bytes may have been deleted before the upload ran
+    if object_exists(db, payload["path"]):
+        with open(spool_path, "rb") as f:
+            contents = f.read()
+
+        # This runs in a job worker process, so resizing never touches the API workers.
+        # The path is content-addressed, so a retry or a concurrent upload writes the same bytes
+        for name, data in build_derivatives(contents).items():
+            upload_object(derivative_path(payload["path"], name), data, "image/webp")
+        upload_object(payload["path"], strip_exif(contents), payload["content_type"])
+
+        # Locked only for the check and the commit, so create_pickup_request is not held up by the
+        # uploads. If the last reference went away meanwhile, its delete job may have run before
+        # the bytes landed, so queue another one; it re-checks the count under the same lock
+        lock_path(db, payload["path"])
+        if object_exists(db, payload["path"]):
+            enqueue(db, "classify_pickup_image", {"path": payload["path"]})
+        else:
+            enqueue(db, "delete_pickup_image", {"image_url": public_url(payload["path"])})
+
+    # The spooled bytes are the only input a retry has, so keep them until this is committed
+    db.commit()
+    os.remove(spool_path)
+
+
+def _suggested_points(user_type, result):
+    # A user label naming another known class is scored like a manual override of the model.
+    # Free text the point table does not know ("TV", "old fridge") leaves the prediction to score
+    known = {name.lower(): name for name in points_cache.table.index}
+    user_class = known.get((user_type or "").strip().lower())
+    if user_class and user_class != result["waste_type"]:
+        return calculate_points(user_class, result["confidence"], user_override=True)
+    return calculate_points(result["waste_type"], result["confidence"])
+
+
+def _classify(paths):
+    """Results and errors by path; an image that cannot be fetched or classified only fails itself."""
+    images, errors = {}, {}
+    for path in paths:
+        try:
+            images[path] = download_object(path)
+        except Exception as e:
+            errors[path] = e
+    if not images:
+        return {}, errors
+
+    classifier = get_classifier()
+    try:
+        return dict(zip(images, classifier.predict_batch(list(images.values())))), errors
+    except Exception:
+        # One undecodable image fails the whole model call; classify singly to find it
+        results = {}
+        for path, image in images.items():
+            try:
+                results[path] = classifier.predict(image)
+            except Exception as e:
+                errors[path] = e
+        return results, errors
+
+
+@job_handler("classify_pickup_image", batch_size=PICKUP_CLASSIFY_BATCH_SIZE)
+def classify_pickup_images_job(db, payloads):
+    """
+    Classify every unclassified pickup showing the given images.
+
+    Pickups share an image when they uploaded identical bytes, so the model
+    runs once per path; an earlier prediction for the same image is reused
+    instead of running it again. Images that fail are returned as
+    per-job failures, so only their jobs are retried.
+    """
+    paths = list(dict.fromkeys(p["path"] for p in payloads))
+    urls = {public_url(path): path for path in paths}
+
+    pending = {}
+    for row in db.query(PickupRequest.id, PickupRequest.e_waste_type, PickupRequest.image_url).filter(
+        PickupRequest.image_url.in_(urls),
+        PickupRequest.classified_at.is_(None),
+    ):
+        pending.setdefault(urls[row.image_url], []).append(row)
+    if not pending:
+        return
+
+    results = {}
+    for row in db.query(
+        PickupRequest.image_url,
+        PickupRequest.predicted_type,
+        PickupRequest.predicted_confidence,
+        PickupRequest.predicted_probabilities,
+    ).filter(
+        PickupRequest.image_url.in_([public_url(path) for path in pending]),
+        PickupRequest.classified_at.is_not(None),
+    ).distinct(PickupRequest.image_url):
+        results[urls[row.image_url]] = {
+            "waste_type": row.predicted_type,
+            "confidence": float(row.predicted_confidence),
+            "all_probabilities": row.predicted_probabilities,
+        }
+
+    errors = {}
+    to_predict = [path for path in pending if path not in results]
+    if to_predict:
+        predicted, errors = _classify(to_predict)
+        results.update(predicted)
+
+    for path, rows in pending.items():
+        result = results.get(path)
+        if result is None:
+            continue
+        for row in rows:
+            db.execute(
+                update(PickupRequest)
+                .where(PickupRequest.id == row.id)
+                .values(
+                    predicted_type=result["waste_type"],
+                    predicted_confidence=result["confidence"],
+                    predicted_probabilities=result["all_probabilities"],
+                    suggested_points=_suggested_points(row.e_waste_type, result),
+                    classified_at=func.now(),
+                    # suggested_points is what an accept without points awards
+                    version=PickupRequest.version + 1,
+                )
+            )
+
+    return {i: errors[p["path"]] for i, p in enumerate(payloads) if p["path"] in errors}
+
+
+@job_handler("delete_pickup_image")
+def delete_pickup_image_job(db, payload):
+    path = storage.path_from_url(payload["image_url"])
+    if path:
+        # A new upload of the same bytes may have re-created the object since this was queued
+        lock_path(db, path)
+        if object_exists(db, path):
+            return
+    delete_pickup_image(payload["image_url"])
+
+
+@job_handler("purge_user_pickups")
+def purge_user_pickups_job(db, payload):
+    image_urls = db.execute(
+        delete(PickupRequest)
+        .where(PickupRequest.user_id == payload["user_id"])
+        .returning(PickupRequest.image_url)
+    ).scalars().all()
+
+    for image_url in image_urls:
+        path = storage.path_from_url(image_url) if image_url else None
+        if path:
+            release_object(db, path, image_url)
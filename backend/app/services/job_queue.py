@@ -0,0 +1,195 @@
+import random
+import traceback
+from datetime import timedelta
+
+from sqlalchemy import func, text
+
+from app.core.config import (
+    JOB_BACKOFF_BASE_SECONDS,
+    JOB_BACKOFF_MAX_SECONDS,
+    JOB_LOCK_TIMEOUT_SECONDS,
+    JOB_MAX_ATTEMPTS,
+)
+from app.models.job import Job
+
+_handlers = {}
+_batch_sizes = {}
+
+
+def job_handler(kind: str, batch_size: int = 1):
+    """
+    Register `fn(db, payload)` as the handler for jobs of `kind`.
+
+    With batch_size > 1 the handler is called as `fn(db, payloads)` with up
+    to that many pending jobs of the kind claimed together. It may return
+    {position in payloads: exception} for jobs that failed on their own;
+    those are retried while the rest of the batch is committed.
+    """
+    def register(fn):
+        _handlers[kind] = fn
+        _batch_sizes[kind] = batch_size
+        return fn
+    return register
+
+
+def get_handler(kind: str):
+    return _handlers.get(kind)
+
+
+def get_batch_size(kind: str) -> int:
+    return _batch_sizes.get(kind, 1)
+
+
+def enqueue(db, kind: str, payload: dict, delay_seconds: float = 0, max_attempts: int = JOB_MAX_ATTEMPTS) -> Job:
+    """
+    Add a job to the caller's session.
+
+    Nothing is queued until the caller commits, so the job is written
+    atomically with the state change that produced it.
+    """
+    job = Job(kind=kind, payload=payload, status="pending", attempts=0, max_attempts=max_attempts)
+    if delay_seconds:
+        job.run_at = func.now() + timedelta(seconds=delay_seconds)
+    db.add(job)
+    return job
+
+
+_CLAIM = text("""
+    UPDATE jobs
+    SET status = 'running',
+        locked_by = :worker_id,
+        locked_at = now(),
+        attempts = attempts + 1
+    WHERE id IN (
+        SELECT id
+        FROM jobs
+        WHERE status = 'pending'
+          AND run_at <= now()
+          AND (CAST(:kinds AS TEXT[]) IS NULL OR kind = ANY(CAST(:kinds AS TEXT[])))
+        ORDER BY run_at
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING id, kind, payload, attempts, max_attempts
+""")
+
+
+def claim(db, worker_id: str, limit: int = 1, kinds=None):
+    """Lock up to `limit` due jobs for this worker; concurrent workers skip each other's rows."""
+    rows = db.execute(_CLAIM, {"worker_id": worker_id, "limit": limit, "kinds": kinds}).mappings().all()
+    db.commit()
+    return rows
+
+
+def mark_done(db, job_id):
+    db.execute(
+        text("UPDATE jobs SET status = 'done', finished_at = now(), locked_by = NULL WHERE id = :id"),
+        {"id": job_id},
+    )
+    db.commit()
+
+
+def backoff_seconds(attempts: int) -> float:
+    """Exponential backoff with jitter, capped at JOB_BACKOFF_MAX_SECONDS."""
+    ceiling = min(JOB_BACKOFF_BASE_SECONDS * (2 ** (attempts - 1)), JOB_BACKOFF_MAX_SECONDS)
+    return random.uniform(ceiling / 2, ceiling)
+
+
+def mark_failed(db, job, error: Exception):
+    """Reschedule with backoff, or move to the dead letter state after max_attempts."""
+    message = "".join(traceback.format_exception_only(type(error), error)).strip()[:2000]
+
+    if job["attempts"] >= job["max_attempts"]:
+        db.execute(
+            text("""
+                UPDATE jobs
+                SET status = 'dead', last_error = :error, finished_at = now(), locked_by = NULL
+                WHERE id = :id
+            """),
+            {"id": job["id"], "error": message},
+        )
+    else:
+        db.execute(
+            text("""
+                UPDATE jobs
+                SET status = 'pending',
+                    last_error = :error,
+                    locked_by = NULL,
+                    run_at = now() + make_interval(secs => :delay)
+                WHERE id = :id
+            """),
+            {"id": job["id"], "error": message, "delay": backoff_seconds(job["attempts"])},
+        )
+    db.commit()
+
+
+def requeue_stale(db) -> int:
+    """
+    Return jobs held by a worker that died mid-run to the pending state.
+    A job that has used up its attempts this way (e.g. it keeps crashing the
+    worker) is dead-lettered instead.
+    """
+    result = db.execute(
+        text("""
+            UPDATE jobs
+            SET status = CASE WHEN attempts >= max_attempts THEN 'dead' ELSE 'pending' END,
+                last_error = CASE
+                    WHEN attempts >= max_attempts THEN 'Worker died while running the job'
+                    ELSE last_error
+                END,
+                finished_at = CASE WHEN attempts >= max_attempts THEN now() ELSE finished_at END,
+                locked_by = NULL
+            WHERE status = 'running'
+              AND locked_at < now() - make_interval(secs => :timeout)
+        """),
+        {"timeout": JOB_LOCK_TIMEOUT_SECONDS},
+    )
+    db.commit()
+    return result.rowcount
+
+
+def retry_dead(db, kind: str | None = None) -> int:
+    """Move dead-lettered jobs back to pending with a fresh attempt budget."""
+    result = db.execute(
+        text("""
+            UPDATE jobs
+            SET status = 'pending', attempts = 0, run_at = now(), finished_at = NULL
+            WHERE status = 'dead'
+              AND (CAST(:kind AS TEXT) IS NULL OR kind = :kind)
+        """),
+        {"kind": kind},
+    )
+    db.commit()
+    return result.rowcount
+
+
+def job_metrics(db):
+    """Counts per kind/status, oldest due job age and recent run times, in one query."""
+    rows = db.execute(text("""
+        SELECT
+            kind,
+            status,
+            COUNT(*) AS count,
+            EXTRACT(EPOCH FROM now() - MIN(run_at) FILTER (
+                WHERE status = 'pending' AND run_at <= now()
+            )) AS oldest_due_seconds,
+            AVG(EXTRACT(EPOCH FROM finished_at - locked_at)) FILTER (
+                WHERE status = 'done' AND finished_at > now() - interval '1 hour'
+            ) AS avg_run_seconds_1h,
+            AVG(attempts) AS avg_attempts
+        FROM jobs
+        GROUP BY kind, status
+        ORDER BY kind, status
+    """)).mappings().all()
+
+    kinds = {}
+    for row in rows:
+        entry = kinds.setdefault(row["kind"], {"pending": 0, "running": 0, "done": 0, "dead": 0})
+        entry[row["status"]] = row["count"]
+        if row["oldest_due_seconds"] is not None:
+            entry["oldest_due_seconds"] = round(float(row["oldest_due_seconds"]), 1)
+        if row["avg_run_seconds_1h"] is not None:
+            entry["avg_run_seconds_1h"] = round(float(row["avg_run_seconds_1h"]), 3)
+        if row["status"] == "done":
+            entry["avg_attempts_done"] = round(float(row["avg_attempts"]), 2)
+    return kinds
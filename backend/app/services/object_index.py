@@ -0,0 +1,62 @@
+from sqlalchemy import text
+
+from app.services.job_queue import enqueue
+
+
+def lock_path(db, path: str):
+    """Serialize reference changes and deletion of one object until the transaction ends."""
+    db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:path))"), {"path": path})
+
+
+def acquire_object(db, path: str, sha256: str, size: int, content_type: str) -> bool:
+    """
+    Add a reference to a content-addressed object in the caller's transaction.
+
+    Returns True when this is the first reference, i.e. the bytes still have
+    to be uploaded; a duplicate upload is just this counter increment.
+    """
+    lock_path(db, path)
+    ref_count = db.execute(
+        text("""
+            INSERT INTO stored_objects (path, sha256, size, content_type, ref_count)
+            VALUES (:path, :sha256, :size, :content_type, 1)
+            ON CONFLICT (path) DO UPDATE
+            SET ref_count = stored_objects.ref_count + 1
+            RETURNING ref_count
+        """),
+        {"path": path, "sha256": sha256, "size": size, "content_type": content_type},
+    ).scalar_one()
+    return ref_count == 1
+
+
+def release_object(db, path: str, image_url: str):
+    """
+    Drop a reference in the caller's transaction; the stored bytes are
+    deleted (via the job queue) only when the last reference goes away.
+    Images stored before content addressing have no index row and are
+    deleted straight away.
+    """
+    lock_path(db, path)
+    ref_count = db.execute(
+        text("""
+            UPDATE stored_objects
+            SET ref_count = ref_count - 1
+            WHERE path = :path
+            RETURNING ref_count
+        """),
+        {"path": path},
+    ).scalar_one_or_none()
+
+    if ref_count is not None and ref_count > 0:
+        return
+
+    if ref_count is not None:
+        db.execute(text("DELETE FROM stored_objects WHERE path = :path"), {"path": path})
+    enqueue(db, "delete_pickup_image", {"image_url": image_url})
+
+
+def object_exists(db, path: str) -> bool:
+    return db.execute(
+        text("SELECT 1 FROM stored_objects WHERE path = :path"),
+        {"path": path},
+    ).first() is not None
@@ -0,0 +1,204 @@
+"""
+Monthly range partitions of the transactions table.
+
+Partitions are named transactions_yYYYYmMM and cover [month start, next
+month start) in UTC. A default partition catches rows outside every
+range; ensure_partitions keeps creating months ahead so it stays empty.
+
+Archiving copies a month to <TRANSACTION_ARCHIVE_DIR>/<partition>.csv.gz
+with COPY and checks the row count. Only then is the partition detached
+and dropped. The rollups in app.services.stats already include these rows;
+a stats rebuild after archiving only sees the months still attached.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+from datetime import date, datetime, timezone
+
+from sqlalchemy import text
+
+from app.core.config import (
+    TRANSACTION_ARCHIVE_DIR,
+    TRANSACTION_PARTITIONS_AHEAD,
+    TRANSACTION_RETENTION_MONTHS,
+)
+from app.database import engine
+
+logger = logging.getLogger(__name__)
+
+TABLE = "transactions"
+DEFAULT_PARTITION = f"{TABLE}_default"
+_PARTITION_NAME = re.compile(rf"^{TABLE}_y(\d{{4}})m(\d{{2}})$")
+
+
+def month_start(d) -> date:
+    return date(d.year, d.month, 1)
+
+
+def add_months(d: date, months: int) -> date:
+    index = d.year * 12 + d.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{TABLE}_y{month.year:04d}m{month.month:02d}"
+
+
+def is_partitioned(db) -> bool:
+    return db.execute(
+        text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = CAST(:table AS regclass)"),
+        {"table": TABLE},
+    ).first() is not None
+
+
+def list_partitions(db):
+    """Attached monthly partitions as (name, month start), oldest first."""
+    names = db.execute(
+        text("""
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = CAST(:table AS regclass)
+        """),
+        {"table": TABLE},
+    ).scalars().all()
+
+    months = []
+    for name in names:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            months.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+    return sorted(months, key=lambda item: item[1])
+
+
+def create_partition(db, month: date):
+    db.execute(text(f"""
+        CREATE TABLE IF NOT EXISTS {partition_name(month)}
+        PARTITION OF {TABLE}
+        FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')
+    """))
+
+
+def _create_months(db, start: date | None, months_ahead: int) -> list[str]:
+    existing = {name for name, _ in list_partitions(db)}
+    db.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {TABLE} DEFAULT"))
+
+    created = []
+    this_month = month_start(datetime.now(timezone.utc))
+    month = start or this_month
+    while month <= add_months(this_month, months_ahead):
+        if partition_name(month) not in existing:
+            create_partition(db, month)
+            created.append(partition_name(month))
+        month = add_months(month, 1)
+    return created
+
+
+def ensure_partitions(db, months_ahead: int = TRANSACTION_PARTITIONS_AHEAD) -> list[str]:
+    """Create the default partition and this month's through `months_ahead` months ahead."""
+    created = _create_months(db, None, months_ahead)
+    db.commit()
+    return created
+
+
+def _export(name: str, archive_dir: str):
+    """COPY one partition to gzip CSV; returns (path, rows, sha256)."""
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f"{name}.csv.gz")
+    tmp = path + ".tmp"
+
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        with gzip.open(tmp, "wb") as f:
+            cursor.copy_expert(f"COPY {name} TO STDOUT WITH (FORMAT csv, HEADER true)", f)
+        raw.rollback()
+    finally:
+        raw.close()
+
+    digest = hashlib.sha256()
+    rows = -1  # header
+    with gzip.open(tmp, "rb") as f:
+        for line in f:
+            digest.update(line)
+            rows += 1
+    os.replace(tmp, path)
+    return path, rows, digest.hexdigest()
+
+
+def archive_partition(db, name: str, archive_dir: str = TRANSACTION_ARCHIVE_DIR) -> dict:
+    expected = db.execute(text(f"SELECT COUNT(*) FROM {name}")).scalar_one()
+    path, rows, sha256 = _export(name, archive_dir)
+    # Rows contain no raw newlines (uuids, numbers, short strings), so lines == rows
+    if rows != expected:
+        raise RuntimeError(f"Archive of {name} has {rows} rows, table has {expected}; keeping the partition")
+
+    manifest = {
+        "partition": name,
+        "rows": rows,
+        "sha256": sha256,
+        "file": os.path.basename(path),
+        "archived_at": datetime.now(timezone.utc).isoformat(),
+    }
+    with open(os.path.join(archive_dir, f"{name}.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    # Plain DETACH takes a brief exclusive lock on the parent; the partition is no longer queried
+    db.execute(text(f"ALTER TABLE {TABLE} DETACH PARTITION {name}"))
+    db.execute(text(f"DROP TABLE {name}"))
+    db.commit()
+    logger.info("Archived transaction partition", extra=manifest)
+    return manifest
+
+
+def archive_old_partitions(db, retention_months: int = TRANSACTION_RETENTION_MONTHS, archive_dir: str = TRANSACTION_ARCHIVE_DIR):
+    """Archive every month that ended more than `retention_months` full months ago."""
+    if retention_months <= 0:
+        return []
+    keep_from = add_months(month_start(datetime.now(timezone.utc)), -retention_months)
+    return [
+        archive_partition(db, name, archive_dir)
+        for name, month in list_partitions(db)
+        if month < keep_from
+    ]
+
+
+def maintain_partitions(db):
+    """Periodic upkeep: create upcoming months and archive expired ones."""
+    if not is_partitioned(db):
+        return
+    created = ensure_partitions(db)
+    if created:
+        logger.info("Created transaction partitions", extra={"partitions": created})
+    archive_old_partitions(db)
+
+
+def convert_to_partitioned(db, months_ahead: int = TRANSACTION_PARTITIONS_AHEAD):
+    """
+    One-off migration of an existing plain transactions table. Copies all
+    rows in one transaction, which blocks deposits until it commits.
+    """
+    if is_partitioned(db):
+        return False
+
+    first = db.execute(text(f"SELECT MIN(created_at) FROM {TABLE}")).scalar()
+    db.execute(text(f"LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE"))
+    db.execute(text(f"ALTER TABLE {TABLE} RENAME TO {TABLE}_unpartitioned"))
+    db.execute(text(f"""
+        CREATE TABLE {TABLE} (LIKE {TABLE}_unpartitioned INCLUDING DEFAULTS)
+        PARTITION BY RANGE (created_at)
+    """))
+    db.execute(text(f"ALTER TABLE {TABLE} ADD PRIMARY KEY (id, created_at)"))
+    db.execute(text(f"ALTER TABLE {TABLE} ADD FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE"))
+    db.execute(text(f"ALTER TABLE {TABLE} ADD FOREIGN KEY (bin_id) REFERENCES bins(id) ON DELETE RESTRICT"))
+    db.execute(text(f"CREATE INDEX ix_transactions_created_at_id ON {TABLE} (created_at, id)"))
+    db.execute(text(f"CREATE INDEX ix_transactions_user_id_created_at ON {TABLE} (user_id, created_at)"))
+    _create_months(db, month_start(first) if first else None, months_ahead)
+    db.execute(text(f"INSERT INTO {TABLE} SELECT * FROM {TABLE}_unpartitioned"))
+    db.execute(text(f"DROP TABLE {TABLE}_unpartitioned"))
+    db.commit()
+    return True
+
@@ -0,0 +1,240 @@
+"""
+Admin decisions on pickup requests, safe under concurrent admins.
+
+Each decision is one conditional UPDATE ... WHERE status = 'open'
+RETURNING: of two admins acting on the same request, exactly one matches
+the row, and the other gets nothing back and a 400/409. Points are added
+with `points = points + :points` in SQL, in the same transaction.
+
+`expected_version` is optional optimistic concurrency: the decision only
+applies if the request is still at the version the admin looked at (every
+write to a pickup request bumps `version`).
+
+The bulk_* variants apply one decision to a list of requests with a single
+set-based UPDATE ... WHERE id = ANY(:ids) AND status = 'open', then credit
+all users with one UPDATE ... FROM (VALUES ...), and report an outcome
+per ID.
+"""
+from fastapi import HTTPException
+from sqlalchemy import Integer, String, column, select, text, update, values
+
+from app.models.user import User
+from app.services.stats import record_pickup, record_pickups
+
+# Most requests one bulk call may decide
+BULK_MAX = 1000
+
+_ACCEPT = text("""
+    UPDATE pickup_requests
+    SET status = 'accepted',
+        points_awarded = COALESCE(CAST(:points AS INTEGER), suggested_points),
+        admin_id = :admin_id,
+        version = version + 1,
+        updated_at = now()
+    WHERE id = :id
+      AND status = 'open'
+      AND (CAST(:expected_version AS INTEGER) IS NULL OR version = :expected_version)
+      AND COALESCE(CAST(:points AS INTEGER), suggested_points) IS NOT NULL
+    RETURNING user_id, e_waste_type, points_awarded, version
+""")
+
+_REJECT = text("""
+    UPDATE pickup_requests
+    SET status = 'rejected',
+        rejection_reason = COALESCE(:reason, rejection_reason),
+        admin_id = :admin_id,
+        version = version + 1,
+        updated_at = now()
+    WHERE id = :id
+      AND status = 'open'
+      AND (CAST(:expected_version AS INTEGER) IS NULL OR version = :expected_version)
+    RETURNING version
+""")
+
+_AWARD = text("""
+    UPDATE users
+    SET points = points + :points
+    WHERE id = :user_id
+    RETURNING id
+""")
+
+
+def award_points(db, user_id, waste_type, points):
+    """Credit an accepted pickup to its user, if the account still exists."""
+    if db.execute(_AWARD, {"user_id": user_id, "points": points}).first():
+        record_pickup(db, user_id, waste_type, points)
+
+
+def raise_conflict(db, request_id, expected_version=None, open_message="Request already processed"):
+    """Explain why a conditional write on an open request matched no row."""
+    current = db.execute(
+        text("SELECT status, version FROM pickup_requests WHERE id = :id"),
+        {"id": str(request_id)},
+    ).mappings().first()
+
+    if not current:
+        raise HTTPException(404, "Pickup request not found")
+    if current["status"] != "open":
+        raise HTTPException(400, open_message)
+    if expected_version is not None and current["version"] != expected_version:
+        raise HTTPException(409, f"Pickup request changed (now version {current['version']}); reload and retry")
+
+
+def accept_pickup(db, request_id, admin_id, points=None, expected_version=None):
+    """Accept an open request in the caller's transaction; returns points_awarded and the new version."""
+    row = db.execute(_ACCEPT, {
+        "id": str(request_id),
+        "admin_id": admin_id,
+        "points": points,
+        "expected_version": expected_version,
+    }).mappings().first()
+
+    if not row:
+        raise_conflict(db, request_id, expected_version)
+        raise HTTPException(400, "points_awarded is required until the image has been classified")
+
+    award_points(db, row["user_id"], row["e_waste_type"], row["points_awarded"])
+    return {"points_awarded": row["points_awarded"], "version": row["version"]}
+
+
+def reject_pickup(db, request_id, admin_id, reason=None, expected_version=None):
+    """Reject an open request in the caller's transaction; returns the new version."""
+    version = db.execute(_REJECT, {
+        "id": str(request_id),
+        "admin_id": admin_id,
+        "reason": reason,
+        "expected_version": expected_version,
+    }).scalar_one_or_none()
+
+    if version is None:
+        raise_conflict(db, request_id, expected_version)
+        raise HTTPException(409, "Pickup request changed; reload and retry")
+    return {"version": version}
+
+
+# Rows are locked in id order first, so overlapping bulk calls queue up instead of deadlocking
+_LOCK_OPEN = """
+    WITH target AS (
+        SELECT id
+        FROM pickup_requests
+        WHERE id = ANY(CAST(:ids AS UUID[]))
+          AND status = 'open'
+        ORDER BY id
+        FOR UPDATE
+    )
+"""
+
+_BULK_ACCEPT = text(_LOCK_OPEN + """
+    UPDATE pickup_requests p
+    SET status = 'accepted',
+        points_awarded = COALESCE(CAST(:points AS INTEGER), p.suggested_points),
+        admin_id = :admin_id,
+        version = p.version + 1,
+        updated_at = now()
+    FROM target
+    WHERE p.id = target.id
+      AND COALESCE(CAST(:points AS INTEGER), p.suggested_points) IS NOT NULL
+    RETURNING p.id, p.user_id, p.e_waste_type, p.points_awarded, p.version
+""")
+
+_BULK_REJECT = text(_LOCK_OPEN + """
+    UPDATE pickup_requests p
+    SET status = 'rejected',
+        rejection_reason = COALESCE(:reason, p.rejection_reason),
+        admin_id = :admin_id,
+        version = p.version + 1,
+        updated_at = now()
+    FROM target
+    WHERE p.id = target.id
+    RETURNING p.id, p.version
+""")
+
+_BULK_REASSIGN = text(_LOCK_OPEN + """
+    UPDATE pickup_requests p
+    SET admin_id = :assignee,
+        version = p.version + 1,
+        updated_at = now()
+    FROM target
+    WHERE p.id = target.id
+    RETURNING p.id, p.version
+""")
+
+
+def award_points_bulk(db, accepted):
+    """award_points for many accepted rows (user_id, e_waste_type, points_awarded): one UPDATE for all users."""
+    totals = {}
+    for row in accepted:
+        totals[row["user_id"]] = totals.get(row["user_id"], 0) + row["points_awarded"]
+    if not totals:
+        return
+
+    v = values(column("user_id", String), column("points", Integer), name="v").data(sorted(totals.items()))
+    locked = select(User.id).where(User.id.in_(list(totals))).order_by(User.id).with_for_update().cte("locked")
+    existing = set(db.execute(
+        update(User)
+        .where(User.id == v.c.user_id, User.id == locked.c.id)
+        .values(points=User.points + v.c.points)
+        .returning(User.id)
+    ).scalars())
+
+    record_pickups(db, [
+        (row["user_id"], row["e_waste_type"], row["points_awarded"])
+        for row in accepted
+        if row["user_id"] in existing
+    ])
+
+
+def _outcomes(db, ids, changed, outcome):
+    """Per-ID results: `outcome` for changed rows, otherwise why the row was left alone."""
+    results = {str(row["id"]): {"id": str(row["id"]), "outcome": outcome, **{
+        k: row[k] for k in ("points_awarded", "version") if k in row
+    }} for row in changed}
+
+    missed = [i for i in ids if i not in results]
+    if missed:
+        current = {
+            str(row["id"]): row
+            for row in db.execute(
+                text("SELECT id, status FROM pickup_requests WHERE id = ANY(CAST(:ids AS UUID[]))"),
+                {"ids": missed},
+            ).mappings()
+        }
+        for i in missed:
+            row = current.get(i)
+            if row is None:
+                results[i] = {"id": i, "outcome": "not_found"}
+            elif row["status"] != "open":
+                results[i] = {"id": i, "outcome": "not_open", "status": row["status"]}
+            else:
+                # Only accept skips open rows: no points given and none suggested yet
+                results[i] = {"id": i, "outcome": "no_points"}
+
+    return [results[i] for i in ids]
+
+
+def _bulk_ids(ids):
+    ids = list(dict.fromkeys(str(i) for i in ids))
+    if len(ids) > BULK_MAX:
+        raise HTTPException(400, f"At most {BULK_MAX} requests per bulk call")
+    return ids
+
+
+def bulk_accept(db, ids, admin_id, points=None):
+    """Accept the open requests among `ids` in the caller's transaction; one outcome per ID."""
+    ids = _bulk_ids(ids)
+    changed = db.execute(_BULK_ACCEPT, {"ids": ids, "admin_id": admin_id, "points": points}).mappings().all()
+    award_points_bulk(db, changed)
+    return _outcomes(db, ids, changed, "accepted")
+
+
+def bulk_reject(db, ids, admin_id, reason=None):
+    ids = _bulk_ids(ids)
+    changed = db.execute(_BULK_REJECT, {"ids": ids, "admin_id": admin_id, "reason": reason}).mappings().all()
+    return _outcomes(db, ids, changed, "rejected")
+
+
+def bulk_reassign(db, ids, assignee):
+    """Hand the open requests among `ids` to another admin."""
+    ids = _bulk_ids(ids)
+    changed = db.execute(_BULK_REASSIGN, {"ids": ids, "assignee": assignee}).mappings().all()
+    return _outcomes(db, ids, changed, "reassigned")
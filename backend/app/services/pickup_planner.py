@@ -0,0 +1,248 @@
+"""
+Daily collection plans for accepted pickup requests.
+
+plan_day loads the accepted requests whose preferred_datetime falls on a
+given day and splits them by preferred time window. Within each window it
+clusters them spatially, shares the clusters out between crews and orders
+each crew's stops with routing_service.optimize_order.
+
+Clustering is DBSCAN with min_samples=1, i.e. single linkage: requests in
+the same window that are within eps_m of each other, directly or through a
+chain of others, form one cluster. It runs on a grid of eps_m/sqrt(2)
+cells, so all points in a cell are linked outright and distances are only
+measured against the cells up to two away. Neighbour pairs come from
+searchsorted over the sorted cell keys, and clusters from min-label
+propagation with pointer jumping, all in numpy.
+"""
+import math
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+import numpy as np
+from sqlalchemy import text
+
+from app.core.config import PICKUP_PLAN_EPS_M, PICKUP_PLAN_WINDOW_HOURS, PICKUP_TIMEZONE
+from app.core.instrumentation import span
+from app.services.routing_service import optimize_order
+
+EARTH_RADIUS_M = 6_371_000
+
+# Cell offsets compared against each cell: half of the 5x5 block (pairs are symmetric), without the cell itself
+_NEIGHBOUR_OFFSETS = [(dx, dy) for dy in range(0, 3) for dx in range(-2, 3) if dy > 0 or dx > 0]
+
+_ACCEPTED_ON_DAY = text("""
+    SELECT
+        id,
+        ST_Y(location::geometry) AS lat,
+        ST_X(location::geometry) AS lng,
+        preferred_datetime,
+        e_waste_type,
+        address_text,
+        contact_number
+    FROM pickup_requests
+    WHERE status = 'accepted'
+      AND preferred_datetime >= :start
+      AND preferred_datetime < :end
+    ORDER BY preferred_datetime, id
+""")
+
+
+def project(lat, lng, origin):
+    """Equirectangular metres around `origin`; accurate to well under 1% across a city."""
+    lat0 = math.radians(origin["lat"])
+    x = np.radians(np.asarray(lng) - origin["lng"]) * math.cos(lat0) * EARTH_RADIUS_M
+    y = np.radians(np.asarray(lat) - origin["lat"]) * EARTH_RADIUS_M
+    return x, y
+
+
+def _neighbour_pairs(x, y, eps_m, group):
+    cell = eps_m / math.sqrt(2)
+    cx = np.floor(x / cell).astype(np.int64)
+    cy = np.floor(y / cell).astype(np.int64)
+    # Margin of two cells, so neighbour keys never wrap into another row or group
+    cx -= cx.min() - 2
+    cy -= cy.min() - 2
+    width, height = int(cx.max()) + 3, int(cy.max()) + 3
+    key = (group * height + cy) * width + cx
+
+    order = np.argsort(key, kind="stable")
+    sorted_key = key[order]
+
+    # Same cell: at most eps_m apart, so chain each point to the previous one
+    same = sorted_key[1:] == sorted_key[:-1]
+    pairs_i, pairs_j = [order[1:][same]], [order[:-1][same]]
+
+    for dx, dy in _NEIGHBOUR_OFFSETS:
+        target = key + dy * width + dx
+        lo = np.searchsorted(sorted_key, target, side="left")
+        counts = np.searchsorted(sorted_key, target, side="right") - lo
+        total = int(counts.sum())
+        if not total:
+            continue
+        i = np.repeat(np.arange(len(key)), counts)
+        # Position of each candidate within its point's run of matches
+        within = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        j = order[np.repeat(lo, counts) + within]
+        close = (x[i] - x[j]) ** 2 + (y[i] - y[j]) ** 2 <= eps_m * eps_m
+        pairs_i.append(i[close])
+        pairs_j.append(j[close])
+
+    return np.concatenate(pairs_i), np.concatenate(pairs_j)
+
+
+def _components(n, i, j):
+    """Connected components of the graph with edges (i, j), labelled 0..k-1."""
+    parent = np.arange(n)
+    while len(i):
+        ri, rj = parent[i], parent[j]
+        pending = ri != rj
+        if not pending.any():
+            break
+        # Hook the larger root under the smaller one, then flatten the trees
+        np.minimum.at(parent, np.maximum(ri[pending], rj[pending]), np.minimum(ri[pending], rj[pending]))
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+        i, j = i[pending], j[pending]
+    return np.unique(parent, return_inverse=True)[1]
+
+
+@span("pickup_clustering")
+def cluster_points(x, y, eps_m, group=None):
+    """
+    Cluster label per point: DBSCAN with min_samples=1 on metre
+    coordinates. Points with different `group` values (e.g. time windows)
+    never share a cluster.
+    """
+    n = len(x)
+    if n == 0:
+        return np.empty(0, dtype=np.int64)
+    group = np.zeros(n, dtype=np.int64) if group is None else np.asarray(group, dtype=np.int64)
+    i, j = _neighbour_pairs(np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64), eps_m, group)
+    return _components(n, i, j)
+
+
+def _window_label(window, window_hours):
+    start = window * window_hours
+    end = min(start + window_hours, 24)
+    return f"{int(start):02d}:{int(start % 1 * 60):02d}-{int(end):02d}:{int(end % 1 * 60):02d}"
+
+
+def _path_km(start, stops):
+    if not stops:
+        return 0.0
+    lat = np.radians([start["lat"]] + [s["lat"] for s in stops])
+    lng = np.radians([start["lng"]] + [s["lng"] for s in stops])
+    h = np.sin(np.diff(lat) / 2) ** 2 + np.cos(lat[:-1]) * np.cos(lat[1:]) * np.sin(np.diff(lng) / 2) ** 2
+    return float(2 * EARTH_RADIUS_M / 1000 * np.arcsin(np.sqrt(h)).sum())
+
+
+def _centroid(stops):
+    return {"lat": sum(s["lat"] for s in stops) / len(stops), "lng": sum(s["lng"] for s in stops) / len(stops)}
+
+
+def _pieces(clusters, share):
+    """Clusters larger than one crew's share of the window, cut into runs along a nearest-neighbour path."""
+    pieces = []
+    for stops in clusters:
+        if len(stops) <= share:
+            pieces.append(stops)
+            continue
+        path = optimize_order(_centroid(stops), stops)
+        pieces.extend(path[k:k + share] for k in range(0, len(path), share))
+    return sorted(pieces, key=len, reverse=True)
+
+
+@span("pickup_planning")
+def plan_stops(requests, start, crews, eps_m=PICKUP_PLAN_EPS_M, window_hours=PICKUP_PLAN_WINDOW_HOURS,
+               max_stops=None, tz=ZoneInfo(PICKUP_TIMEZONE)):
+    """
+    Ordered stop lists for `crews` crews leaving from `start`.
+
+    `requests` are dicts with id, lat, lng and preferred_datetime (aware).
+    Windows are worked through in time order. In each one, clusters go
+    largest first to the crew with the fewest stops so far, nearest first
+    on ties. A cluster bigger than an even share of the window is split.
+    A crew then visits its clusters nearest-first, in
+    optimize_order within each. With `max_stops`, requests no crew has room
+    for are returned as unassigned.
+    """
+    result = {"requests": len(requests), "clusters": 0, "crews": [], "unassigned": []}
+    crew_state = [{"crew": c + 1, "position": start, "stops": []} for c in range(crews)]
+    if not requests:
+        result["crews"] = [{"crew": c["crew"], "stops": [], "distance_km": 0.0} for c in crew_state]
+        return result
+
+    lat = np.array([r["lat"] for r in requests], dtype=np.float64)
+    lng = np.array([r["lng"] for r in requests], dtype=np.float64)
+    local = [r["preferred_datetime"].astimezone(tz) for r in requests]
+    hours = np.array([t.hour + t.minute / 60 for t in local])
+    window = (hours // window_hours).astype(np.int64)
+
+    x, y = project(lat, lng, start)
+    labels = cluster_points(x, y, eps_m, group=window)
+    result["clusters"] = int(labels.max()) + 1
+
+    stops = [
+        {**r, "window": _window_label(int(w), window_hours), "cluster": int(c)}
+        for r, w, c in zip(requests, window, labels)
+    ]
+    by_cluster = {}
+    for stop, w, c in zip(stops, window, labels):
+        by_cluster.setdefault((int(w), int(c)), []).append(stop)
+
+    for w in sorted({w for w, _ in by_cluster}):
+        clusters = [members for (cw, _), members in by_cluster.items() if cw == w]
+        share = max(1, math.ceil(sum(len(m) for m in clusters) / crews))
+        queue = _pieces(clusters, share)
+        assigned = {c["crew"]: [] for c in crew_state}
+
+        def load(c):
+            return len(c["stops"]) + sum(len(p) for p in assigned[c["crew"]])
+
+        while queue:
+            piece = queue.pop(0)
+            centre = _centroid(piece)
+            open_crews = [c for c in crew_state if max_stops is None or load(c) < max_stops]
+            if not open_crews:
+                result["unassigned"].extend(s["id"] for s in piece)
+                continue
+            crew = min(open_crews, key=lambda c: (load(c), _path_km(c["position"], [centre])))
+            if max_stops is not None and load(crew) + len(piece) > max_stops:
+                room = max_stops - load(crew)
+                piece, rest = piece[:room], piece[room:]
+                queue.insert(0, rest)
+            assigned[crew["crew"]].append(piece)
+
+        for crew in crew_state:
+            pieces = assigned[crew["crew"]]
+            centres = [{**_centroid(p), "piece": k} for k, p in enumerate(pieces)]
+            for centre in optimize_order(crew["position"], centres):
+                ordered = optimize_order(crew["position"], pieces[centre["piece"]])
+                crew["stops"].extend(ordered)
+                crew["position"] = ordered[-1]
+
+    result["crews"] = [
+        {
+            "crew": c["crew"],
+            "stops": c["stops"],
+            "distance_km": round(_path_km(start, c["stops"]), 3),
+        }
+        for c in crew_state
+    ]
+    return result
+
+
+def day_bounds(day, tz=ZoneInfo(PICKUP_TIMEZONE)):
+    start = datetime.combine(day, time.min, tzinfo=tz)
+    return start, start + timedelta(days=1)
+
+
+def plan_day(db, day, start, crews, **options):
+    """plan_stops over the requests accepted for `day` (a date in PICKUP_TIMEZONE)."""
+    day_start, day_end = day_bounds(day)
+    rows = db.execute(_ACCEPTED_ON_DAY, {"start": day_start, "end": day_end}).mappings().all()
+    requests = [{**row, "id": str(row["id"])} for row in rows]
+    return {"day": day.isoformat(), "start": start, **plan_stops(requests, start, crews, **options)}
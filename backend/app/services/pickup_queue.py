@@ -0,0 +1,99 @@
+import base64
+from datetime import datetime
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import func, select, tuple_
+
+from app.models.enums import PickupStatus
+from app.models.pickup_request import PickupRequest
+
+# Statuses shown in the admin queue when no status filter is given
+ADMIN_QUEUE_STATUSES = [
+    PickupStatus.open,
+    PickupStatus.accepted,
+    PickupStatus.rejected,
+]
+
+
+def encode_cursor(created_at: datetime, request_id) -> str:
+    raw = f"{created_at.isoformat()}|{request_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str):
+    try:
+        created_at, request_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), UUID(request_id)
+    except Exception:
+        raise HTTPException(400, "Invalid cursor")
+
+
+def queue_filters(
+    statuses=None,
+    e_waste_type=None,
+    created_from=None,
+    created_to=None,
+    near=None,
+    radius_m=None,
+):
+    """
+    WHERE clauses for the admin queue.
+
+    `near` is a (lat, lng) tuple; together with `radius_m` it keeps requests
+    within that many metres (ST_DWithin on the geography column, so the
+    location blob is only read by the index, never returned).
+    """
+    clauses = [PickupRequest.status.in_(statuses or ADMIN_QUEUE_STATUSES)]
+
+    if e_waste_type:
+        clauses.append(PickupRequest.e_waste_type == e_waste_type)
+    if created_from is not None:
+        clauses.append(PickupRequest.created_at >= created_from)
+    if created_to is not None:
+        clauses.append(PickupRequest.created_at < created_to)
+    if radius_m is not None:
+        if near is None:
+            raise HTTPException(400, "radius_m requires a depot location")
+        lat, lng = near
+        clauses.append(
+            func.ST_DWithin(
+                PickupRequest.location,
+                func.ST_GeogFromText(f"SRID=4326;POINT({lng} {lat})"),
+                radius_m,
+            )
+        )
+
+    return clauses
+
+
+def queue_page_query(columns, clauses, cursor=None, limit=None):
+    """Keyset-paginated query over (created_at, id), newest first."""
+    query = (
+        select(*columns)
+        .where(*clauses)
+        .order_by(PickupRequest.created_at.desc(), PickupRequest.id.desc())
+    )
+    if cursor:
+        created_at, request_id = decode_cursor(cursor)
+        query = query.where(
+            tuple_(PickupRequest.created_at, PickupRequest.id) < tuple_(created_at, request_id)
+        )
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+def queue_status_counts(db, clauses):
+    """Number of requests per status for the given filters, in one GROUP BY."""
+    rows = db.execute(
+        select(PickupRequest.status, func.count())
+        .where(*clauses)
+        .group_by(PickupRequest.status)
+    ).all()
+
+    counts = {status.value: 0 for status in PickupStatus}
+    for status, count in rows:
+        counts[status.value] = count
+    counts["total"] = sum(count for _, count in rows)
+    return counts
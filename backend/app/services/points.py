@@ -0,0 +1,258 @@
+"""
+Point tables for scoring deposits, served from an in-process cache.
+
+Values live in the waste_types table, one row per classifier class. A
+PointTable snapshot holds them as tuples indexed by the model's class
+index plus a name -> index map, so scoring never queries the database.
+Classes without a row keep the defaults below.
+
+A background thread polls a cheap fingerprint of the table (row count
+and latest updated_at) every POINTS_REFRESH_SECONDS and swaps in a new
+snapshot when it changes. Edits made through /admin/waste-types refresh
+this process immediately; other processes follow on their next poll.
+"""
+import logging
+import threading
+import time
+
+from sqlalchemy import text
+
+from app.core.config import POINTS_REFRESH_SECONDS
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Scoring: confidence thresholds
+HIGH_CONFIDENCE = 0.75
+LOW_CONFIDENCE = 0.40
+LOW_CONFIDENCE_FACTOR = 0.6
+
+# Classifier output order; position is the class index
+CLASS_NAMES = (
+    "Battery",
+    "Keyboard",
+    "Microwave",
+    "Mobile",
+    "Mouse",
+    "PCB",
+    "Player",
+    "Printer",
+    "Television",
+    "Washing Machine",
+    "Laptop",
+)
+
+# Defaults for classes without a waste_types row
+# Base points per waste type (used for Cases 1 & 2)
+BASE_POINTS = {
+    "Battery": 110,
+    "Keyboard": 36,
+    "Microwave": 270,
+    "Mobile": 150,
+    "Mouse": 27,
+    "PCB": 165,
+    "Player": 90,
+    "Printer": 200,
+    "Television": 330,
+    "Washing Machine": 400,
+    "Laptop": 180,
+}
+
+# Manual override caps (Case 3: confidence < 0.40 or user overrides ML)
+MANUAL_OVERRIDE_POINTS = {
+    "PCB": 90,
+    "Battery": 60,
+    "Mobile": 80,
+    "Player": 50,
+    "Mouse": 15,
+    "Keyboard": 20,
+    "Printer": 120,
+    "Microwave": 150,
+    "Television": 180,
+    "Washing Machine": 220,
+    "Laptop": 100,
+}
+
+# Points for a waste type the table does not know
+UNKNOWN_BASE_POINTS = 0
+UNKNOWN_MANUAL_POINTS = 50
+
+_ROWS_QUERY = text("""
+    SELECT id, name, class_index, base_points, manual_points
+    FROM waste_types
+""")
+
+_FINGERPRINT_QUERY = text("""
+    SELECT COUNT(*), MAX(updated_at)
+    FROM waste_types
+""")
+
+
+class PointTable:
+    """One version of the point tables; replaced wholesale, never mutated."""
+
+    __slots__ = ("version", "fingerprint", "names", "base", "manual", "index")
+
+    def __init__(self, version, fingerprint, names, base, manual):
+        self.version = version
+        self.fingerprint = fingerprint
+        self.names = names
+        self.base = base
+        self.manual = manual
+        self.index = {name: i for i, name in enumerate(names) if name is not None}
+
+    def class_index(self, waste_type: str):
+        return self.index.get(waste_type)
+
+    def base_points(self, waste_type: str) -> int:
+        i = self.index.get(waste_type)
+        return self.base[i] if i is not None else UNKNOWN_BASE_POINTS
+
+    def manual_points(self, waste_type: str) -> int:
+        i = self.index.get(waste_type)
+        return self.manual[i] if i is not None else UNKNOWN_MANUAL_POINTS
+
+    def as_list(self):
+        return [
+            {"class_index": i, "name": name, "base_points": self.base[i], "manual_points": self.manual[i]}
+            for i, name in enumerate(self.names)
+        ]
+
+
+def load_rows(db):
+    return db.execute(_ROWS_QUERY).mappings().all()
+
+
+def _name_key(name):
+    return name.strip().lower()
+
+
+def build_table(rows, version=0, fingerprint=()) -> PointTable:
+    """
+    Merge waste_types rows over the defaults. Rows with a class_index place that
+    class; others match an existing class by name (case-insensitively) or are
+    appended. Raises ValueError if two rows, or a row and a default class at
+    another index, name the same class.
+    """
+    names = list(CLASS_NAMES)
+    base = [BASE_POINTS.get(name, UNKNOWN_BASE_POINTS) for name in names]
+    manual = [MANUAL_OVERRIDE_POINTS.get(name, UNKNOWN_MANUAL_POINTS) for name in names]
+
+    seen = set()
+    for row in sorted(rows, key=lambda r: (r["class_index"] is None, r["class_index"] or 0)):
+        name = row["name"] or row["id"]
+        key = _name_key(name)
+        if key in seen:
+            raise ValueError(f"More than one waste_types row names {name!r}")
+        seen.add(key)
+
+        i = row["class_index"]
+        if i is None:
+            keys = [_name_key(n) if n else None for n in names]
+            i = keys.index(key) if key in keys else len(names)
+        while i >= len(names):
+            names.append(None)
+            base.append(UNKNOWN_BASE_POINTS)
+            manual.append(UNKNOWN_MANUAL_POINTS)
+        # Keep the classifier's spelling, which is what predictions are looked up by
+        if names[i] is None or _name_key(names[i]) != key:
+            names[i] = name
+        if row["base_points"] is not None:
+            base[i] = row["base_points"]
+        if row["manual_points"] is not None:
+            manual[i] = row["manual_points"]
+
+    keys = [_name_key(name) for name in names if name]
+    if len(keys) != len(set(keys)):
+        duplicates = sorted({name for name in names if name and keys.count(_name_key(name)) > 1})
+        raise ValueError(f"Waste type named at more than one class index: {', '.join(duplicates)}")
+
+    return PointTable(
+        version=version,
+        fingerprint=fingerprint,
+        names=tuple(names),
+        base=tuple(base),
+        manual=tuple(manual),
+    )
+
+
+class PointsCache:
+    """Holds the current PointTable; readers take `table` without locking."""
+
+    def __init__(self, refresh_seconds=POINTS_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self.table = build_table([])
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def refresh(self, db, force=False) -> PointTable:
+        """Reload if the table changed since the current snapshot (or always with force)."""
+        with self._lock:
+            count, updated_at = db.execute(_FINGERPRINT_QUERY).one()
+            fingerprint = (count, updated_at)
+            if not force and fingerprint == self.table.fingerprint:
+                return self.table
+
+            self.table = build_table(load_rows(db), self.table.version + 1, fingerprint)
+            logger.info("Point table loaded", extra={"version": self.table.version, "rows": count})
+            return self.table
+
+    def refresh_now(self, force=False):
+        db = SessionLocal()
+        try:
+            return self.refresh(db, force)
+        finally:
+            db.close()
+
+    def start(self):
+        if self._thread is None:
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="points-cache", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self):
+        while not self._stopping.is_set():
+            started = time.monotonic()
+            try:
+                self.refresh_now()
+            except Exception:
+                logger.exception("Point table refresh failed, keeping the previous snapshot")
+            self._stopping.wait(max(self.refresh_seconds - (time.monotonic() - started), 1.0))
+
+
+points_cache = PointsCache()
+
+
+def score(base: int, manual: int, confidence: float, user_override: bool = False) -> int:
+    """
+    Case 1 (High Confidence): confidence >= 0.75 → points = base_points × confidence
+    Case 2 (Low Confidence): 0.40 <= confidence < 0.75 → points = base_points × 0.6
+    Case 3 (Manual): confidence < 0.40 or user_override → points = manual_override_cap
+    """
+    if user_override or confidence < LOW_CONFIDENCE:
+        return int(manual)
+    if confidence >= HIGH_CONFIDENCE:
+        return int(base * confidence)
+    return int(base * LOW_CONFIDENCE_FACTOR)
+
+
+def calculate_points(waste_type: str, confidence: float, user_override: bool = False) -> int:
+    """Points for a deposit of `waste_type` under the current point table."""
+    table = points_cache.table
+    i = table.index.get(waste_type)
+    if i is None:
+        return score(UNKNOWN_BASE_POINTS, UNKNOWN_MANUAL_POINTS, confidence, user_override)
+    return score(table.base[i], table.manual[i], confidence, user_override)
+
+
+def calculate_points_for_class(class_index: int, confidence: float, user_override: bool = False) -> int:
+    """Same as calculate_points, keyed by the classifier's output index."""
+    table = points_cache.table
+    return score(table.base[class_index], table.manual[class_index], confidence, user_override)
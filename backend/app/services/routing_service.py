@@ -1,6 +1,10 @@
 import math
+
+import numpy as np
 import requests
 
+from app.core.instrumentation import span
+
 def haversine(a, b):
     R = 6371  
     lat1, lon1 = math.radians(a["lat"]), math.radians(a["lng"])
@@ -14,25 +18,35 @@ def haversine(a, b):
 
 
 def optimize_order(start, bins):
+    """
+    Greedy nearest-neighbour order of `bins` (dicts with lat/lng) from `start`.
+
+    Each step measures the distance from the current stop to every remaining
+    one in a single numpy expression; ties go to the earlier bin.
+    """
+    if not bins:
+        return []
+
+    lat = np.radians([b["lat"] for b in bins])
+    lng = np.radians([b["lng"] for b in bins])
+    cos_lat = np.cos(lat)
+    visited = np.zeros(len(bins), dtype=bool)
+
     ordered = []
-    current = start
-    remaining = bins.copy()
-
-    while remaining:
-        nearest = min(
-            remaining,
-            key=lambda b: haversine(
-                {"lat": current["lat"], "lng": current["lng"]},
-                {"lat": b["lat"], "lng": b["lng"]}
-            )
-        )
-        ordered.append(nearest)
-        remaining.remove(nearest)
-        current = nearest
+    cur_lat, cur_lng = math.radians(start["lat"]), math.radians(start["lng"])
+    for _ in range(len(bins)):
+        # Haversine term; monotonic in distance, so no need for the arcsine
+        h = np.sin((lat - cur_lat) / 2) ** 2 + math.cos(cur_lat) * cos_lat * np.sin((lng - cur_lng) / 2) ** 2
+        h[visited] = np.inf
+        i = int(np.argmin(h))
+        visited[i] = True
+        ordered.append(bins[i])
+        cur_lat, cur_lng = lat[i], lng[i]
 
     return ordered
 
 
+@span("osrm")
 def call_osrm_route(points):
     coords = ";".join([f"{p['lng']},{p['lat']}" for p in points])
 
@@ -0,0 +1,52 @@
+from decimal import Decimal
+
+import orjson
+from fastapi.responses import Response
+
+# Rows pulled from the cursor and encoded per step when streaming a result
+ROW_CHUNK_SIZE = 1000
+
+
+def _default(obj):
+    # orjson handles datetime, UUID and Enum natively; Numeric columns come back as Decimal
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(obj) -> bytes:
+    return orjson.dumps(obj, default=_default)
+
+
+def schema_columns(entity, schema):
+    """Columns of `entity` named by the fields of a Pydantic response schema."""
+    return [getattr(entity, name) for name in schema.model_fields]
+
+
+def encode_rows(result, chunk_size: int = ROW_CHUNK_SIZE) -> bytes:
+    """
+    Encode a SQLAlchemy result as a JSON array straight from its RowMappings.
+
+    Rows are consumed in partitions so only one chunk of dicts is alive at a
+    time; no ORM objects or Pydantic models are built along the way.
+    """
+    out = bytearray(b"[")
+    for chunk in result.mappings().partitions(chunk_size):
+        body = dumps([dict(row) for row in chunk])
+        if len(out) > 1:
+            out += b","
+        out += body[1:-1]
+    out += b"]"
+    return bytes(out)
+
+
+def json_response(obj, headers=None) -> Response:
+    return Response(content=dumps(obj), media_type="application/json", headers=headers)
+
+
+def rows_response(result, key: str | None = None) -> Response:
+    """JSON response for a result, optionally wrapped as {key: [...]}."""
+    body = encode_rows(result)
+    if key is not None:
+        body = b'{"' + key.encode() + b'":' + body + b"}"
+    return Response(content=body, media_type="application/json")
@@ -0,0 +1,154 @@
+"""
+Incremental statistics rollups.
+
+record_deposit / record_pickup add one event to the rollup tables inside
+the caller's transaction, so the totals commit or roll back together with
+the transaction or pickup they describe. Readers never aggregate the
+transactions table.
+"""
+from datetime import datetime, timezone
+
+from sqlalchemy import func, text
+from sqlalchemy.dialects.postgresql import insert
+
+from app.models.stats import UserWasteStats
+
+_UPSERT_USER_DEPOSIT = text("""
+    INSERT INTO user_waste_stats (user_id, waste_type, deposits, deposit_points, pickups, pickup_points, last_activity_at)
+    VALUES (:user_id, :waste_type, :deposits, :points, 0, 0, :at)
+    ON CONFLICT (user_id, waste_type) DO UPDATE
+    SET deposits = user_waste_stats.deposits + EXCLUDED.deposits,
+        deposit_points = user_waste_stats.deposit_points + EXCLUDED.deposit_points,
+        last_activity_at = GREATEST(user_waste_stats.last_activity_at, EXCLUDED.last_activity_at)
+""")
+
+_UPSERT_BIN_DAY = text("""
+    INSERT INTO bin_daily_stats (bin_id, day, deposits, points)
+    VALUES (:bin_id, (CAST(:at AS TIMESTAMPTZ) AT TIME ZONE 'UTC')::date, :deposits, :points)
+    ON CONFLICT (bin_id, day) DO UPDATE
+    SET deposits = bin_daily_stats.deposits + EXCLUDED.deposits,
+        points = bin_daily_stats.points + EXCLUDED.points
+""")
+
+_UPSERT_BIN_USER = text("""
+    INSERT INTO bin_user_stats (bin_id, user_id, deposits, points, last_deposit_at)
+    VALUES (:bin_id, :user_id, :deposits, :points, :at)
+    ON CONFLICT (bin_id, user_id) DO UPDATE
+    SET deposits = bin_user_stats.deposits + EXCLUDED.deposits,
+        points = bin_user_stats.points + EXCLUDED.points,
+        last_deposit_at = GREATEST(bin_user_stats.last_deposit_at, EXCLUDED.last_deposit_at)
+""")
+
+_UPSERT_USER_PICKUP = text("""
+    INSERT INTO user_waste_stats (user_id, waste_type, deposits, deposit_points, pickups, pickup_points, last_activity_at)
+    VALUES (:user_id, :waste_type, 0, 0, 1, :points, now())
+    ON CONFLICT (user_id, waste_type) DO UPDATE
+    SET pickups = user_waste_stats.pickups + 1,
+        pickup_points = user_waste_stats.pickup_points + EXCLUDED.pickup_points,
+        last_activity_at = now()
+""")
+
+
+def record_deposit(db, user_id, bin_id, waste_type, points, at=None):
+    params = {
+        "user_id": user_id,
+        "bin_id": str(bin_id),
+        "waste_type": waste_type,
+        "deposits": 1,
+        "points": points,
+        "at": at or datetime.now(timezone.utc),
+    }
+    db.execute(_UPSERT_USER_DEPOSIT, params)
+    db.execute(_UPSERT_BIN_DAY, params)
+    db.execute(_UPSERT_BIN_USER, params)
+
+
+def record_pickup(db, user_id, waste_type, points):
+    db.execute(_UPSERT_USER_PICKUP, {
+        "user_id": user_id,
+        "waste_type": waste_type or "Unknown",
+        "points": points,
+    })
+
+
+def record_pickups(db, pickups):
+    """record_pickup for many (user_id, waste_type, points) at once: one upsert of the per-key sums."""
+    totals = {}
+    for user_id, waste_type, points in pickups:
+        key = (user_id, waste_type or "Unknown")
+        count, total = totals.get(key, (0, 0))
+        totals[key] = (count + 1, total + points)
+    if not totals:
+        return
+
+    stmt = insert(UserWasteStats).values([
+        {
+            "user_id": user_id,
+            "waste_type": waste_type,
+            "deposits": 0,
+            "deposit_points": 0,
+            "pickups": count,
+            "pickup_points": total,
+            "last_activity_at": func.now(),
+        }
+        # Sorted, so concurrent callers take the row locks in the same order
+        for (user_id, waste_type), (count, total) in sorted(totals.items())
+    ])
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[UserWasteStats.user_id, UserWasteStats.waste_type],
+        set_={
+            "pickups": UserWasteStats.pickups + stmt.excluded.pickups,
+            "pickup_points": UserWasteStats.pickup_points + stmt.excluded.pickup_points,
+            "last_activity_at": func.now(),
+        },
+    ))
+
+
+def user_stats(db, user_id):
+    rows = db.execute(
+        text("""
+            SELECT waste_type, deposits, deposit_points, pickups, pickup_points, last_activity_at
+            FROM user_waste_stats
+            WHERE user_id = :user_id
+            ORDER BY deposit_points + pickup_points DESC
+        """),
+        {"user_id": user_id},
+    ).mappings().all()
+
+    return {
+        "user_id": user_id,
+        "totals": {
+            "deposits": sum(r["deposits"] for r in rows),
+            "deposit_points": sum(r["deposit_points"] for r in rows),
+            "pickups": sum(r["pickups"] for r in rows),
+            "pickup_points": sum(r["pickup_points"] for r in rows),
+        },
+        "by_waste_type": rows,
+    }
+
+
+def bin_daily(db, bin_id, days):
+    return db.execute(
+        text("""
+            SELECT day, deposits, points
+            FROM bin_daily_stats
+            WHERE bin_id = :bin_id
+              AND day > (now() AT TIME ZONE 'UTC')::date - CAST(:days AS INTEGER)
+            ORDER BY day
+        """),
+        {"bin_id": bin_id, "days": days},
+    ).mappings().all()
+
+
+def bin_top_users(db, bin_id, limit):
+    return db.execute(
+        text("""
+            SELECT s.user_id, u.name, s.deposits, s.points, s.last_deposit_at
+            FROM bin_user_stats s
+            JOIN users u ON u.id = s.user_id
+            WHERE s.bin_id = :bin_id
+            ORDER BY s.points DESC
+            LIMIT :limit
+        """),
+        {"bin_id": bin_id, "limit": limit},
+    ).mappings().all()
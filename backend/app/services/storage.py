@@ -1,19 +1,237 @@
+import functools
+import hashlib
+import logging
+import os
+import tempfile
+import threading
 import uuid
-from supabase import create_client
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from fastapi import UploadFile, HTTPException
-import os
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+from app.core.config import (
+    JOB_SPOOL_DIR,
+    LOCAL_STORAGE_DIR,
+    PUBLIC_BASE_URL,
+    STORAGE_BACKEND,
+)
+from app.core.instrumentation import span
+from app.services.image_pipeline import DERIVATIVE_SIZES, derivative_path
 
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+try:
+    import fcntl
+except ImportError:  # Windows: LocalStorage locks then only cover this process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
 
 BUCKET_NAME = "pickup-requests"
-MAX_FILE_SIZE = 5 * 1024 * 1024  
+MAX_FILE_SIZE = 5 * 1024 * 1024
 ALLOWED_TYPES = {"image/jpeg", "image/png", "image/webp", "images/jpg"}
+CONTENT_TYPE_EXTENSIONS = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/webp": "webp",
+    "images/jpg": "jpg",
+}
+
+
+class StorageBackend(ABC):
+    """Object storage for one bucket: put/get/delete by path plus public URL mapping."""
+
+    @abstractmethod
+    def put(self, path: str, contents: bytes, content_type: str) -> None:
+        ...
+
+    @abstractmethod
+    def get(self, path: str) -> bytes:
+        ...
+
+    @abstractmethod
+    def delete(self, paths: list[str]) -> None:
+        ...
+
+    @abstractmethod
+    def public_url(self, path: str) -> str:
+        ...
+
+    @abstractmethod
+    def path_from_url(self, url: str) -> str | None:
+        ...
+
+
+class SupabaseStorage(StorageBackend):
+    def __init__(self, bucket: str):
+        self.bucket = bucket
+        self._client = None
+
+    @property
+    def client(self):
+        # Created on first use so importing this module needs no Supabase credentials
+        if self._client is None:
+            from supabase import create_client
+            self._client = create_client(
+                os.getenv("SUPABASE_URL"),
+                os.getenv("SUPABASE_SERVICE_ROLE_KEY"),
+            )
+        return self._client
+
+    def put(self, path, contents, content_type):
+        try:
+            response = self.client.storage.from_(self.bucket).upload(
+                path=path,
+                file=contents,
+                file_options={
+                    "content-type": content_type,
+                    # Retried jobs may find the object from a previous attempt
+                    "upsert": "true"
+                }
+            )
+        except Exception:
+            logger.exception("Supabase upload failed", extra={"path": path})
+            raise
+
+
+        if response is None:
+            logger.error("Supabase upload returned no response", extra={"path": path})
+            raise HTTPException(500, "Supabase upload returned None")
+
+        if isinstance(response, dict) and response.get("error"):
+            logger.error("Supabase upload error", extra={"path": path, "error": response["error"]})
+            raise HTTPException(500, response["error"]["message"])
+
+    def get(self, path):
+        return self.client.storage.from_(self.bucket).download(path)
+
+    def delete(self, paths):
+        self.client.storage.from_(self.bucket).remove(paths)
+
+    def public_url(self, path):
+        # Built locally by the SDK; no request is made
+        return self.client.storage.from_(self.bucket).get_public_url(path)
+
+    def path_from_url(self, url):
+        # Supabase public URL format: .../storage/v1/object/public/{bucket}/{path}
+        prefix = f"/object/public/{self.bucket}/"
+        if prefix not in url:
+            return None
+        return url.split(prefix, 1)[1].split("?")[0].strip() or None
+
+
+class LocalStorage(StorageBackend):
+    """
+    Content-addressed local disk storage.
+
+    Bytes are written once to objects/<sha256[:2]>/<sha256>; every logical
+    path under files/ is a hard link to its object, so identical uploads
+    share one copy on disk. The object is unlinked together with its last
+    path. Linking and unlinking hold a file lock on the object's shard
+    directory, so a put can never link bytes a concurrent delete is
+    removing. Files are served by app.routes.media.
+    """
+
+    def __init__(self, bucket: str, root: str, base_url: str):
+        self.bucket = bucket
+        self.objects_dir = os.path.join(root, bucket, "objects")
+        self.files_dir = os.path.join(root, bucket, "files")
+        self.base_url = base_url.rstrip("/")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.files_dir, exist_ok=True)
+        self._fallback_lock = threading.Lock()
+
+    @contextmanager
+    def _locked(self, digest):
+        """Exclusive across threads and processes for the objects/<digest[:2]> shard."""
+        shard = os.path.dirname(self.object_path(digest))
+        os.makedirs(shard, exist_ok=True)
+        if fcntl is None:
+            with self._fallback_lock:
+                yield
+            return
+        with open(os.path.join(shard, ".lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    def object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def file_path(self, path: str) -> str:
+        full = os.path.realpath(os.path.join(self.files_dir, path))
+        if not full.startswith(os.path.realpath(self.files_dir) + os.sep):
+            raise HTTPException(400, "Invalid object path")
+        return full
 
+    def put(self, path, contents, content_type):
+        digest = hashlib.sha256(contents).hexdigest()
+        obj = self.object_path(digest)
+        target = self.file_path(path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if os.path.exists(target):
+            if os.path.exists(obj) and os.path.samefile(target, obj):
+                return
+            self._unlink(target)
 
-def upload_pickup_image(file: UploadFile, user_id: str) -> str:
+        with self._locked(digest):
+            if not os.path.exists(obj):
+                fd, tmp = tempfile.mkstemp(dir=os.path.dirname(obj))
+                with os.fdopen(fd, "wb") as f:
+                    f.write(contents)
+                os.replace(tmp, obj)
+            os.link(obj, target)
+
+    def get(self, path):
+        with open(self.file_path(path), "rb") as f:
+            return f.read()
+
+    def delete(self, paths):
+        for path in paths:
+            target = self.file_path(path)
+            if os.path.exists(target):
+                self._unlink(target)
+
+    def _unlink(self, target):
+        with open(target, "rb") as f:
+            digest = hashlib.file_digest(f, "sha256").hexdigest()
+        obj = self.object_path(digest)
+        with self._locked(digest):
+            os.unlink(target)
+            # Only the objects/ entry left means no path references these bytes
+            if os.path.exists(obj) and os.stat(obj).st_nlink == 1:
+                os.unlink(obj)
+
+    def digest(self, full_path, stat) -> str:
+        """sha256 of a stored file. Objects are never rewritten in place, so it is hashed once per inode."""
+        return _file_digest(full_path, stat.st_dev, stat.st_ino, stat.st_mtime_ns)
+
+    def public_url(self, path):
+        return f"{self.base_url}/media/{self.bucket}/{path}"
+
+    def path_from_url(self, url):
+        prefix = f"/media/{self.bucket}/"
+        if prefix not in url:
+            return None
+        return url.split(prefix, 1)[1].split("?")[0].strip() or None
+
+
+@functools.lru_cache(maxsize=4096)
+def _file_digest(full_path, dev, ino, mtime_ns):
+    with open(full_path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def make_storage(backend: str = STORAGE_BACKEND, bucket: str = BUCKET_NAME) -> StorageBackend:
+    if backend == "local":
+        return LocalStorage(bucket, LOCAL_STORAGE_DIR, PUBLIC_BASE_URL)
+    if backend == "supabase":
+        return SupabaseStorage(bucket)
+    raise ValueError(f"Unknown STORAGE_BACKEND {backend!r}")
+
+
+storage = make_storage()
+
+
+def read_pickup_image(file: UploadFile) -> bytes:
+    """Validate type and size of an uploaded pickup image and return its bytes."""
     if file.content_type not in ALLOWED_TYPES:
         raise HTTPException(400, "Invalid image type")
 
@@ -22,49 +240,68 @@ def upload_pickup_image(file: UploadFile, user_id: str) -> str:
     if len(contents) > MAX_FILE_SIZE:
         raise HTTPException(400, "Image size exceeds 5MB limit")
 
-    file_ext = file.filename.split(".")[-1]
-    file_name = f"user_{user_id}/{uuid.uuid4()}.{file_ext}"
+    return contents
+
+
+def public_url(path: str) -> str:
+    return storage.public_url(path)
+
+
+def content_path(contents: bytes, content_type: str):
+    """
+    Content-addressed storage path for an image: pickups/<sha256>.<ext>.
+
+    The extension comes from the validated content type, so the same bytes
+    always map to the same path whatever the uploaded filename was.
+    Returns (path, sha256).
+    """
+    digest = hashlib.sha256(contents).hexdigest()
+    return f"pickups/{digest}.{CONTENT_TYPE_EXTENSIONS[content_type]}", digest
 
-    try:
-        response = supabase.storage.from_(BUCKET_NAME).upload(
-            path=file_name,
-            file=contents,
-            file_options={
-                "content-type": file.content_type,
-                "upsert": False
-            }
-        )
-    except Exception as e:
-        print("❌ SUPABASE SDK ERROR:", e)
-        raise
 
+def pickup_image_urls(path: str) -> dict:
+    """Public URLs of an image and its derivatives, keyed "original"/derivative name."""
+    urls = {"original": public_url(path)}
+    for name in DERIVATIVE_SIZES:
+        urls[name] = public_url(derivative_path(path, name))
+    return urls
 
-    if response is None:
-        print("❌ Upload response is None")
-        raise HTTPException(500, "Supabase upload returned None")
 
-    if isinstance(response, dict) and response.get("error"):
-        print("❌ SUPABASE UPLOAD ERROR:", response["error"])
-        raise HTTPException(500, response["error"]["message"])
+def spool_upload(contents: bytes, path: str) -> str:
+    """Write bytes to the local spool the upload job reads from; returns the spool file path."""
+    os.makedirs(JOB_SPOOL_DIR, exist_ok=True)
+    spool_path = os.path.join(JOB_SPOOL_DIR, f"{uuid.uuid4()}_{os.path.basename(path)}")
+    with open(spool_path, "wb") as f:
+        f.write(contents)
+    return spool_path
 
-    public_url = supabase.storage.from_(BUCKET_NAME).get_public_url(file_name)
 
-    print("✅ Uploaded image URL:", public_url)
-    return public_url
+@span("storage_upload")
+def upload_object(path: str, contents: bytes, content_type: str) -> str:
+    """Store bytes in the pickup bucket and return the public URL."""
+    storage.put(path, contents, content_type)
+
+    url = public_url(path)
+
+    logger.info("Uploaded object", extra={"url": url, "bytes": len(contents), "sample": True})
+    return url
+
+
+@span("storage_download")
+def download_object(path: str) -> bytes:
+    return storage.get(path)
 
 
 def delete_pickup_image(image_url: str) -> None:
-    """Delete a pickup image from Supabase storage by its public URL."""
+    """Delete a pickup image and its derivatives by the original's public URL; raises so the job is retried."""
     if not image_url or not image_url.strip():
         return
-    # Supabase public URL format: .../storage/v1/object/public/{BUCKET_NAME}/{path}
-    prefix = f"/object/public/{BUCKET_NAME}/"
-    if prefix not in image_url:
-        return
-    path = image_url.split(prefix, 1)[1].split("?")[0].strip()
+    path = storage.path_from_url(image_url)
     if not path:
         return
+    paths = [path] + [derivative_path(path, name) for name in DERIVATIVE_SIZES]
     try:
-        supabase.storage.from_(BUCKET_NAME).remove([path])
-    except Exception as e:
-        print("⚠️ Failed to delete pickup image from storage:", e)
+        storage.delete(paths)
+    except Exception:
+        logger.exception("Failed to delete pickup image from storage", extra={"path": path})
+        raise
@@ -0,0 +1,213 @@
+import io
+import logging
+import threading
+from datetime import datetime, timezone
+
+from app.core.config import (
+    TELEMETRY_FLUSH_ATTEMPTS,
+    TELEMETRY_FLUSH_INTERVAL,
+    TELEMETRY_FLUSH_SIZE,
+    TELEMETRY_MAX_BUFFERED,
+)
+from app.core.instrumentation import Histogram
+from app.database import engine
+from app.services.change_feed import publish
+
+logger = logging.getLogger(__name__)
+
+# _count is batches and _sum readings, per outcome: written, retry or dropped
+telemetry_batches = Histogram(
+    "remat_telemetry_batch_readings",
+    "Readings per telemetry flush batch by outcome",
+    ("outcome",),
+    buckets=(10, 100, 1000, 5000, 20000, 100000),
+)
+
+_CREATE_STAGING = """
+    CREATE TEMP TABLE telemetry_staging (
+        bin_id UUID NOT NULL,
+        fill_level INTEGER NOT NULL,
+        recorded_at TIMESTAMPTZ NOT NULL
+    ) ON COMMIT DROP
+"""
+
+_COPY_STAGING = "COPY telemetry_staging (bin_id, fill_level, recorded_at) FROM STDIN"
+
+# Readings for unknown bins are dropped by the join instead of failing the batch
+_INSERT_FROM_STAGING = """
+    INSERT INTO bin_telemetry (bin_id, fill_level, recorded_at)
+    SELECT s.bin_id, s.fill_level, s.recorded_at
+    FROM telemetry_staging s
+    JOIN bins b ON b.id = s.bin_id
+"""
+
+# Latest reading per bin wins unless the bin already has a newer one. Only
+# active <-> full is switched; admin-set statuses (maintenance, inactive, ...) stay
+_UPDATE_BINS = """
+    UPDATE bins AS b
+    SET
+        fill_level = LEAST(l.fill_level, b.capacity),
+        last_reading_at = l.recorded_at,
+        status = CASE
+            WHEN b.status NOT IN ('active', 'full') THEN b.status
+            WHEN l.fill_level >= 0.9 * b.capacity THEN 'full'
+            ELSE 'active'
+        END
+    FROM (
+        SELECT DISTINCT ON (bin_id) bin_id, fill_level, recorded_at
+        FROM telemetry_staging
+        ORDER BY bin_id, recorded_at DESC
+    ) AS l
+    WHERE b.id = l.bin_id
+      AND (b.last_reading_at IS NULL OR l.recorded_at > b.last_reading_at)
+    RETURNING b.id, b.fill_level, b.status
+"""
+
+
+class BufferFull(Exception):
+    pass
+
+
+def _copy_buffer(readings) -> io.StringIO:
+    buf = io.StringIO()
+    for bin_id, fill_level, recorded_at in readings:
+        buf.write(f"{bin_id}\t{fill_level}\t{recorded_at.isoformat()}\n")
+    buf.seek(0)
+    return buf
+
+
+def write_readings(readings):
+    """
+    Persist a batch of (bin_id, fill_level, recorded_at) tuples.
+
+    COPY into a temp staging table, then one INSERT ... SELECT into
+    bin_telemetry and one set-based UPDATE of bins, all in one transaction.
+    Returns the updated (id, fill_level, status) rows.
+    """
+    raw = engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        cur.execute(_CREATE_STAGING)
+        cur.copy_expert(_COPY_STAGING, _copy_buffer(readings))
+        cur.execute(_INSERT_FROM_STAGING)
+        cur.execute(_UPDATE_BINS)
+        updated = cur.fetchall()
+        raw.commit()
+        return updated
+    except Exception:
+        raw.rollback()
+        raise
+    finally:
+        raw.close()
+
+
+class TelemetryBuffer:
+    """
+    In-memory buffer in front of `write_readings`.
+
+    Request handlers only append under a lock; a background thread flushes
+    when TELEMETRY_FLUSH_SIZE readings are pending or every
+    TELEMETRY_FLUSH_INTERVAL seconds. Readings still buffered when the
+    process dies are lost, which is acceptable for periodic sensor data.
+
+    A batch whose write fails is retried on its own at the next flushes,
+    apart from newer readings, and dropped after `max_attempts`. It counts
+    against `max_buffered` while it waits.
+    """
+
+    def __init__(self, flush_size=TELEMETRY_FLUSH_SIZE, flush_interval=TELEMETRY_FLUSH_INTERVAL,
+                 max_buffered=TELEMETRY_MAX_BUFFERED, max_attempts=TELEMETRY_FLUSH_ATTEMPTS):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_buffered = max_buffered
+        self.max_attempts = max_attempts
+        self._pending = []
+        # (batch, failed attempts) awaiting a retry, and the readings they hold
+        self._failed = []
+        self._failed_readings = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def add(self, readings) -> int:
+        now = datetime.now(timezone.utc)
+        rows = [
+            (r.bin_id, r.fill_level, r.recorded_at or now)
+            for r in readings
+        ]
+        with self._lock:
+            if len(self._pending) + self._failed_readings + len(rows) > self.max_buffered:
+                raise BufferFull()
+            self._pending.extend(rows)
+            pending = len(self._pending)
+        if pending >= self.flush_size:
+            self._wake.set()
+        return len(rows)
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            with self._lock:
+                batches = self._failed + [(self._pending, 0)] if self._pending else self._failed
+                self._pending, self._failed = [], []
+            return sum(self._write(batch, attempts) for batch, attempts in batches)
+
+    def _write(self, batch, attempts) -> int:
+        # Retried batches are already counted in _failed_readings
+        retried = attempts > 0
+        try:
+            updated = write_readings(batch)
+        except Exception:
+            attempts += 1
+            with self._lock:
+                if attempts < self.max_attempts:
+                    self._failed.append((batch, attempts))
+                    self._failed_readings += 0 if retried else len(batch)
+                else:
+                    self._failed_readings -= len(batch) if retried else 0
+                    self.dropped += len(batch)
+            outcome = "retry" if attempts < self.max_attempts else "dropped"
+            logger.exception(
+                "Telemetry flush failed" if outcome == "retry" else "Telemetry batch failed too often, dropping it",
+                extra={"readings": len(batch), "attempts": attempts},
+            )
+            telemetry_batches.observe((outcome,), len(batch))
+            return 0
+
+        if retried:
+            with self._lock:
+                self._failed_readings -= len(batch)
+        telemetry_batches.observe(("written",), len(batch))
+        if updated:
+            publish("bins", "telemetry", {
+                "bins": [
+                    {"id": str(bin_id), "fill_level": fill_level, "status": status}
+                    for bin_id, fill_level, status in updated
+                ]
+            })
+        return len(batch)
+
+    def start(self):
+        if self._thread is None:
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="telemetry-flusher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+
+telemetry_buffer = TelemetryBuffer()
@@ -1,9 +1,15 @@
 from app.models.transaction import Transaction
 from app.models.user import User
 from app.models.bin import Bin
-from app.services.waste_detector import calculate_points
+from app.services.points import calculate_points
+from app.services.change_feed import publish
+from app.services.stats import record_deposit
 import uuid
 
+# Fill-level units added per deposit, and the fraction of capacity at which a bin is marked full
+FILL_PER_DEPOSIT = 10
+FULL_THRESHOLD = 0.9
+
 def handle_deposit(db, user_id, bin_id, waste_type, base_points, confidence=None, user_override=False):
     bin_obj = db.query(Bin).filter_by(id=bin_id).first()
 
@@ -18,6 +24,7 @@ def handle_deposit(db, user_id, bin_id, waste_type, base_points, confidence=None
     if bin_obj.fill_level >= bin_obj.capacity:
         bin_obj.status = "full"
         db.commit()
+        publish("bins", "updated", {"id": str(bin_id), "fill_level": bin_obj.fill_level, "status": "full"})
         return {"error": "Bin is full"}
 
     conf = float(confidence) if confidence is not None else 0.0
@@ -33,18 +40,25 @@ def handle_deposit(db, user_id, bin_id, waste_type, base_points, confidence=None
     )
 
     db.add(txn)
+    record_deposit(db, user_id, bin_id, waste_type, points)
 
     db.query(User).filter_by(id=user_id).update(
         {User.points: User.points + points}
     )
 
-    bin_obj.fill_level = min(bin_obj.fill_level + 10, bin_obj.capacity)
+    bin_obj.fill_level = min(bin_obj.fill_level + FILL_PER_DEPOSIT, bin_obj.capacity)
     # Mark bin full when it reaches ~90% capacity (or capacity)
-    if bin_obj.fill_level >= int(0.9 * bin_obj.capacity):
+    if bin_obj.fill_level >= int(FULL_THRESHOLD * bin_obj.capacity):
         bin_obj.status = "full"
 
     db.commit()
 
+    publish("bins", "updated", {
+        "id": str(bin_id),
+        "fill_level": bin_obj.fill_level,
+        "status": bin_obj.status,
+    })
+
     return {
         "success": True,
         "points_earned": points,
@@ -1,51 +1,27 @@
+import logging
 import os
 os.environ["CUDA_VISIBLE_DEVICES"] = "-1"
 
-import numpy as np
 from pathlib import Path
-from PIL import Image
-from keras.models import load_model
-from keras.applications.resnet import preprocess_input
+
+from app.core.config import INFERENCE_TTA
+from app.core.instrumentation import span
+from app.services.inference import (
+    TTA_VIEWS,
+    BatchBuffer,
+    combine_views,
+    get_classifier,
+    preprocess_batch,
+    to_results,
+)
+from app.services.points import CLASS_NAMES, points_cache, score
+
+logger = logging.getLogger(__name__)
 
 # Resolve model path relative to backend root (parent of app/)
 _BACKEND_ROOT = Path(__file__).resolve().parent.parent.parent
 _DEFAULT_MODEL_PATH = _BACKEND_ROOT / "Models" / "ewaste_final.keras"
 
-# Scoring: confidence thresholds
-HIGH_CONFIDENCE = 0.75
-LOW_CONFIDENCE = 0.40
-
-# Base points per waste type (used for Cases 1 & 2)
-BASE_POINTS = {
-    "Battery": 110,
-    "Keyboard": 36,
-    "Microwave": 270,
-    "Mobile": 150,
-    "Mouse": 27,
-    "PCB": 165,
-    "Player": 90,
-    "Printer": 200,
-    "Television": 330,
-    "Washing Machine": 400,
-    "Laptop": 180,
-}
-
-# Manual override caps (Case 3: confidence < 0.40 or user overrides ML)
-MANUAL_OVERRIDE_POINTS = {
-    "PCB": 90,
-    "Battery": 60,
-    "Mobile": 80,
-    "Player": 50,
-    "Mouse": 15,
-    "Keyboard": 20,
-    "Printer": 120,
-    "Microwave": 150,
-    "Television": 180,
-    "Washing Machine": 220,
-    "Laptop": 100,
-}
-
-
 class WasteDetector:
     def __init__(self, model_path=None):
         """
@@ -56,35 +32,28 @@ class WasteDetector:
         """
         self.model_path = str(model_path or _DEFAULT_MODEL_PATH)
         self.model = None
-        self.class_names = [
-            "Battery",
-            "Keyboard",
-            "Microwave",
-            "Mobile",
-            "Mouse",
-            "PCB",
-            "Player",
-            "Printer",
-            "Television",
-            "Washing Machine",
-            "Laptop"
-        ]
+        self.class_names = list(CLASS_NAMES)
+        # Model input is preprocessed into this instead of fresh arrays per request
+        self._inputs = BatchBuffer()
         self.load_model()
     
     def load_model(self):
         """Load the Keras model from disk."""
+        # Imported here so processes that only talk to the inference server never load TensorFlow
+        from keras.models import load_model
         try:
             self.model = load_model(self.model_path)
-            print(f"Model loaded successfully from {self.model_path}")
+            logger.info("Model loaded", extra={"model_path": self.model_path})
         except Exception as e:
             raise Exception(f"Failed to load model: {str(e)}")
     
-    def predict(self, image_path):
+    def predict(self, image_path, tta=INFERENCE_TTA):
         """
         Predict the waste type from an image.
         
         Args:
             image_path (str): Path to the image file
+            tta (bool): Average TTA_VIEWS augmented views, classified in one batch
             
         Returns:
             dict: Dictionary containing waste_type, confidence, and all probabilities
@@ -96,61 +65,49 @@ class WasteDetector:
             raise FileNotFoundError(f"Image not found at {image_path}")
         
         try:
-            # Load and preprocess the image (using PIL - keras.preprocessing is deprecated)
-            img = Image.open(image_path).convert("RGB")
-            img = img.resize((224, 224))
-            x = np.array(img, dtype=np.float32)
-            x = np.expand_dims(x, axis=0)
-            x = preprocess_input(x)
-            
-            # Make prediction
-            pred = self.model.predict(x, verbose=0)
-            class_idx = np.argmax(pred)
-            confidence = float(pred[0][class_idx])
-            waste_type = self.class_names[class_idx]
-            
-            # Get all class probabilities
-            all_probabilities = {
-                self.class_names[i]: float(pred[0][i]) 
-                for i in range(len(self.class_names))
-            }
-            
-            return {
-                "waste_type": waste_type,
-                "confidence": round(confidence, 4),
-                "class_index": int(class_idx),
-                "all_probabilities": all_probabilities
-            }
+            return to_results(self.predict_probs([image_path], tta), tta, self.class_names)[0]
             
         except Exception as e:
             raise Exception(f"Prediction failed: {str(e)}")
-    
+
+    def predict_batch(self, images, tta=INFERENCE_TTA):
+        """
+        Predict waste types for several images in one model call.
+        
+        Args:
+            images (list): Image file paths or raw encoded image bytes
+            tta (bool): Average TTA_VIEWS augmented views per image
+            
+        Returns:
+            list[dict]: One result per image, same shape as predict()
+        """
+        if self.model is None:
+            raise Exception("Model not loaded. Call load_model() first.")
+        if not images:
+            return []
+
+        try:
+            return to_results(self.predict_probs(images, tta), tta, self.class_names)
+        except Exception as e:
+            raise Exception(f"Batch prediction failed: {str(e)}")
+
+    def predict_probs(self, images, tta=False):
+        """Uncalibrated [n, classes] probabilities, averaged over the augmented views with `tta`."""
+        x = preprocess_batch(images, out=self._inputs.get(len(images) * (TTA_VIEWS if tta else 1)), tta=tta)
+        return combine_views(self.predict_preprocessed(x), tta)
+
+    def predict_preprocessed(self, x):
+        """Class probabilities for a [n, 224, 224, 3] batch from preprocess_batch."""
+        with span("model_predict"):
+            return self.model.predict(x, batch_size=len(x), verbose=0)
+
     def get_base_points(self, waste_type):
         """Get base points for a waste type (for Cases 1 & 2)."""
-        return BASE_POINTS.get(waste_type, 0)
+        return points_cache.table.base_points(waste_type)
 
     def get_manual_override_points(self, waste_type):
         """Get manual override cap for a waste type (Case 3)."""
-        return MANUAL_OVERRIDE_POINTS.get(waste_type, 50)
-
-
-def calculate_points(waste_type: str, confidence: float, user_override: bool = False) -> int:
-    """
-    Calculate points using confidence-based scoring logic.
-    
-    Case 1 (High Confidence): confidence >= 0.75 → points = base_points × confidence
-    Case 2 (Low Confidence): 0.40 <= confidence < 0.75 → points = base_points × 0.6
-    Case 3 (Manual): confidence < 0.40 or user_override → points = manual_override_cap
-    """
-    base = BASE_POINTS.get(waste_type, 0)
-    manual = MANUAL_OVERRIDE_POINTS.get(waste_type, 50)
-    
-    if user_override or confidence < LOW_CONFIDENCE:
-        return int(manual)
-    if confidence >= HIGH_CONFIDENCE:
-        return int(base * confidence)
-    # Case 2: 0.40 <= confidence < 0.75
-    return int(base * 0.6)
+        return points_cache.table.manual_points(waste_type)
 
 
 # Create a singleton instance
@@ -180,11 +137,11 @@ def predict_waste(image_path, model_path=None):
     Returns:
         dict: waste_type, confidence, base_points, points_to_earn, all_probabilities
     """
-    detector = get_waste_detector(model_path)
-    result = detector.predict(image_path)
-    waste_type = result["waste_type"]
-    confidence = result["confidence"]
-    result["base_points"] = detector.get_base_points(waste_type)
-    result["points_to_earn"] = calculate_points(waste_type, confidence)
+    result = get_classifier(model_path).predict(image_path)
+    # Both values from one snapshot, looked up by class index
+    table = points_cache.table
+    i = result["class_index"]
+    result["base_points"] = table.base[i]
+    result["points_to_earn"] = score(table.base[i], table.manual[i], result["confidence"])
     result["estimated_value"] = result["base_points"]  # kept for backward compatibility
     return result
\ No newline at end of file
@@ -0,0 +1,136 @@
+"""
+Pool of model-holding processes serving waste classification.
+
+    python -m app.workers.inference_server --processes 2
+
+The parent binds INFERENCE_SOCKET and forks the workers, which all accept on
+it. An idle worker takes the next connection, so requests spread over
+whichever workers are free. Each worker loads the model once. It then
+serves one request per connection: it maps the caller's shared memory
+segment, runs the model on the input there and writes the probabilities
+back (see app.services.inference for the layout). The parent restarts
+crashed workers. API and job workers use the pool when INFERENCE_MODE=pool.
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import traceback
+from multiprocessing import resource_tracker, shared_memory
+
+from app.core.config import INFERENCE_SOCKET
+from app.core.logs import setup_logging
+from app.services.inference import segment_views
+
+logger = logging.getLogger(__name__)
+
+# Largest batch one request may carry
+MAX_BATCH = 256
+
+
+def handle(conn, detector):
+    request = json.loads(conn.makefile("rb").readline())
+    n, n_classes = int(request["n"]), int(request["classes"])
+    if not 0 < n <= MAX_BATCH:
+        raise ValueError(f"Batch of {n} images is outside 1..{MAX_BATCH}")
+    if n_classes != len(detector.class_names):
+        raise ValueError(f"Caller expects {n_classes} classes, model has {len(detector.class_names)}")
+
+    shm = shared_memory.SharedMemory(name=request["shm"])
+    # The caller owns the segment; without this the tracker would unlink it when this process exits
+    resource_tracker.unregister(shm._name, "shared_memory")
+    try:
+        inputs = probs = None
+        try:
+            inputs, probs = segment_views(shm.buf, n, n_classes)
+            probs[...] = detector.predict_preprocessed(inputs)
+        except BaseException as e:
+            # Frames of the failed call still reference views of the segment
+            traceback.clear_frames(e.__traceback__)
+            raise
+        finally:
+            # close() raises BufferError while any view of shm.buf is alive
+            del inputs, probs
+    finally:
+        shm.close()
+
+
+def worker_loop(listener, stop):
+    # The parent's log writer thread does not survive the fork
+    setup_logging()
+    # The parent sets `stop` on SIGINT/SIGTERM; children finish their current work
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+
+    from app.services.waste_detector import get_waste_detector
+    detector = get_waste_detector()
+    logger.info("Inference worker ready", extra={"pid": os.getpid()})
+
+    listener.settimeout(1.0)
+    while not stop.is_set():
+        try:
+            conn, _ = listener.accept()
+        except socket.timeout:
+            continue
+
+        with conn:
+            conn.setblocking(True)
+            try:
+                handle(conn, detector)
+                reply = {"ok": True}
+            except Exception as e:
+                logger.warning("Inference request failed", exc_info=True)
+                reply = {"error": str(e)}
+            try:
+                conn.sendall(json.dumps(reply).encode() + b"\n")
+            except OSError:
+                # Caller timed out and went away
+                pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=1, help="Model copies to run")
+    parser.add_argument("--socket", default=INFERENCE_SOCKET)
+    args = parser.parse_args()
+    setup_logging()
+
+    if os.path.exists(args.socket):
+        os.remove(args.socket)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(args.socket)
+    listener.listen(128)
+
+    stop = multiprocessing.Event()
+    # Setting the Event from a handler that interrupted stop.wait() deadlocks; unwind instead
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+    def spawn():
+        proc = multiprocessing.Process(target=worker_loop, args=(listener, stop), daemon=True)
+        proc.start()
+        return proc
+
+    procs = [spawn() for _ in range(args.processes)]
+    logger.info("Inference server started", extra={"processes": args.processes, "socket": args.socket})
+
+    try:
+        while not stop.is_set():
+            stop.wait(5)
+            for i, proc in enumerate(procs):
+                if not proc.is_alive() and not stop.is_set():
+                    logger.warning("Inference worker exited, restarting", extra={"pid": proc.pid, "exitcode": proc.exitcode})
+                    procs[i] = spawn()
+    except KeyboardInterrupt:
+        stop.set()
+
+    for proc in procs:
+        proc.join(timeout=30)
+    listener.close()
+    os.remove(args.socket)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Background job worker pool.
+
+    python -m app.workers.job_worker --processes 4
+
+Each process polls the jobs table with FOR UPDATE SKIP LOCKED, runs the
+registered handler and records success, a retry with backoff, or a dead
+letter. The parent restarts crashed children and requeues jobs whose lock
+outlived JOB_LOCK_TIMEOUT_SECONDS. Every PARTITION_MAINTENANCE_SECONDS it
+also creates upcoming transaction partitions, archives expired ones and
+purges idempotency keys older than IDEMPOTENCY_KEY_TTL_HOURS.
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import time
+
+from app.core.config import JOB_POLL_INTERVAL, PARTITION_MAINTENANCE_SECONDS
+from app.core.logs import setup_logging
+from app.database import SessionLocal, engine
+from app.services import job_handlers  # noqa: F401  registers handlers
+from app.services.job_queue import (
+    claim,
+    get_batch_size,
+    get_handler,
+    mark_done,
+    mark_failed,
+    requeue_stale,
+)
+from app.services.idempotency import purge_expired
+from app.services.partitions import maintain_partitions
+from app.services.points import points_cache
+
+logger = logging.getLogger(__name__)
+
+
+def run_jobs(jobs, batched=False):
+    """
+    Run one job, or several jobs of one kind through a batch handler. A batch
+    fails together when the handler raises; failures it returns per job only
+    fail those jobs.
+    """
+    kind = jobs[0]["kind"]
+    db = SessionLocal()
+    try:
+        handler = get_handler(kind)
+        if handler is None:
+            raise LookupError(f"No handler registered for job kind {kind!r}")
+        failed = {}
+        if batched:
+            failed = handler(db, [job["payload"] for job in jobs]) or {}
+        else:
+            handler(db, jobs[0]["payload"])
+        db.commit()
+        for i, job in enumerate(jobs):
+            if i in failed:
+                logger.warning(
+                    "Job failed",
+                    exc_info=failed[i],
+                    extra={"job_id": str(job["id"]), "kind": kind, "attempt": job["attempts"]},
+                )
+                mark_failed(db, job, failed[i])
+            else:
+                mark_done(db, job["id"])
+    except Exception as e:
+        db.rollback()
+        for job in jobs:
+            logger.warning(
+                "Job failed",
+                exc_info=True,
+                extra={"job_id": str(job["id"]), "kind": kind, "attempt": job["attempts"]},
+            )
+            mark_failed(db, job, e)
+    finally:
+        db.close()
+
+
+def worker_loop(stop, kinds=None):
+    # Connections inherited from the parent must not be reused after fork
+    engine.dispose(close=False)
+    # The parent's log writer thread does not survive the fork
+    setup_logging()
+    # The parent sets `stop` on SIGINT/SIGTERM; children finish their current work
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    # Classification jobs score with the same cached point table as the API
+    points_cache.start()
+
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    while not stop.is_set():
+        db = SessionLocal()
+        try:
+            jobs = claim(db, worker_id, kinds=kinds)
+            # Batch handlers get the rest of their batch from other pending jobs of the same kind
+            if jobs and get_batch_size(jobs[0]["kind"]) > 1:
+                batch_size = get_batch_size(jobs[0]["kind"])
+                jobs += claim(db, worker_id, limit=batch_size - 1, kinds=[jobs[0]["kind"]])
+        except Exception:
+            logger.exception("Job claim failed")
+            jobs = []
+        finally:
+            db.close()
+
+        if not jobs:
+            stop.wait(JOB_POLL_INTERVAL)
+            continue
+
+        run_jobs(jobs, batched=get_batch_size(jobs[0]["kind"]) > 1)
+
+
+def run_maintenance():
+    db = SessionLocal()
+    try:
+        maintain_partitions(db)
+    except Exception:
+        db.rollback()
+        logger.exception("Partition maintenance failed")
+    try:
+        purged = purge_expired(db)
+        if purged:
+            logger.info("Purged idempotency keys", extra={"count": purged})
+    except Exception:
+        db.rollback()
+        logger.exception("Idempotency key purge failed")
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--kinds", nargs="*", help="Only run these job kinds")
+    args = parser.parse_args()
+    setup_logging()
+
+    stop = multiprocessing.Event()
+    # Setting the Event from a handler that interrupted stop.wait() deadlocks; unwind instead
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+    def spawn():
+        proc = multiprocessing.Process(target=worker_loop, args=(stop, args.kinds), daemon=True)
+        proc.start()
+        return proc
+
+    procs = [spawn() for _ in range(args.processes)]
+    logger.info("Job worker started", extra={"processes": args.processes})
+
+    run_maintenance()
+    last_maintenance = time.monotonic()
+
+    try:
+        while not stop.is_set():
+            stop.wait(JOB_POLL_INTERVAL * 10)
+            for i, proc in enumerate(procs):
+                if not proc.is_alive() and not stop.is_set():
+                    logger.warning("Job worker exited, restarting", extra={"pid": proc.pid, "exitcode": proc.exitcode})
+                    procs[i] = spawn()
+
+            db = SessionLocal()
+            try:
+                requeued = requeue_stale(db)
+                if requeued:
+                    logger.warning("Requeued or dead-lettered stale jobs", extra={"count": requeued})
+            except Exception:
+                logger.exception("Stale job sweep failed")
+            finally:
+                db.close()
+
+            if time.monotonic() - last_maintenance >= PARTITION_MAINTENANCE_SECONDS:
+                run_maintenance()
+                last_maintenance = time.monotonic()
+    except KeyboardInterrupt:
+        stop.set()
+
+    for proc in procs:
+        proc.join(timeout=30)
+
+
+if __name__ == "__main__":
+    main()
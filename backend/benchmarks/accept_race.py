@@ -0,0 +1,214 @@
+"""
+Concurrency check: racing admin decisions award pickup points exactly once.
+
+    python -m benchmarks.accept_race --requests 20 --concurrency 16
+
+Creates a "bench_race" user and --requests open pickup requests, then for
+each request releases --concurrency threads at once against the accept
+and reject route handlers (one session each, as under separate API
+workers):
+
+    accept      every thread accepts
+    mixed       half accept, half reject
+    idempotent  every thread accepts with the same Idempotency-Key
+    bulk        every thread bulk-accepts all of the scenario's requests
+
+Afterwards every request must have exactly one winning decision, the
+idempotent retries must all get the winner's response, and the user's
+points and pickup stats must equal the sum over accepted requests. Exits 1
+on any mismatch. The bench rows are removed at the end.
+"""
+import argparse
+import sys
+import threading
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+
+from fastapi import HTTPException, Response
+from sqlalchemy import text
+
+from app.database import SessionLocal, engine
+from app.models.schemas.pickup_requests import PickupBulkAccept, PickupRequestAccept, PickupRequestReject
+from app.routes.admin_pickup import accept_pickup_request, bulk_accept_pickup_requests, reject_pickup_request
+
+USER_ID = "bench_race"
+SUGGESTED_POINTS = 50
+SCENARIOS = ("accept", "mixed", "idempotent", "bulk")
+
+
+def reset(conn):
+    conn.execute(text("DELETE FROM idempotency_keys WHERE key LIKE 'bench-race-%'"))
+    conn.execute(text("DELETE FROM pickup_requests WHERE user_id = :user_id"), {"user_id": USER_ID})
+    conn.execute(text("DELETE FROM user_waste_stats WHERE user_id = :user_id"), {"user_id": USER_ID})
+    conn.execute(text("DELETE FROM users WHERE id = :user_id"), {"user_id": USER_ID})
+
+
+def setup(n):
+    with engine.begin() as conn:
+        reset(conn)
+        conn.execute(
+            text("INSERT INTO users (id, name, email, role, points) VALUES (:id, 'Bench Race', 'bench_race@bench.invalid', 'citizen', 0)"),
+            {"id": USER_ID},
+        )
+        ids = [str(uuid.uuid4()) for _ in range(n)]
+        conn.execute(
+            text("""
+                INSERT INTO pickup_requests
+                    (id, user_id, image_url, location, e_waste_type, preferred_datetime, contact_number, status, suggested_points)
+                VALUES
+                    (:id, :user_id, 'bench://race.jpg', ST_SetSRID(ST_MakePoint(0, 0), 4326)::geography, 'Laptop',
+                     :at, '0000000000', 'open', :points)
+            """),
+            [{"id": i, "user_id": USER_ID, "at": datetime.now(timezone.utc), "points": SUGGESTED_POINTS} for i in ids],
+        )
+    return ids
+
+
+def _decide(request_id, action, key):
+    db = SessionLocal()
+    try:
+        response = Response()
+        if action == "accept":
+            body = accept_pickup_request(
+                uuid.UUID(request_id), response, admin_id="bench-admin",
+                data=PickupRequestAccept(), idempotency_key=key, db=db,
+            )
+        else:
+            body = reject_pickup_request(
+                uuid.UUID(request_id), response, admin_id="bench-admin",
+                data=PickupRequestReject(reason="bench"), idempotency_key=key, db=db,
+            )
+        return 200, body, response.headers.get("Idempotent-Replayed") == "true"
+    except HTTPException as e:
+        db.rollback()
+        return e.status_code, e.detail, False
+    finally:
+        db.close()
+
+
+def _bulk_accept(ids):
+    db = SessionLocal()
+    try:
+        body = bulk_accept_pickup_requests(
+            Response(), admin_id="bench-admin", data=PickupBulkAccept(ids=ids), idempotency_key=None, db=db,
+        )
+        return body["results"]
+    finally:
+        db.close()
+
+
+def race_bulk(ids, concurrency):
+    """Bulk-accept the same requests from `concurrency` threads at once; per request, the outcomes seen."""
+    barrier = threading.Barrier(concurrency)
+    results = [None] * concurrency
+
+    def run(i):
+        barrier.wait()
+        results[i] = _bulk_accept(ids)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    per_request = {i: [] for i in ids}
+    for thread_results in results:
+        for r in thread_results:
+            if r["outcome"] == "accepted":
+                per_request[r["id"]].append(("accept", 200, r, False))
+            else:
+                per_request[r["id"]].append(("accept", 400, r["outcome"], False))
+    return per_request
+
+
+def race(request_id, scenario, concurrency):
+    """Release `concurrency` decisions on one request at the same moment; returns their outcomes."""
+    barrier = threading.Barrier(concurrency)
+    outcomes = [None] * concurrency
+    key = f"bench-race-{request_id}" if scenario == "idempotent" else None
+
+    def run(i):
+        action = "reject" if scenario == "mixed" and i % 2 else "accept"
+        barrier.wait()
+        outcomes[i] = (action, *_decide(request_id, action, key))
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return outcomes
+
+
+def check(request_id, scenario, outcomes):
+    """Problems with one request's outcomes, and the points its winner awarded."""
+    problems = []
+    winners = [o for o in outcomes if o[1] == 200 and not o[3]]
+    if len(winners) != 1:
+        problems.append(f"{request_id}: {len(winners)} winning decisions")
+
+    losers = Counter(o[1] for o in outcomes if o[1] != 200)
+    if scenario == "idempotent":
+        if losers:
+            problems.append(f"{request_id}: idempotent retries failed {dict(losers)}")
+        if winners and any(o[2] != winners[0][2] for o in outcomes if o[1] == 200):
+            problems.append(f"{request_id}: replayed responses differ from the original")
+    elif set(losers) - {400}:
+        problems.append(f"{request_id}: unexpected statuses {dict(losers)}")
+
+    points = winners[0][2]["points_awarded"] if winners and winners[0][0] == "accept" else 0
+    return problems, points
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20, help="Pickup requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16, help="Simultaneous decisions per request")
+    parser.add_argument("--keep", action="store_true", help="Leave the bench rows in place")
+    args = parser.parse_args()
+
+    ids = setup(args.requests * len(SCENARIOS))
+    problems, expected_points, accepted = [], 0, 0
+    try:
+        for s, scenario in enumerate(SCENARIOS):
+            scenario_ids = ids[s * args.requests:(s + 1) * args.requests]
+            statuses = Counter()
+            if scenario == "bulk":
+                per_request = race_bulk(scenario_ids, args.concurrency)
+            for request_id in scenario_ids:
+                if scenario == "bulk":
+                    outcomes = per_request[request_id]
+                else:
+                    outcomes = race(request_id, scenario, args.concurrency)
+                found, points = check(request_id, scenario, outcomes)
+                problems += found
+                expected_points += points
+                accepted += points > 0
+                statuses.update(f"{o[0]} {o[1]}{' replayed' if o[3] else ''}" for o in outcomes)
+            print(f"{scenario:<11} {dict(sorted(statuses.items()))}")
+
+        with engine.connect() as conn:
+            points = conn.execute(text("SELECT points FROM users WHERE id = :id"), {"id": USER_ID}).scalar_one()
+            stats = conn.execute(
+                text("SELECT COALESCE(SUM(pickups), 0), COALESCE(SUM(pickup_points), 0) FROM user_waste_stats WHERE user_id = :id"),
+                {"id": USER_ID},
+            ).one()
+        print(f"user points {points} (expected {expected_points}), pickup stats {stats[0]} / {stats[1]} (expected {accepted} / {expected_points})")
+        if points != expected_points or tuple(stats) != (accepted, expected_points):
+            problems.append("user points or pickup stats do not match the accepted requests")
+    finally:
+        if not args.keep:
+            with engine.begin() as conn:
+                reset(conn)
+
+    for problem in problems:
+        print(f"FAIL {problem}")
+    if problems:
+        sys.exit(1)
+    print("OK: every request decided once, points awarded exactly once")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+The backend app with external services stubbed, for load tests.
+
+    python -m benchmarks.app --port 8100 --workers 4
+    python -m benchmarks.app --real-model --osrm-latency-ms 0
+
+Runs the real routes against DATABASE_URL (seed it with benchmarks.seed)
+with:
+  - auth: "Authorization: Bearer <user_id>" is accepted as that user, no
+    Firebase round trip;
+  - routing: OSRM is replaced by a straight line through the stops after
+    --osrm-latency-ms;
+  - detection: unless --real-model, the image is decoded and resized like
+    the real detector but the class comes from a hash of the bytes;
+  - storage: the local backend (STORAGE_BACKEND=local).
+
+Stub settings are passed to uvicorn workers through BENCH_* environment
+variables, since each worker imports this module on its own.
+"""
+import argparse
+import hashlib
+import os
+import time
+
+os.environ.setdefault("STORAGE_BACKEND", "local")
+
+from fastapi import FastAPI, Header, HTTPException
+
+from app.core.instrumentation import TimingMiddleware, span
+from app.core.logs import RequestIdMiddleware, setup_logging
+from app.core.security import verify_firebase_token
+from app.routes import bins, metrics, routes, user
+from app.services import points
+from app.services.inference import preprocess_image
+
+OSRM_LATENCY_MS = float(os.getenv("BENCH_OSRM_LATENCY_MS", "40"))
+REAL_MODEL = os.getenv("BENCH_REAL_MODEL", "0") == "1"
+
+
+def bench_token(authorization: str = Header(...)):
+    if not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="Invalid auth header")
+    return {"uid": authorization.split(" ", 1)[1]}
+
+
+def bench_osrm_route(points):
+    if OSRM_LATENCY_MS:
+        time.sleep(OSRM_LATENCY_MS / 1000)
+    return [[p["lng"], p["lat"]] for p in points]
+
+
+def bench_predict_waste(image_path):
+    with open(image_path, "rb") as f:
+        contents = f.read()
+    # Same preprocessing as WasteDetector, minus the model
+    preprocess_image(contents)
+
+    names = list(points.CLASS_NAMES)
+    digest = hashlib.sha256(contents).digest()
+    waste_type = names[digest[0] % len(names)]
+    confidence = round(0.3 + (digest[1] / 255) * 0.7, 4)
+    earned = points.calculate_points(waste_type, confidence)
+    return {
+        "waste_type": waste_type,
+        "confidence": confidence,
+        "base_points": points.points_cache.table.base_points(waste_type),
+        "points_to_earn": earned,
+        "estimated_value": earned,
+        "all_probabilities": {name: (confidence if name == waste_type else 0.0) for name in names},
+    }
+
+
+routes.call_osrm_route = span("osrm")(bench_osrm_route)
+if not REAL_MODEL:
+    user.predict_waste = bench_predict_waste
+
+setup_logging()
+
+app = FastAPI(title="ReMat Backend (benchmark)")
+app.add_middleware(TimingMiddleware)
+app.add_middleware(RequestIdMiddleware)
+app.dependency_overrides[verify_firebase_token] = bench_token
+app.include_router(bins.router)
+app.include_router(user.router)
+app.include_router(routes.router)
+app.include_router(metrics.router)
+
+
+@app.get("/health")
+def health():
+    return {"status": "Benchmark backend running"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--real-model", action="store_true", help="Run the Keras model for /user/detect-waste")
+    parser.add_argument("--osrm-latency-ms", type=float, default=OSRM_LATENCY_MS)
+    args = parser.parse_args()
+
+    os.environ["BENCH_REAL_MODEL"] = "1" if args.real_model else "0"
+    os.environ["BENCH_OSRM_LATENCY_MS"] = str(args.osrm_latency_ms)
+
+    import uvicorn
+    uvicorn.run("benchmarks.app:app", host=args.host, port=args.port, workers=args.workers, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark: reverse geocoding through the local cache.
+
+Replays --lookups points drawn around --hotspots neighbourhoods, as
+pickup creation and the frontend's map do, against a stand-in provider that
+sleeps --provider-ms per call. Reports the share of lookups answered from
+the in-process LRU, from SQLite (a fresh process sharing the store) and by
+the provider, and the median time of each. A --gazetteer of synthetic
+places can be seeded first to show misses turning into local answers.
+
+    python -m benchmarks.geocode_bench --lookups 20000 --provider-ms 5 --gazetteer 5000
+"""
+import argparse
+import math
+import os
+import tempfile
+import time
+from collections import defaultdict
+
+import numpy as np
+
+from app.cli.geocode_cache import seed_cells
+from app.services.geocoding import Geocoder, GeocodeStore, GeocodingProvider
+
+DEPOT = (6.9271, 79.8612)
+
+
+class SlowProvider(GeocodingProvider):
+    name = "stub"
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.calls = 0
+
+    def reverse(self, lat, lng):
+        self.calls += 1
+        time.sleep(self.delay)
+        return {"address_text": f"{lat:.4f}, {lng:.4f}", "components": {}}
+
+
+def _points(n, hotspots, radius_km, spread_m, rng):
+    centres = rng.normal(0, radius_km / 2, size=(hotspots, 2))
+    offsets = centres[rng.integers(0, hotspots, n)] + rng.normal(0, spread_m / 1000, size=(n, 2))
+    lat = DEPOT[0] + offsets[:, 1] / 111.32
+    lng = DEPOT[1] + offsets[:, 0] / (111.32 * math.cos(math.radians(DEPOT[0])))
+    return list(zip(lat.tolist(), lng.tolist()))
+
+
+def _replay(geocoder, points):
+    timings = defaultdict(list)
+    for lat, lng in points:
+        started = time.perf_counter()
+        _, source = geocoder.reverse(lat, lng)
+        timings[source].append(time.perf_counter() - started)
+    return timings
+
+
+def _report(label, timings, total):
+    print(label)
+    for source, times in sorted(timings.items()):
+        print(f"  {source:<8} {len(times) / total:6.1%}   median {np.median(times) * 1e6:10.1f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lookups", type=int, default=20000)
+    parser.add_argument("--hotspots", type=int, default=200)
+    parser.add_argument("--radius-km", type=float, default=15)
+    parser.add_argument("--spread-m", type=float, default=100, help="Scatter of lookups around each hotspot")
+    parser.add_argument("--provider-ms", type=float, default=5)
+    parser.add_argument("--gazetteer", type=int, default=0, help="Seed this many synthetic places first")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    points = _points(args.lookups, args.hotspots, args.radius_km, args.spread_m, rng)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = GeocodeStore(os.path.join(tmp, "geocode.sqlite3"))
+        if args.gazetteer:
+            places = [
+                (lat, lng, {"address_text": f"Place {i}", "components": {}})
+                for i, (lat, lng) in enumerate(_points(args.gazetteer, args.hotspots, args.radius_km, args.spread_m, rng))
+            ]
+            store.put_many((cell, address, "gazetteer") for cell, address in seed_cells(places, 1, store.cell_degrees).items())
+
+        provider = SlowProvider(args.provider_ms / 1000)
+        started = time.perf_counter()
+        first = _replay(Geocoder(provider, store), points)
+        elapsed = time.perf_counter() - started
+        _report(f"cold cache: {provider.calls} provider calls, {elapsed:.1f} s "
+                f"(uncached: {args.lookups * args.provider_ms / 1000:.0f} s)", first, len(points))
+
+        provider.calls = 0
+        second = _replay(Geocoder(provider, store), points)
+        _report(f"new process, same store: {provider.calls} provider calls", second, len(points))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""
+Mixed-workload load generator with per-endpoint latency percentiles.
+
+    python -m benchmarks.seed --users 2000 --bins 300
+    python -m benchmarks.app --workers 4 &
+    python -m benchmarks.loadgen --duration 60 --concurrency 32 --save benchmarks/results/baseline.json
+    # ...change something, restart the app...
+    python -m benchmarks.loadgen --duration 60 --concurrency 32 --compare benchmarks/results/baseline.json
+
+Each virtual user loops picking a request by --mix weights. Requests
+issued during --warmup are sent but not recorded. With --compare the run
+is diffed against a saved result and the exit status is 1 when any
+endpoint's p95 or throughput regressed by more than --tolerance percent.
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime, timezone
+
+import httpx
+import numpy as np
+from PIL import Image
+
+DEFAULT_MANIFEST = os.path.join(os.path.dirname(__file__), "results", "seed.json")
+DEFAULT_MIX = "detect=1,recycle=4,nearby=10,route=1"
+WASTE_TYPES = ["Battery", "Keyboard", "Laptop", "Mobile", "Mouse", "PCB", "Printer"]
+
+
+def _parse_mix(spec):
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    unknown = set(mix) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Unknown scenarios in --mix: {', '.join(sorted(unknown))}")
+    return mix
+
+
+def _make_images(count, size, rng):
+    """Distinct JPEGs of roughly phone-photo size, so uploads are not all identical."""
+    images = []
+    for _ in range(count):
+        noise = rng.integers(0, 256, size=(size[1] // 8, size[0] // 8, 3), dtype=np.uint8)
+        img = Image.fromarray(noise).resize(size, Image.BILINEAR)
+        buf = io.BytesIO()
+        img.save(buf, format="JPEG", quality=85)
+        images.append(buf.getvalue())
+    return images
+
+
+class Workload:
+    def __init__(self, manifest, images, rng):
+        self.users = manifest["users"]
+        self.bins = manifest["bins"]
+        self.center = manifest["center"]
+        self.radius_deg = manifest["radius_km"] / 111.32
+        self.images = images
+        self.rng = rng
+
+    def point(self):
+        return {
+            "lat": self.center["lat"] + self.rng.uniform(-self.radius_deg, self.radius_deg),
+            "lng": self.center["lng"] + self.rng.uniform(-self.radius_deg, self.radius_deg),
+        }
+
+
+async def detect(client, w):
+    files = {"image": ("bench.jpg", w.rng.choice(w.images), "image/jpeg")}
+    return await client.post("/user/detect-waste", files=files)
+
+
+async def recycle(client, w):
+    bin_id = w.rng.choice(w.bins)["id"]
+    return await client.put(
+        f"/user/recycle/{bin_id}",
+        headers={"Authorization": f"Bearer {w.rng.choice(w.users)}"},
+        json={
+            "waste_type": w.rng.choice(WASTE_TYPES),
+            "confidence": round(w.rng.uniform(0.3, 1.0), 2),
+            "user_override": False,
+        },
+    )
+
+
+async def nearby(client, w):
+    p = w.point()
+    return await client.get("/api/bins/nearby", params={"lat": p["lat"], "lng": p["lng"], "limit": 5})
+
+
+async def route(client, w):
+    stops = [{"lat": b["lat"], "lng": b["lng"]} for b in w.rng.sample(w.bins, min(12, len(w.bins)))]
+    return await client.post("/api/route/optimize", json={"start": w.point(), "bins": stops})
+
+
+SCENARIOS = {
+    "detect": ("POST /user/detect-waste", detect),
+    "recycle": ("PUT /user/recycle/{binid}", recycle),
+    "nearby": ("GET /api/bins/nearby", nearby),
+    "route": ("POST /api/route/optimize", route),
+}
+
+
+async def _virtual_user(client, workload, mix, samples, errors, record_from, stop_at):
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    while time.perf_counter() < stop_at:
+        name = workload.rng.choices(names, weights)[0]
+        started = time.perf_counter()
+        try:
+            response = await SCENARIOS[name][1](client, workload)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        finished = time.perf_counter()
+        if started < record_from:
+            continue
+        if ok:
+            samples[name].append(finished - started)
+        else:
+            errors[name] += 1
+
+
+def summarize(samples, errors, elapsed):
+    report = {}
+    for name, latencies in samples.items():
+        if not latencies and not errors[name]:
+            continue
+        ms = np.array(latencies) * 1000
+        entry = {
+            "endpoint": SCENARIOS[name][0],
+            "requests": len(latencies),
+            "errors": errors[name],
+            "rps": round(len(latencies) / elapsed, 2),
+        }
+        if len(ms):
+            p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+            entry.update(
+                mean_ms=round(float(ms.mean()), 2),
+                p50_ms=round(float(p50), 2),
+                p95_ms=round(float(p95), 2),
+                p99_ms=round(float(p99), 2),
+                max_ms=round(float(ms.max()), 2),
+            )
+        report[name] = entry
+    return report
+
+
+def print_report(report, baseline=None):
+    print(f"{'endpoint':<28} {'req':>7} {'err':>5} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, e in report.items():
+        line = (
+            f"{e['endpoint']:<28} {e['requests']:>7} {e['errors']:>5} {e['rps']:>8.1f} "
+            f"{e.get('p50_ms', float('nan')):>9.1f} {e.get('p95_ms', float('nan')):>9.1f} {e.get('p99_ms', float('nan')):>9.1f}"
+        )
+        base = (baseline or {}).get(name)
+        if base and "p95_ms" in base and "p95_ms" in e:
+            line += f"   p95 {_pct(e['p95_ms'], base['p95_ms']):+6.1f}%  rps {_pct(e['rps'], base['rps']):+6.1f}%"
+        print(line)
+
+
+def _pct(new, old):
+    return (new - old) / old * 100 if old else 0.0
+
+
+def regressions(report, baseline, tolerance):
+    found = []
+    for name, e in report.items():
+        base = baseline.get(name)
+        if not base or "p95_ms" not in base or "p95_ms" not in e:
+            continue
+        if _pct(e["p95_ms"], base["p95_ms"]) > tolerance:
+            found.append(f"{e['endpoint']}: p95 {base['p95_ms']} -> {e['p95_ms']} ms")
+        if _pct(e["rps"], base["rps"]) < -tolerance:
+            found.append(f"{e['endpoint']}: rps {base['rps']} -> {e['rps']}")
+    return found
+
+
+async def run(args):
+    with open(args.manifest) as f:
+        manifest = json.load(f)
+    mix = _parse_mix(args.mix)
+    rng = random.Random(args.seed)
+    images = _make_images(16, (args.image_width, args.image_height), np.random.default_rng(args.seed))
+
+    samples = {name: [] for name in mix}
+    errors = {name: 0 for name in mix}
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.timeout) as client:
+        (await client.get("/health")).raise_for_status()
+
+        start = time.perf_counter()
+        record_from = start + args.warmup
+        stop_at = record_from + args.duration
+        await asyncio.gather(*(
+            _virtual_user(
+                client,
+                Workload(manifest, images, random.Random(rng.random())),
+                mix, samples, errors, record_from, stop_at,
+            )
+            for _ in range(args.concurrency)
+        ))
+        # Requests still in flight at stop_at finish after it
+        elapsed = time.perf_counter() - record_from
+
+    return {
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+        "host": platform.node(),
+        "config": {
+            "url": args.url,
+            "duration": args.duration,
+            "concurrency": args.concurrency,
+            "mix": mix,
+            "bins": len(manifest["bins"]),
+            "users": len(manifest["users"]),
+            "transactions": manifest.get("transactions"),
+        },
+        "endpoints": summarize(samples, errors, elapsed),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8100")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST)
+    parser.add_argument("--duration", type=float, default=30, help="Recorded seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="Unrecorded seconds before measuring")
+    parser.add_argument("--concurrency", type=int, default=16, help="Virtual users")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Scenario weights (default {DEFAULT_MIX})")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--image-width", type=int, default=1280)
+    parser.add_argument("--image-height", type=int, default=960)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--save", help="Write the result JSON here (e.g. a new baseline)")
+    parser.add_argument("--compare", help="Baseline result JSON to diff against")
+    parser.add_argument("--tolerance", type=float, default=10.0, help="Allowed regression in percent")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["endpoints"]
+
+    cfg = result["config"]
+    print(f"{cfg['concurrency']} virtual users, {cfg['duration']}s, {cfg['bins']} bins / {cfg['users']} users")
+    print_report(result["endpoints"], baseline)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"Saved {args.save}")
+
+    if baseline is not None:
+        found = regressions(result["endpoints"], baseline, args.tolerance)
+        if found:
+            print(f"Regressions beyond {args.tolerance}%:")
+            for line in found:
+                print("  " + line)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
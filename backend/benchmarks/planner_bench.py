@@ -0,0 +1,109 @@
+"""
+Benchmark: daily pickup planning at thousands of accepted requests.
+
+For each --sizes count, synthetic requests are drawn around a depot: dense
+neighbourhoods plus a scattered remainder, preferred times spread over
+the working day. It times:
+
+    clustering   pickup_planner.cluster_points (grid DBSCAN, all windows)
+    plan         pickup_planner.plan_stops for --crews crews, end to end
+    route        routing_service.optimize_order over all stops, against the
+                 previous pure-Python loop (up to --baseline-max stops; its
+                 order must come out identical)
+
+No database is needed.
+
+    python -m benchmarks.planner_bench --sizes 1000,5000,20000 --crews 6
+"""
+import argparse
+import math
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from app.services.pickup_planner import cluster_points, plan_stops, project
+from app.services.routing_service import haversine, optimize_order
+
+DEPOT = {"lat": 6.9271, "lng": 79.8612}
+
+
+def _baseline_order(start, bins):
+    # routing_service.optimize_order before it was vectorized
+    ordered = []
+    current = start
+    remaining = bins.copy()
+    while remaining:
+        nearest = min(remaining, key=lambda b: haversine(current, b))
+        ordered.append(nearest)
+        remaining.remove(nearest)
+        current = nearest
+    return ordered
+
+
+def make_requests(n, rng, radius_km=15, hotspots=40, day=datetime(2026, 1, 15, tzinfo=timezone.utc)):
+    centres = rng.normal(0, radius_km / 2, size=(hotspots, 2))
+    dense = int(n * 0.7)
+    offsets = np.concatenate([
+        centres[rng.integers(0, hotspots, dense)] + rng.normal(0, 0.4, size=(dense, 2)),
+        rng.uniform(-radius_km, radius_km, size=(n - dense, 2)),
+    ])
+    lat = DEPOT["lat"] + offsets[:, 1] / 111.32
+    lng = DEPOT["lng"] + offsets[:, 0] / (111.32 * math.cos(math.radians(DEPOT["lat"])))
+    minutes = rng.integers(8 * 60, 18 * 60, n)
+    return [
+        {"id": f"r{i}", "lat": float(lat[i]), "lng": float(lng[i]), "preferred_datetime": day + timedelta(minutes=int(minutes[i]))}
+        for i in range(n)
+    ]
+
+
+def _time(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times)), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,5000,20000")
+    parser.add_argument("--crews", type=int, default=6)
+    parser.add_argument("--eps-m", type=float, default=500)
+    parser.add_argument("--window-hours", type=float, default=2)
+    parser.add_argument("--baseline-max", type=int, default=5000, help="Largest route to time the old loop on")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    for n in (int(v) for v in args.sizes.split(",")):
+        requests = make_requests(n, rng)
+        x, y = project([r["lat"] for r in requests], [r["lng"] for r in requests], DEPOT)
+        window = np.array([r["preferred_datetime"].hour // args.window_hours for r in requests], dtype=np.int64)
+
+        cluster_s, labels = _time(lambda: cluster_points(x, y, args.eps_m, group=window), args.repeat)
+        plan_s, plan = _time(
+            lambda: plan_stops(requests, DEPOT, args.crews, eps_m=args.eps_m, window_hours=args.window_hours),
+            args.repeat,
+        )
+        print(f"{n} requests, {int(labels.max()) + 1} clusters, {args.crews} crews")
+        print(f"  clustering   {cluster_s * 1000:9.1f} ms")
+        print(
+            f"  plan         {plan_s * 1000:9.1f} ms   stops/crew "
+            f"{min(len(c['stops']) for c in plan['crews'])}-{max(len(c['stops']) for c in plan['crews'])}, "
+            f"km/crew {np.mean([c['distance_km'] for c in plan['crews']]):.1f}"
+        )
+
+        route_s, ordered = _time(lambda: optimize_order(DEPOT, requests), 1)
+        line = f"  route        {route_s * 1000:9.1f} ms"
+        if n <= args.baseline_max:
+            baseline_s, expected = _time(lambda: _baseline_order(DEPOT, requests), 1)
+            same = [r["id"] for r in ordered] == [r["id"] for r in expected]
+            line += f"   pure Python {baseline_s * 1000:9.1f} ms  ({baseline_s / route_s:4.1f}x, same order: {same})"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Seed synthetic users, bins and transactions for load tests.
+
+    python -m benchmarks.seed --users 5000 --bins 500 --transactions 200000
+    python -m benchmarks.seed --reset-only
+
+Rows are tagged (user ids "bench_*", bin names "bench-*") and every run
+first removes the previous benchmark rows, leaving real data alone. Bins get a large capacity so a load run does not fill
+them up. Writes a manifest with the seeded ids for benchmarks.loadgen.
+"""
+import argparse
+import io
+import json
+import math
+import os
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+
+from app.core.config import DEPOT_LAT, DEPOT_LNG
+from app.database import engine
+from app.services.points import BASE_POINTS
+
+DEFAULT_MANIFEST = os.path.join(os.path.dirname(__file__), "results", "seed.json")
+BENCH_CAPACITY = 10_000_000
+# Centre of the synthetic city when DEPOT_LAT/DEPOT_LNG are not set (Colombo)
+DEFAULT_CENTER = {"lat": 6.9271, "lng": 79.8612}
+
+
+def _random_point(rng, center, radius_km):
+    # Uniform over a disc around the centre
+    r = radius_km * math.sqrt(rng.random())
+    theta = rng.random() * 2 * math.pi
+    lat = center["lat"] + (r * math.cos(theta)) / 111.32
+    lng = center["lng"] + (r * math.sin(theta)) / (111.32 * math.cos(math.radians(center["lat"])))
+    return lat, lng
+
+
+def _copy(cursor, table, columns, rows):
+    buf = io.StringIO()
+    for row in rows:
+        buf.write("\t".join("\\N" if v is None else str(v) for v in row))
+        buf.write("\n")
+    buf.seek(0)
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buf)
+
+
+def reset(conn):
+    conn.execute(text("DELETE FROM transactions WHERE user_id LIKE 'bench\\_%'"))
+    conn.execute(text("""
+        DELETE FROM transactions
+        WHERE bin_id IN (SELECT id FROM bins WHERE name LIKE 'bench-%')
+    """))
+    conn.execute(text("DELETE FROM users WHERE id LIKE 'bench\\_%'"))
+    conn.execute(text("DELETE FROM bins WHERE name LIKE 'bench-%'"))
+
+
+def seed(users, bins, transactions, center, radius_km, days, rng):
+    now = datetime.now(timezone.utc)
+    user_ids = [f"bench_{i:07d}" for i in range(users)]
+    bin_rows = []
+    for i in range(bins):
+        lat, lng = _random_point(rng, center, radius_km)
+        bin_rows.append((str(uuid.uuid4()), f"bench-{i:05d}", lat, lng))
+    waste_types = list(BASE_POINTS)
+
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        _copy(cursor, "users", ["id", "name", "email", "role", "points"], (
+            (uid, f"Bench User {i}", f"{uid}@bench.invalid", "citizen", 0)
+            for i, uid in enumerate(user_ids)
+        ))
+        _copy(cursor, "bins", ["id", "name", "location", "capacity", "fill_level", "status"], (
+            (bin_id, name, f"SRID=4326;POINT({lng} {lat})", BENCH_CAPACITY, 0, "active")
+            for bin_id, name, lat, lng in bin_rows
+        ))
+        _copy(cursor, "transactions", ["id", "user_id", "bin_id", "waste_type", "confidence", "points_awarded", "created_at"], (
+            (
+                uuid.uuid4(),
+                rng.choice(user_ids),
+                rng.choice(bin_rows)[0],
+                waste_type,
+                round(rng.uniform(0.3, 1.0), 2),
+                BASE_POINTS[waste_type],
+                (now - timedelta(seconds=rng.uniform(0, days * 86400))).isoformat(),
+            )
+            for waste_type in (rng.choice(waste_types) for _ in range(transactions))
+        ))
+        # Keep user totals consistent with the seeded history
+        cursor.execute("""
+            UPDATE users u
+            SET points = t.total
+            FROM (
+                SELECT user_id, SUM(points_awarded) AS total
+                FROM transactions
+                WHERE user_id LIKE 'bench\\_%'
+                GROUP BY user_id
+            ) t
+            WHERE u.id = t.user_id
+        """)
+        cursor.execute("ANALYZE users; ANALYZE bins; ANALYZE transactions")
+        raw.commit()
+    finally:
+        raw.close()
+
+    return {
+        "center": center,
+        "radius_km": radius_km,
+        "users": user_ids,
+        "bins": [{"id": b[0], "lat": b[2], "lng": b[3]} for b in bin_rows],
+        "transactions": transactions,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--bins", type=int, default=200)
+    parser.add_argument("--transactions", type=int, default=50_000)
+    parser.add_argument("--center-lat", type=float, default=DEPOT_LAT if DEPOT_LAT is not None else DEFAULT_CENTER["lat"],
+                        help="Centre of the seeded bins (default DEPOT_LAT, else Colombo)")
+    parser.add_argument("--center-lng", type=float, default=DEPOT_LNG if DEPOT_LNG is not None else DEFAULT_CENTER["lng"])
+    parser.add_argument("--radius-km", type=float, default=15.0)
+    parser.add_argument("--days", type=int, default=90, help="Spread transaction history over this many days")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST)
+    parser.add_argument("--reset-only", action="store_true")
+    args = parser.parse_args()
+
+    with engine.begin() as conn:
+        reset(conn)
+    print("Removed previous benchmark rows")
+    if args.reset_only:
+        return
+
+    center = {"lat": args.center_lat, "lng": args.center_lng}
+    manifest = seed(args.users, args.bins, args.transactions, center, args.radius_km, args.days, random.Random(args.seed))
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.manifest)), exist_ok=True)
+    with open(args.manifest, "w") as f:
+        json.dump(manifest, f)
+    print(f"Seeded {args.users} users, {args.bins} bins, {args.transactions} transactions -> {args.manifest}")
+
+
+if __name__ == "__main__":
+    main()
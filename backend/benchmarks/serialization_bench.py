@@ -0,0 +1,117 @@
+"""
+Microbenchmark: JSON serialization cost of list endpoints per 10k rows.
+
+Compares the default path (ORM objects -> Pydantic response model ->
+jsonable_encoder -> json.dumps) and the raw-row path used by get_all_bins
+against the FAST_JSON_RESPONSES path (RowMapping partitions -> orjson).
+
+Uses an in-memory SQLite table shaped like PickupRequestOut so it runs
+without PostGIS.
+
+    python -m benchmarks.serialization_bench --rows 10000 --repeat 5
+"""
+import argparse
+import json
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import Column, DateTime, Integer, String, create_engine, select
+from sqlalchemy.orm import Session, declarative_base
+
+from app.models.schemas.pickup_requests import PickupRequestOut
+from app.services.serialization import ROW_CHUNK_SIZE, encode_rows, schema_columns
+
+BenchBase = declarative_base()
+
+
+class BenchPickup(BenchBase):
+    __tablename__ = "bench_pickups"
+
+    id = Column(String, primary_key=True)
+    image_url = Column(String, nullable=False)
+    e_waste_type = Column(String)
+    preferred_datetime = Column(DateTime(timezone=True), nullable=False)
+    contact_number = Column(String, nullable=False)
+    status = Column(String, nullable=False)
+    points_awarded = Column(Integer)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    address_text = Column(String)
+
+
+def _seed(session, rows):
+    now = datetime.now(timezone.utc)
+    session.add_all(
+        BenchPickup(
+            id=str(uuid.uuid4()),
+            image_url=f"https://example.com/storage/v1/object/public/pickup-requests/user_{i % 500}/{uuid.uuid4()}.jpg",
+            e_waste_type="Laptop",
+            preferred_datetime=now + timedelta(hours=i % 72),
+            contact_number="9999999999",
+            status=("open", "accepted", "rejected")[i % 3],
+            points_awarded=(i % 3 == 1) and 120 or None,
+            created_at=now - timedelta(minutes=i),
+            address_text=f"{i} Example Street",
+        )
+        for i in range(rows)
+    )
+    session.commit()
+
+
+def _orm_pydantic(session):
+    objs = session.query(BenchPickup).order_by(BenchPickup.created_at.desc()).all()
+    models = [PickupRequestOut.model_validate(o) for o in objs]
+    return json.dumps(jsonable_encoder(models)).encode()
+
+
+def _rows_jsonable(session):
+    query = select(*schema_columns(BenchPickup, PickupRequestOut)).order_by(BenchPickup.created_at.desc())
+    rows = session.execute(query).mappings().all()
+    return json.dumps(jsonable_encoder({"items": rows})).encode()
+
+
+def _rows_orjson(session):
+    query = select(*schema_columns(BenchPickup, PickupRequestOut)).order_by(BenchPickup.created_at.desc())
+    result = session.execute(query, execution_options={"yield_per": ROW_CHUNK_SIZE})
+    return encode_rows(result)
+
+
+def _time(fn, session, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        session.expunge_all()
+        start = time.perf_counter()
+        fn(session)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    BenchBase.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        _seed(session, args.rows)
+
+        per_10k = 10_000 / args.rows
+        cases = [
+            ("orm + pydantic + jsonable_encoder", _orm_pydantic),
+            ("rows + jsonable_encoder", _rows_jsonable),
+            ("RowMapping partitions + orjson", _rows_orjson),
+        ]
+        baseline = None
+        print(f"{args.rows} rows, best of {args.repeat}")
+        for label, fn in cases:
+            elapsed = _time(fn, session, args.repeat) * per_10k * 1000
+            baseline = baseline or elapsed
+            print(f"  {label:<36} {elapsed:8.1f} ms / 10k rows  ({baseline / elapsed:4.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Upload/download throughput of the storage backends.
+
+    python -m benchmarks.storage_bench --backend local --count 200 --size-kb 512
+    python -m benchmarks.storage_bench --backend supabase --count 20
+
+--duplicates re-uploads the same bytes under new paths, which the local
+backend stores as hard links to a single object.
+"""
+import argparse
+import os
+import time
+import uuid
+
+from app.services.storage import make_storage
+
+
+def _report(label, count, total_bytes, elapsed):
+    print(
+        f"  {label:<9} {count / elapsed:8.1f} obj/s  "
+        f"{total_bytes / elapsed / 1024 / 1024:8.1f} MiB/s  "
+        f"{elapsed / count * 1000:7.2f} ms/obj"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["local", "supabase"], default="local")
+    parser.add_argument("--bucket", default="pickup-requests")
+    parser.add_argument("--count", type=int, default=200)
+    parser.add_argument("--size-kb", type=int, default=512)
+    parser.add_argument("--duplicates", action="store_true")
+    args = parser.parse_args()
+
+    backend = make_storage(args.backend, args.bucket)
+    size = args.size_kb * 1024
+    payload = os.urandom(size)
+    paths = [f"bench/{uuid.uuid4()}.bin" for _ in range(args.count)]
+
+    print(f"{args.backend}: {args.count} objects x {args.size_kb} KiB{' (duplicates)' if args.duplicates else ''}")
+
+    start = time.perf_counter()
+    for path in paths:
+        data = payload if args.duplicates else os.urandom(16) + payload[16:]
+        backend.put(path, data, "application/octet-stream")
+    _report("upload", args.count, args.count * size, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for path in paths:
+        backend.get(path)
+    _report("download", args.count, args.count * size, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    backend.delete(paths)
+    _report("delete", args.count, args.count * size, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,35 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 import app.core.firebase
 from fastapi.middleware.cors import CORSMiddleware
+from app.services.change_feed import change_feed
+from app.services.telemetry import telemetry_buffer
+from app.services.forecasting import forecaster
+from app.services.points import points_cache
+from app.core.config import PROFILE_SAMPLE_MS
+from app.core.instrumentation import TimingMiddleware, stack_sampler
+from app.core.logs import RequestIdMiddleware, setup_logging
 
-app = FastAPI(title="ReMat Backend")
+setup_logging()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    change_feed.start()
+    telemetry_buffer.start()
+    forecaster.start()
+    points_cache.start()
+    if PROFILE_SAMPLE_MS:
+        stack_sampler.start()
+    yield
+    stack_sampler.stop()
+    points_cache.stop()
+    forecaster.stop()
+    telemetry_buffer.stop()
+    change_feed.stop()
+
+
+app = FastAPI(title="ReMat Backend", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -10,9 +37,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Request-ID"],
 )
+app.add_middleware(TimingMiddleware)
+app.add_middleware(RequestIdMiddleware)
 
-from app.routes import bins, auth, user, bin_panel, routes, admin_pickup, user_request
+from app.routes import bins, auth, user, bin_panel, routes, admin_pickup, user_request, realtime, telemetry, forecast, admin_jobs, media, metrics, stats, admin_waste_types, pickup_plan, geocode
 
 app.include_router(bins.router)
 app.include_router(auth.router)
@@ -21,6 +51,16 @@ app.include_router(bin_panel.router)
 app.include_router(routes.router)
 app.include_router(admin_pickup.router)
 app.include_router(user_request.router)
+app.include_router(realtime.router)
+app.include_router(telemetry.router)
+app.include_router(forecast.router)
+app.include_router(admin_jobs.router)
+app.include_router(media.router)
+app.include_router(metrics.router)
+app.include_router(stats.router)
+app.include_router(admin_waste_types.router)
+app.include_router(pickup_plan.router)
+app.include_router(geocode.router)
 
 
 
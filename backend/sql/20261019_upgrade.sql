@@ -0,0 +1,148 @@
+-- Schema for an existing ReMat database: columns, tables and indexes the
+-- models declare but that the app never creates (there is no create_all).
+--
+--     psql "$DATABASE_URL" -f backend/sql/20261019_upgrade.sql
+--
+-- Every statement is idempotent, so the script can be re-run. Do not wrap it
+-- in one transaction (psql -1): CREATE INDEX CONCURRENTLY cannot run inside
+-- one. Indexes are built CONCURRENTLY so live traffic is not blocked; if a
+-- build is interrupted, DROP the INVALID index and run the script again.
+
+
+-- Admin pickup queue: filter by status, keyset-paginate by created_at
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_pickup_requests_status_created_at
+    ON pickup_requests (status, created_at);
+
+
+-- Bin telemetry readings (telemetry_staging is a per-flush TEMP table, not created here)
+CREATE TABLE IF NOT EXISTS bin_telemetry (
+    id bigserial PRIMARY KEY,
+    bin_id uuid NOT NULL REFERENCES bins(id) ON DELETE CASCADE,
+    fill_level integer NOT NULL,
+    recorded_at timestamptz NOT NULL,
+    received_at timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_bin_telemetry_bin_id_recorded_at
+    ON bin_telemetry (bin_id, recorded_at);
+
+-- Timestamp of the reading behind bins.fill_level, so late readings cannot roll it back
+ALTER TABLE bins ADD COLUMN IF NOT EXISTS last_reading_at timestamptz;
+
+
+-- Background job queue (app.services.job_queue, app.workers.job_worker)
+CREATE TABLE IF NOT EXISTS jobs (
+    id bigserial PRIMARY KEY,
+    kind varchar NOT NULL,
+    payload jsonb NOT NULL DEFAULT '{}',
+    status varchar NOT NULL DEFAULT 'pending',
+    attempts integer NOT NULL DEFAULT 0,
+    max_attempts integer NOT NULL,
+    last_error varchar,
+    run_at timestamptz NOT NULL DEFAULT now(),
+    locked_by varchar,
+    locked_at timestamptz,
+    finished_at timestamptz,
+    created_at timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_jobs_status_run_at
+    ON jobs (status, run_at);
+
+
+-- WebP derivatives of pickup images, written by the upload job
+ALTER TABLE pickup_requests
+    ADD COLUMN IF NOT EXISTS thumbnail_url varchar,
+    ADD COLUMN IF NOT EXISTS preview_url varchar;
+
+
+-- Asynchronous classification of pickup images (classify_pickup_image job)
+ALTER TABLE pickup_requests
+    ADD COLUMN IF NOT EXISTS predicted_type varchar,
+    ADD COLUMN IF NOT EXISTS predicted_confidence numeric(5, 4),
+    ADD COLUMN IF NOT EXISTS predicted_probabilities jsonb,
+    ADD COLUMN IF NOT EXISTS suggested_points integer,
+    ADD COLUMN IF NOT EXISTS classified_at timestamptz;
+
+
+-- Reference counts of content-addressed pickup images (app.services.object_index)
+CREATE TABLE IF NOT EXISTS stored_objects (
+    path varchar PRIMARY KEY,
+    sha256 varchar NOT NULL,
+    size bigint NOT NULL,
+    content_type varchar NOT NULL,
+    ref_count integer NOT NULL DEFAULT 1,
+    created_at timestamptz NOT NULL DEFAULT now()
+);
+
+
+-- Statistics rollups (app.services.stats, app.cli.backfill_stats). The transactions
+-- indexes the backfill pages by are created by python -m app.cli.partitions --convert
+CREATE TABLE IF NOT EXISTS user_waste_stats (
+    user_id varchar NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    waste_type varchar NOT NULL,
+    deposits integer NOT NULL DEFAULT 0,
+    deposit_points bigint NOT NULL DEFAULT 0,
+    pickups integer NOT NULL DEFAULT 0,
+    pickup_points bigint NOT NULL DEFAULT 0,
+    last_activity_at timestamptz,
+    PRIMARY KEY (user_id, waste_type)
+);
+
+CREATE TABLE IF NOT EXISTS bin_daily_stats (
+    bin_id uuid NOT NULL REFERENCES bins(id) ON DELETE CASCADE,
+    day date NOT NULL,
+    deposits integer NOT NULL DEFAULT 0,
+    points bigint NOT NULL DEFAULT 0,
+    PRIMARY KEY (bin_id, day)
+);
+
+CREATE TABLE IF NOT EXISTS bin_user_stats (
+    bin_id uuid NOT NULL REFERENCES bins(id) ON DELETE CASCADE,
+    user_id varchar NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    deposits integer NOT NULL DEFAULT 0,
+    points bigint NOT NULL DEFAULT 0,
+    last_deposit_at timestamptz,
+    PRIMARY KEY (bin_id, user_id)
+);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_bin_user_stats_bin_id_points
+    ON bin_user_stats (bin_id, points);
+
+CREATE TABLE IF NOT EXISTS stats_backfill_state (
+    name varchar PRIMARY KEY,
+    cutoff timestamptz NOT NULL,
+    last_created_at timestamptz,
+    last_id uuid,
+    rows_done bigint NOT NULL DEFAULT 0,
+    finished_at timestamptz,
+    updated_at timestamptz NOT NULL DEFAULT now()
+);
+
+
+-- Live-editable point table (app.services.points); updated_at feeds the cache fingerprint
+ALTER TABLE waste_types
+    ADD COLUMN IF NOT EXISTS class_index integer UNIQUE,
+    ADD COLUMN IF NOT EXISTS manual_points integer,
+    ADD COLUMN IF NOT EXISTS updated_at timestamptz NOT NULL DEFAULT now();
+
+
+-- Optimistic concurrency on pickup requests (bumped by every write), and
+-- Idempotency-Key responses for admin decisions (purged by the job worker)
+ALTER TABLE pickup_requests ADD COLUMN IF NOT EXISTS version integer NOT NULL DEFAULT 1;
+
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    key varchar PRIMARY KEY,
+    scope varchar NOT NULL,
+    request_hash varchar NOT NULL,
+    response jsonb,
+    created_at timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_idempotency_keys_created_at
+    ON idempotency_keys (created_at);
+
+
+-- Daily pickup plans: accepted requests by preferred day
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_pickup_requests_status_preferred_datetime
+    ON pickup_requests (status, preferred_datetime);
@@ -52,7 +52,9 @@ const AdminPickupDetails = ({
   onClose,
   onAction
 }: Props) => {
-  const [points, setPoints] = useState("");
+  const [points, setPoints] = useState(
+    pickup.suggested_points != null ? String(pickup.suggested_points) : ""
+  );
   const [loading, setLoading] = useState(false);
 
   const accept = async () => {
@@ -171,7 +173,11 @@ const AdminPickupDetails = ({
               <p className="text-sm text-white/60 mb-3 font-semibold">Item Photo</p>
               <div className="relative group">
                 <img
-                  src={pickup.image_url}
+                  src={pickup.preview_url || pickup.image_url}
+                  onError={(e) => {
+                    // Preview is generated in the background; fall back to the original
+                    if (e.currentTarget.src !== pickup.image_url) e.currentTarget.src = pickup.image_url;
+                  }}
                   alt="E-waste item"
                   className="w-full max-w-2xl rounded-lg border border-white/10 shadow-xl"
                 />
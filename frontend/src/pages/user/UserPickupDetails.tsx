@@ -266,7 +266,10 @@ const PickupDetails = () => {
                   <div className="p-3 sm:p-4 bg-white/5 rounded-lg">
                     <p className="text-xs sm:text-sm text-white/60 mb-2 sm:mb-3">Item Photo</p>
                     <img
-                      src={pickup.image_url}
+                      src={pickup.preview_url || pickup.image_url}
+                      onError={(e) => {
+                        if (e.currentTarget.src !== pickup.image_url) e.currentTarget.src = pickup.image_url;
+                      }}
                       alt="E-waste item"
                       className="w-full max-w-md rounded-lg border border-white/10 shadow-xl"
                     />
@@ -27,6 +27,8 @@ export type PickupStatus =
 export interface PickupRequest {
   id: string;
   image_url: string;
+  thumbnail_url?: string | null;
+  preview_url?: string | null;
   e_waste_type: string;
   preferred_datetime: string;
   contact_number: string;
@@ -35,6 +37,10 @@ export interface PickupRequest {
   rejection_reason?: string | null;
   address_text?: string | null;
 
+  predicted_type?: string | null;
+  predicted_confidence?: number | null;
+  suggested_points?: number | null;
+
   latitude?: number;
   longitude?: number;
   created_at: string;